@@ -1,9 +1,9 @@
 # --------------------
 # Imports
 # --------------------
-import pdfplumber
 import os
 import io
+import sys
 import re
 import json
 import tempfile
@@ -11,17 +11,19 @@ import base64
 import threading
 import webbrowser
 import time
-from typing import Any, Dict, List, Tuple
-from datetime import datetime, date
-import pandas as pd
+import bisect
+import uuid
+import socket
+from typing import Any, Dict, Iterable, Iterator, List, Tuple
+from datetime import datetime, date, timedelta
 
 import dash
 from dash import dcc, html, Input, Output, State, ctx, ALL
 import dash_bootstrap_components as dbc
-import plotly.graph_objects as go
-import chromadb
-from chromadb.utils import embedding_functions
-from sentence_transformers import SentenceTransformer  
+from flask import Response, jsonify, stream_with_context
+# pandas, plotly, chromadb, sentence-transformers, openai, pdfplumber and docx2txt are
+# imported where they are used, so importing this module (every gunicorn worker) stays
+# fast; see bench_startup.py for the budget.
 
 # Pdf Reader
 try:
@@ -29,40 +31,58 @@ try:
 except Exception:
     fitz = None
 
-from PIL import Image
 import pytesseract
-import docx2txt
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, TimeoutError as FutureTimeoutError, wait
+from concurrent.futures.process import BrokenProcessPool
 
-# Import OpenAI/Azure Client
-try:
-    from openai import OpenAI, AzureOpenAI
-except Exception:
-    OpenAI = None
-    AzureOpenAI = None
+import page_extract
+from disk_cache import DiskLRUCache, sha256_bytes, sha256_text
+from llm_cache import LLMResponseCache
+from job_queue import JobQueue
+from tender_store import TenderStore
+from progress_bus import ProgressBus
+from search_index import BM25Index, rrf_fuse
 
 
 # --------------------
 # Importing Keys
 # --------------------
+# Read from the Keys sheet on first LLM use (get_llm_client), not at import
+KEYS_FILE = r"C:\Users\Pranasyya\Downloads\Tender\Tender\backend\AI Keys.xlsx"
+KEY_CONFIG = {  # key name in the sheet -> CONFIG entry
+    "open_ai_key": "openai_api_key",
+    "azure_api_key": "azure_api_key",
+    "azure_endpoint": "azure_endpoint",
+    "azure_api_version": "azure_api_version",
+    "azure_deployment_name": "llm_model",
+}
 
-keys_df = pd.read_excel(
-    r"C:\Users\Pranasyya\Downloads\Tender\Tender\backend\AI Keys.xlsx",
-    sheet_name="Keys"
-)
 
+def load_keys(path: str = KEYS_FILE) -> Dict[str, Any]:
+    """
+    Fill the CONFIG entries of KEY_CONFIG that are still None from the keys workbook.
 
-open_ai_key = keys_df[keys_df['Key']=='open_ai_key']['Value'].iloc[0]
-azure_api_key = keys_df[keys_df['Key']=='azure_api_key']['Value'].iloc[0]
-azure_endpoint = keys_df[keys_df['Key']=='azure_endpoint']['Value'].iloc[0]
-azure_api_version = keys_df[keys_df['Key']=='azure_api_version']['Value'].iloc[0]
-azure_deployment_model = keys_df[keys_df['Key']=='azure_deployment_model']['Value'].iloc[0]
-azure_deployment_name = keys_df[keys_df['Key']=='azure_deployment_name']['Value'].iloc[0]
+    Returns:
+        dict: {key name: value} as read from the sheet ({} if the file cannot be read).
+    """
+    import pandas as pd
+    try:
+        keys_df = pd.read_excel(path, sheet_name="Keys")
+    except Exception as e:
+        log(f"Keys file not loaded ({path}): {e}")
+        return {}
+    keys = {str(k): v for k, v in zip(keys_df["Key"], keys_df["Value"])}
+    for name, entry in KEY_CONFIG.items():
+        if CONFIG.get(entry) is None and name in keys:
+            CONFIG[entry] = keys[name]
+    return keys
 
 # ===============================
 # TENDER ANALYSIS FUNCTIONS
 # ===============================
 
 def extract_text(pdf_path):
+    import pdfplumber
     text = ""
     try:
         with pdfplumber.open(pdf_path) as pdf:
@@ -113,22 +133,80 @@ def classify_tender(confidence):
 # --------------------
 CONFIG = {
     "provider": "azure", #azure/openai
-    "openai_api_key": open_ai_key,
-    "azure_api_key": azure_api_key,
-    "azure_endpoint": azure_endpoint,
-    "azure_api_version": azure_api_version,
-    "llm_model": azure_deployment_name,
+    "openai_api_key": None, #None = read from KEYS_FILE on first use.
+    "azure_api_key": None,
+    "azure_endpoint": None,
+    "azure_api_version": None,
+    "llm_model": None,
     "llm_temperature": 0.0, #Value from 0-1, lower value gives predictable and stable results, higher value gives random results.
     "llm_max_tokens": 1000,
     "use_llm_extract": True,
+    "llm_gate": True, #Skip the LLM (or ask only for the gaps) when regex already found valid values for llm_required_fields.
+    "llm_gate_targeted": True, #False = any gap sends the normal full extraction prompt.
+    "llm_gate_eval": True, #A "skip" gate also skips the llm_evaluate call, so clean documents make no LLM call at all (their recommendation stays "needs review"). False = always evaluate.
+    "llm_required_fields": ["tender_id", "title", "issuing_authority", "publication_date", "submission_deadline",
+                            "bid_opening_date", "emd", "tender_fee"],
+    "llm_extract_mode": "anchors", #full = first llm_prompt_max_chars of the document; anchors = labelled windows + document opening; chunks = whole document, map-reduce.
+    "llm_prompt_max_chars": 15000, #Hard cap on document text sent per extraction prompt.
+    "llm_anchor_windows_per_field": 2,
+    "llm_anchor_span_lines": 6, #Lines kept above and below each anchor hit.
+    "llm_anchor_lead_chars": 3000, #Document opening always included (title, scope, summary live there).
+    "llm_chunk_chars": 6000, #Chunk size for llm_extract_mode = "chunks".
+    "llm_chunk_overlap": 400,
+    "llm_max_chunks": 16, #Longer documents only send their first N chunks.
+    "llm_max_concurrency": 4, #Concurrent LLM requests (shared thread pool).
+    "llm_request_timeout_s": 60, #Per-request timeout; a chunk that times out is dropped from the merge.
+    "use_llm_cache": True, #Reuse LLM responses for identical (model, parameters, prompt) requests.
+    "llm_cache_path": "./Outputs/Cache/llm_cache.sqlite",
+    "llm_cache_ttl_days": 30, #0 = entries never expire.
+    "llm_cache_max_entries": 20000,
     "use_llm_eval": True,
     "use_llm_summary": True,
     "tesseract_cmd": r"C:/Program Files/Tesseract-OCR/tesseract.exe",
+    "ocr_dpi_tiers": [200, 300], #Adaptive OCR renders at the first DPI and only retries higher tiers on low confidence.
+    "ocr_min_confidence": 70, #Mean Tesseract word confidence (0-100) accepted without a higher-DPI retry.
+    "ocr_binarize": True, #Grayscale + Otsu threshold before OCR.
+    "ocr_region_min_area": 0.05, #On pages with a text layer, only image blocks covering >= this share of the page are OCR'd.
+    "ocr_min_text_chars": 15, #Pages with a shorter text layer are treated as scanned and OCR'd.
+    "parallel_extract": True, #Fan PDF pages out to a process pool instead of reading them one by one.
+    "extract_workers": max(1, (os.cpu_count() or 2) - 1),
+    "parallel_min_pages": 4, #Smaller documents are read serially; the pool overhead is not worth it.
+    "page_timeout_s": 120, #Max seconds to wait for a single page before giving up on it.
+    "ocr_timeout_s": 90, #Max seconds per Tesseract call; the process is killed and the page counts as failed (frees the pool slot).
+    "pipeline_cpu_workers": 2, #Documents in the extraction/OCR stage at once (their pages share the page pool).
+    "pipeline_io_workers": 4, #Documents in the LLM/write stage at once.
+    "stream_stop_early": True, #Stop reading/OCR'ing pages once every regex field is found (only when LLM extraction is off).
+    "use_extract_cache": True, #Skip extraction/OCR for documents and scanned pages seen before.
+    "extract_cache_dir": "./Outputs/Cache/extract",
+    "extract_cache_max_mb": 512,
     "uploads_dir": "./uploads",
     "extraction_output_dir": "./Outputs/Extractions",
+    "use_vector_index": True, #Chunk and embed every processed tender into the persistent Chroma index.
+    "vector_db_dir": "./Outputs/Vectors",
+    "vector_chunk_chars": 1500,
+    "vector_chunk_overlap": 200,
+    "embed_batch_size": 64,
+    "embed_backend": "torch", #"torch" (PyTorch fp32), "torch-int8" (dynamic int8 quantized) or "onnx" (ONNX Runtime); see bench_embeddings.py.
+    "embed_model": "all-MiniLM-L6-v2", #sentence-transformers model for the torch backends.
+    "embed_cache": True, #Persist embeddings by content hash (float16, memory-mapped) so re-indexing and repeated queries skip inference.
+    "embed_cache_dir": "./Outputs/Cache/embeddings",
+    "rag_top_k": 8, #Chunks retrieved per chat question.
+    "rag_max_context_tokens": 1500, #Context budget per chat prompt, independent of how many tenders are selected.
+    "tiles_per_page": 24, #Dashboard tiles rendered per page (filtering/sorting runs server-side).
+    "use_hybrid_search": True, #Tile search ranks by BM25 + vector fusion instead of substring match.
+    "search_text_chars": 50000, #Document text indexed per tender for BM25 (fields are always indexed).
+    "search_candidates": 200, #Tenders kept from a hybrid search before filters/sort/paging.
+    "search_vector_k": 100, #Chunks fetched from the vector index per search.
+    "search_rrf_k": 60, #Reciprocal-rank fusion damping constant.
+    "search_refresh_s": 10, #How often a search picks up tenders stored by other processes (workers, other gunicorn workers).
+    "dedupe_uploads": True, #Uploads whose bytes were processed before reuse the stored extraction (no OCR/LLM).
     "FONT_FAMILY": "Inter, sans-serif",
-    "progress_file": "./uploads/progress.json",
-    "pending_results_file": "./uploads/pending_results.json",
+    "job_db": "./Outputs/Jobs/jobs.sqlite", #Durable batch queue: per-document state, results, resume after restart.
+    "job_lease_s": 900, #A document claimed longer than this without a heartbeat is handed to another worker.
+    "job_poll_s": 1.0,
+    "job_max_attempts": 3, #A document whose lease expired this many times (it keeps crashing its worker) is marked failed.
+    "tender_db": "./Outputs/Tenders/tenders.sqlite", #Full tender records; the browser only keeps keys + tile fields.
+    "warm_up": True, #After the first request, initialise the LLM client, vector store/embedding model and OCR workers in the background; False = on first use.
     "debug_logs": True,
 }
 
@@ -155,15 +233,20 @@ body {{
 }}
 """
 
-with open(css_path, "w", encoding="utf-8") as _f:
-    _f.write(css_text)
+def _read_text(path: str) -> str:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return f.read()
+    except OSError:
+        return ""
+
+
+if _read_text(css_path) != css_text:  # rewriting on every import would trip the Dash asset reloader
+    with open(css_path, "w", encoding="utf-8") as _f:
+        _f.write(css_text)
 
 
 os.makedirs(CONFIG.get("uploads_dir", "./uploads"), exist_ok=True)
-progress_dir = os.path.dirname(CONFIG.get("progress_file", "./uploads/progress.json")) or CONFIG.get("uploads_dir", "./uploads")
-pending_dir = os.path.dirname(CONFIG.get("pending_results_file", "./uploads/pending_results.json")) or CONFIG.get("uploads_dir", "./uploads")
-os.makedirs(progress_dir, exist_ok=True)
-os.makedirs(pending_dir, exist_ok=True)
 os.makedirs(CONFIG.get("extraction_output_dir", "./Outputs/Extractions"), exist_ok=True)
 
 
@@ -232,6 +315,27 @@ OUTPUT FORMAT:
 - Return JSON only. No markdown, no commentary, no trailing text.
 """
 
+LLM_TARGETED_PROMPT = r"""
+You are an information extraction system. Read the TEXT and return exactly ONE JSON object with ONLY these keys:
+{schema}
+
+GLOBAL_HEADER (if provided):
+{global_header}
+
+TEXT (Page/Chunk = {page_reference}):
+{chunk_text}
+
+STRICT RULES:
+- If the field is not explicitly present, output "N/A" for strings and [] for arrays. DO NOT invent values.
+- Dates MUST be "DD-MM-YYYY". Times MUST be "HH:MM AM/PM".
+- Monetary fields (EMD, Tender Fee, Performance Guarantee) MUST be concise values ONLY (e.g., "₹ 70,000", "2%"). No sentences.
+- Issuing Authority: organization name ONLY (no address, no policy headers like MSME/Make in India/GeM).
+- tender_id: alphanumeric code labelled "Tender ID", "Tender No", "NIT No", "RFQ No" or similar.
+
+OUTPUT FORMAT:
+- Return JSON only. No markdown, no commentary, no trailing text.
+"""
+
 
 EVAL_PROMPT = """
 You are a business analyst. Based on the tender details below, assign:
@@ -537,60 +641,267 @@ def clean_text(text: str) -> str:
     return s
 
 
-def extract_text(file_bytes: bytes, filename: str) -> str:
+# --------------------
+# Extraction cache
+# --------------------
+# Bump when extraction/cleaning output changes so old cache entries stop matching.
+EXTRACT_CACHE_VERSION = "3"
+_EXTRACT_CACHE = None
+
+
+def get_extract_cache():
     """
-    Extract plain text from PDF, DOCX, or TXT documents.
+    Return the shared on-disk text/OCR cache, or None when disabled.
+
+    Documents are keyed by the SHA-256 of the file bytes; scanned pages by the hash
+    of their rendered pixmap (see page_extract.pixmap_key). Both live in the same
+    size-bounded LRU directory, CONFIG["extract_cache_dir"].
+    """
+    global _EXTRACT_CACHE
+    if not CONFIG.get("use_extract_cache"):
+        return None
+    if _EXTRACT_CACHE is None:
+        _EXTRACT_CACHE = DiskLRUCache(CONFIG["extract_cache_dir"], _extract_cache_max_bytes())
+    return _EXTRACT_CACHE
+
+
+def _extract_cache_max_bytes() -> int:
+    return int(CONFIG.get("extract_cache_max_mb", 512)) * 1024 * 1024
+
+
+def _doc_cache_key(file_bytes: bytes, filename: str) -> str:
+    ext = os.path.splitext(filename.lower())[1]
+    ocr = {k: v for k, v in ocr_settings().items() if k != "timeout_s"}  # a time limit does not change the text
+    settings = json.dumps([ocr, CONFIG.get("ocr_min_text_chars", 15)], sort_keys=True)
+    return sha256_text("doc", EXTRACT_CACHE_VERSION, ext, settings, sha256_bytes(file_bytes))
+
+
+# --------------------
+# Page-parallel PDF extraction
+# --------------------
+def ocr_settings() -> dict:
+    """OCR options handed to page_extract (see page_extract.DEFAULT_OCR)."""
+    return {
+        "dpi_tiers": list(CONFIG.get("ocr_dpi_tiers") or [300]),
+        "min_confidence": CONFIG.get("ocr_min_confidence", 70),
+        "binarize": bool(CONFIG.get("ocr_binarize", True)),
+        "region_min_area": CONFIG.get("ocr_region_min_area", 0.05),
+        "timeout_s": CONFIG.get("ocr_timeout_s", 0),
+    }
+
+_PAGE_POOL = None
+_PAGE_POOL_LOCK = threading.Lock()
+
+
+def get_page_pool() -> ProcessPoolExecutor:
+    """
+    Return the shared, bounded process pool used for per-page text/OCR work.
+    The pool is created on first use and sized by CONFIG["extract_workers"].
+    """
+    global _PAGE_POOL
+    with _PAGE_POOL_LOCK:
+        if _PAGE_POOL is None:
+            _PAGE_POOL = ProcessPoolExecutor(
+                max_workers=max(1, int(CONFIG.get("extract_workers", 1))),
+                initializer=page_extract.init_worker,
+                initargs=(CONFIG.get("tesseract_cmd") or "",),
+            )
+        return _PAGE_POOL
+
+
+def _reset_page_pool():
+    global _PAGE_POOL
+    with _PAGE_POOL_LOCK:
+        if _PAGE_POOL is not None:
+            _PAGE_POOL.shutdown(wait=False, cancel_futures=True)
+        _PAGE_POOL = None
+
+
+def _iter_pdf_pages_parallel(file_bytes: bytes, page_count: int, failures: List[int]) -> Iterator[str]:
+    """
+    Extract every page of a PDF on the process pool, yielding page texts in page order.
+
+    All pages are submitted up front and yielded as soon as the next page in order is
+    ready. Workers open the document from a temp file (only the path is shipped per
+    task). A page that exceeds CONFIG["page_timeout_s"] or fails is logged and yielded
+    empty. Closing the generator early cancels the pages not yet started.
+    """
+    ocr = ocr_settings()
+    min_chars = CONFIG.get("ocr_min_text_chars", 15)
+    timeout = CONFIG.get("page_timeout_s") or None
+    cache_dir = CONFIG["extract_cache_dir"] if get_extract_cache() is not None else ""
+
+    with tempfile.NamedTemporaryFile(delete=False, suffix=".pdf") as tmp:
+        tmp.write(file_bytes)
+        tmp_path = tmp.name
+    futures = []
+    try:
+        pool = get_page_pool()
+        futures = [pool.submit(page_extract.extract_page_worker, tmp_path, i, min_chars, ocr,
+                               cache_dir, _extract_cache_max_bytes())
+                   for i in range(page_count)]
+        for i, fut in enumerate(futures):
+            ptext = ""
+            try:
+                ptext = fut.result(timeout=timeout) or ""
+            except FutureTimeoutError:
+                fut.cancel()
+                failures.append(i)
+                log(f"Page {i + 1}/{page_count} timed out after {timeout}s; skipped")
+            except BrokenProcessPool:
+                _reset_page_pool()
+                raise
+            except Exception as e:
+                failures.append(i)
+                log(f"Page {i + 1}/{page_count} extraction failed: {e}")
+            yield ptext
+    finally:
+        for f in futures:
+            f.cancel()
+        try:
+            os.remove(tmp_path)
+        except Exception:
+            pass
+
+
+def iter_pdf_pages(file_bytes: bytes, failures: List[int] = None) -> Iterator[str]:
+    """
+    Lazily yield the text of each PDF page (text layer and/or OCR), in page order.
+
+    Documents with at least CONFIG["parallel_min_pages"] pages are spread over the
+    page process pool when CONFIG["parallel_extract"] is on; everything else is read
+    serially in-process. If the pool breaks mid-document, the remaining pages are
+    read serially.
+
+    Args:
+        file_bytes (bytes): Binary content of the PDF.
+        failures (list): Optional list that collects indices of pages that timed out or failed.
+
+    Yields:
+        str: Page text.
+    """
+    failures = failures if failures is not None else []
+    doc = fitz.open(stream=file_bytes, filetype="pdf")
+    try:
+        page_count = doc.page_count
+        next_page = 0
+        if CONFIG.get("parallel_extract") and page_count >= CONFIG.get("parallel_min_pages", 4):
+            try:
+                for ptext in _iter_pdf_pages_parallel(file_bytes, page_count, failures):
+                    next_page += 1
+                    yield ptext
+                return
+            except BrokenProcessPool as e:
+                log(f"Page pool broke ({e}); reading pages {next_page + 1}-{page_count} serially")
+        ocr = ocr_settings()
+        min_chars = CONFIG.get("ocr_min_text_chars", 15)
+        cache = get_extract_cache()
+        for i in range(next_page, page_count):
+            try:
+                yield page_extract.page_text(doc[i], min_chars=min_chars, cache=cache, ocr=ocr)
+            except page_extract.OCRTimeout as e:
+                failures.append(i)
+                log(f"Page {i + 1}/{page_count} OCR failed: {e}; skipped")
+                yield ""
+    finally:
+        doc.close()
+
+
+def extract_pdf_pages(file_bytes: bytes, failures: List[int] = None) -> List[str]:
+    """Extract all PDF pages at once (see iter_pdf_pages)."""
+    return list(iter_pdf_pages(file_bytes, failures))
+
+
+def iter_document_pages(file_bytes: bytes, filename: str) -> Iterator[str]:
+    """
+    Stream cleaned page texts of a PDF, DOCX, or TXT document.
+
+    Pages are extracted and cleaned one at a time, so consumers (regex fields, header
+    detection) can work incrementally and stop reading - and OCR'ing - once they have
+    what they need. DOCX/TXT documents are yielded as a single page.
 
     Uses:
-    - PyMuPDF (fitz) for textual PDFs
+    - PyMuPDF (fitz) for textual PDFs, page-parallel for larger documents
     - pytesseract for OCR on scanned PDFs
     - docx2txt for Word files
 
+    A fully-read document is stored in the extraction cache; documents read only
+    partially or with failed pages are not.
+
     Args:
         file_bytes (bytes): Binary content of file.
         filename (str): Original filename for detection.
 
-    Returns:
-        str: Extracted text.
+    Yields:
+        str: Cleaned page text.
     """
+    cache = get_extract_cache()
+    cache_key = _doc_cache_key(file_bytes, filename) if cache is not None and file_bytes else None
+    if cache_key:
+        hit = cache.get(cache_key)
+        if hit is not None:
+            log(f"Extraction cache hit: {filename}")
+            yield from hit.get("pages", [])
+            return
+
     name = filename.lower()
-    text = ""
+    pages = []
+    failed_pages = []
     if name.endswith(".pdf") and fitz is not None:
         try:
-            doc = fitz.open(stream=file_bytes, filetype="pdf")
-            for page in doc:
-                ptext = page.get_text("text").strip()
-                if ptext and len(ptext) >= 15:
-                    text += ptext + "\n"
-                else:
-                    pix = page.get_pixmap(dpi=300)
-                    img_bytes = pix.tobytes("png")
-                    image = Image.open(io.BytesIO(img_bytes))
-                    text += pytesseract.image_to_string(image, lang="eng") + "\n"
-            doc.close()
+            for ptext in iter_pdf_pages(file_bytes, failed_pages):
+                ptext = clean_text(ptext)
+                pages.append(ptext)
+                yield ptext
         except Exception as e:
             print("PDF extraction failed:", e)
-            text = ""
-    elif name.endswith(".docx") or name.endswith(".doc"):
-        try:
-            with tempfile.NamedTemporaryFile(delete=False, suffix=".docx") as tmp:
-                tmp.write(file_bytes)
-                tmp.flush()
-                text = docx2txt.process(tmp.name) or ""
-        except Exception as e:
-            print("DOCX extract failed:", e)
-            text = ""
+            failed_pages.append(-1)
     else:
+        text = ""
+        if name.endswith(".docx") or name.endswith(".doc"):
+            try:
+                with tempfile.NamedTemporaryFile(delete=False, suffix=".docx") as tmp:
+                    tmp.write(file_bytes)
+                    tmp.flush()
+                    import docx2txt
+                    text = docx2txt.process(tmp.name) or ""
+            except Exception as e:
+                print("DOCX extract failed:", e)
+                text = ""
+        else:
+            try:
+                text = file_bytes.decode(errors="ignore")
+            except Exception:
+                text = ""
+                print("=== DEBUG: RAW EXTRACTED TEXT ===")
+                print("LENGTH:", len(text))
+                print("SAMPLE:", text[:500])
+                print("================================")
+        text = clean_text(text)
+        if text:
+            pages.append(text)
+            yield text
+
+    # Partial results (timed-out/failed pages) are not cached so the next upload retries them
+    if cache_key and pages and not failed_pages:
         try:
-            text = file_bytes.decode(errors="ignore")
-        except Exception:
-            text = ""
-            print("=== DEBUG: RAW EXTRACTED TEXT ===")
-            print("LENGTH:", len(text))
-            print("SAMPLE:", text[:500])
-            print("================================")
+            cache.set(cache_key, {"pages": pages})
+        except Exception as e:
+            log(f"Extraction cache write failed: {e}")
+
+
+def extract_text(file_bytes: bytes, filename: str) -> str:
+    """
+    Extract plain text from PDF, DOCX, or TXT documents.
+
+    Args:
+        file_bytes (bytes): Binary content of file.
+        filename (str): Original filename for detection.
 
-    return clean_text(text)
+    Returns:
+        str: Extracted text (cleaned pages joined by newlines).
+    """
+    return "\n".join(iter_document_pages(file_bytes, filename))
 
 
 # --- Improved regex patterns ---
@@ -615,6 +926,12 @@ REGEX_PATTERNS = {
 }
 
 
+COMPILED_REGEX_PATTERNS = {
+    field: re.compile(pattern, re.I if field in ("contact_emails", "contact_phones") else re.I | re.S)
+    for field, pattern in REGEX_PATTERNS.items()
+}
+
+
 BANNED_SNIPPETS = [
     "msme", "mse procurement", "public procurement", "make in india", "gem", "physical form",
     "drawn in favour", "bank", "ifsc", "dd/", "bg", "cheque", "demand draft",
@@ -626,66 +943,404 @@ BANNED_SNIPPETS = [
 
 
 
-def regex_extract(text: str) -> Dict[str, Any]:
-    """
-    Robust regex extraction with priority handling for Tender ID and Dates.
-    Works for multiline text and multiple date formats.
+# Priority Tender ID labels, tried in order (first pattern with a valid hit wins)
+TENDER_ID_PATTERNS = [re.compile(p, re.I | re.S) for p in (
+    r"Tender\s*(?:Ref\.?|ID|No\.?|Reference|Number)\s*[:\-]?\s*([A-Za-z0-9_\/\-\.\(\)]{3,})",
+    r"NIT\s*No\.?\s*[:\-]?\s*([A-Za-z0-9_\/\-\.\(\)]{3,})",
+    r"e-?Tender\s*(?:No\.|ID|Reference)\s*[:\-]?\s*([A-Za-z0-9_\/\-\.\(\)]{3,})",
+    r"Bid\s*(?:No\.|ID|Reference)\s*[:\-]?\s*([A-Za-z0-9_\/\-\.\(\)]{3,})",
+    r"RFQ\s*No\.?\s*[:\-]?\s*([A-Za-z0-9_\/\-\.\(\)]{3,})",
+)]
+# Fallback generic tender ID if no labelled one is found
+TENDER_ID_FALLBACK = re.compile(r"\b[A-Z]{2,}-\d+\b")
+
+# Publication date, tried in order
+PUBLICATION_DATE_PATTERNS = [re.compile(p, re.I | re.S) for p in (
+    # Explicit labels
+    r"(?:Publication\s*Date|Bid\s*Calling\s*Date|Date\s*of\s*Issue|Advertised\s*Date)\s*[:\-]?\s*([0-3]?\d[./-][0-1]?\d[./-]\d{2,4})",
+    # Generic numeric date
+    r"\b([0-3]?\d[./-][0-1]?\d[./-]\d{2,4})\b",
+    # Textual month date e.g., 19 Jan 2026
+    r"\b([0-3]?\d\s*(?:Jan|January|Feb|February|Mar|March|Apr|April|May|Jun|June|Jul|July|Aug|August|Sep|Sept|September|Oct|October|Nov|November|Dec|December)\s*\d{4})\b",
+)]
+
+LIST_FIELDS = ("contact_emails", "contact_phones")
+
+
+# --------------------
+# Multi-field regex scanner
+# --------------------
+# Lowercase literals that every match of a labelled pattern starts with. The scanner
+# finds all of them in one pass and only tries the field patterns at those offsets.
+# A pattern without an entry here is still scanned, just with a plain finditer.
+SCANNER_LABEL_HEADS = {
+    "tender_id#0": ["tender"],
+    "tender_id#1": ["nit"],
+    "tender_id#2": ["etender", "e-tender"],
+    "tender_id#3": ["bid"],
+    "tender_id#4": ["rfq"],
+    "publication_date#0": ["publication", "bid", "date", "advertised"],
+    "tender_id": ["tender", "nit", "etender", "e-tender", "rfq"],
+    "title": ["name", "title", "project"],
+    "issuing_authority": ["issu", "organization", "department", "office"],
+    "publication_date": ["bid", "publication", "date"],
+    "submission_deadline": ["last", "bid"],
+    "bid_opening_date": ["bid", "opening"],
+    "bid_opening_time": ["opening", "time"],
+    "emd": ["emd", "earnest"],
+    "tender_fee": ["bid", "tender", "document"],
+    "performance_guarantee": ["performance"],
+    "contract_duration": ["contract", "period", "duration"],
+    "tender_value": ["estimated", "tender", "project", "approx"],
+}
+
+# Length-preserving case fold matching what re.IGNORECASE treats as ASCII letters
+_LABEL_FOLD = str.maketrans({**{chr(c): chr(c + 32) for c in range(65, 91)},
+                             "\u0130": "i", "\u0131": "i", "\u017f": "s", "\u212a": "k"})
+_DIGIT_RUN = re.compile(r"\d+")
+_EMAIL_CHAR = re.compile(r"[A-Za-z0-9._%+-]", re.I)
+
+
+class FieldScanner:
     """
-    extracted = {}
+    Precompiled scanner that finds every candidate of every regex field in a few passes.
 
-    # ---------- Priority: Tender ID ----------
-    tender_id_patterns = [
-        r"Tender\s*(?:Ref\.?|ID|No\.?|Reference|Number)\s*[:\-]?\s*([A-Za-z0-9_\/\-\.\(\)]{3,})",
-        r"NIT\s*No\.?\s*[:\-]?\s*([A-Za-z0-9_\/\-\.\(\)]{3,})",
-        r"e-?Tender\s*(?:No\.|ID|Reference)\s*[:\-]?\s*([A-Za-z0-9_\/\-\.\(\)]{3,})",
-        r"Bid\s*(?:No\.|ID|Reference)\s*[:\-]?\s*([A-Za-z0-9_\/\-\.\(\)]{3,})",
-        r"RFQ\s*No\.?\s*[:\-]?\s*([A-Za-z0-9_\/\-\.\(\)]{3,})",
-    ]
+    - Labelled fields: one pass over the case-folded text finds all label heads
+      (SCANNER_LABEL_HEADS); each field pattern is then only `.match()`ed at heads it
+      can start with.
+    - Generic dates and the fallback tender ID: anchored on a single digit-run pass.
+    - Phones: the phone pattern only runs inside clusters of nearby digit runs.
+    - Emails: anchored on '@'.
 
-    for pat in tender_id_patterns:
-        m = re.search(pat, text, re.I | re.S)  # <-- Added re.S for multiline
-        if m:
-            tender_id_candidate = m.group(1).strip()
-            if len(tender_id_candidate) >= 3 and tender_id_candidate.upper() != "N/A":
-                extracted["tender_id"] = tender_id_candidate
-                break
+    Every anchor is a position the original pattern must start at (or a window it
+    must lie in), so the candidates are exactly what the individual patterns find.
 
-    # Fallback generic tender ID if nothing found
-    if "tender_id" not in extracted:
-        fallback = re.findall(r"\b[A-Z]{2,}-\d+\b", text)
-        if fallback:
-            extracted["tender_id"] = fallback[0]
-
-    # ---------- Priority: Publication Date ----------
-    date_label_patterns = [
-        # Explicit labels
-        r"(?:Publication\s*Date|Bid\s*Calling\s*Date|Date\s*of\s*Issue|Advertised\s*Date)\s*[:\-]?\s*([0-3]?\d[./-][0-1]?\d[./-]\d{2,4})",
-        # Generic numeric date
-        r"\b([0-3]?\d[./-][0-1]?\d[./-]\d{2,4})\b",
-        # Textual month date e.g., 19 Jan 2026
-        r"\b([0-3]?\d\s*(?:Jan|January|Feb|February|Mar|March|Apr|April|May|Jun|June|Jul|July|Aug|August|Sep|Sept|September|Oct|October|Nov|November|Dec|December)\s*\d{4})\b"
-    ]
+    `scan()` returns {spec name: [(offset, value), ...]} in document order. Specs in
+    `list_specs` follow findall() semantics (non-overlapping); the others report a
+    candidate at every label occurrence.
+    """
 
-    for pat in date_label_patterns:
-        m = re.search(pat, text, re.I | re.S)
-        if m:
-            date_str = m.group(1).strip()
-            extracted["publication_date"] = date_str
-            break
+    def __init__(self, specs: Dict[str, "re.Pattern"], list_specs=(), digit_specs=(), fallback_id_spec: str = ""):
+        self.specs = dict(specs)
+        self.list_specs = set(list_specs)
+        self.digit_specs = [n for n in digit_specs if n in self.specs]
+        self.fallback_id_spec = fallback_id_spec if fallback_id_spec in self.specs else ""
+        self.by_head: Dict[str, List[str]] = {}
+        for name, heads in SCANNER_LABEL_HEADS.items():
+            if name in self.specs:
+                for h in heads:
+                    self.by_head.setdefault(h, []).append(name)
+        self.unindexed = [n for n in self.specs
+                          if n not in SCANNER_LABEL_HEADS and n not in self.digit_specs
+                          and n != self.fallback_id_spec and n not in ("contact_emails", "contact_phones")]
+        heads = sorted(self.by_head, key=len, reverse=True)
+        self._heads_re = re.compile("(?=(" + "|".join(re.escape(h) for h in heads) + "))")
+
+    @staticmethod
+    def _value(m) -> str:
+        return (m.group(1) if m.re.groups else m.group(0)).strip()
+
+    def scan(self, text: str, want=None) -> Dict[str, List[Tuple[int, str]]]:
+        want = set(self.specs) if want is None else set(want) & set(self.specs)
+        out: Dict[str, List[Tuple[int, str]]] = {n: [] for n in want}
+        if not text or not want:
+            return out
+
+        # Pass 1: label heads
+        plan = {h: [(n, self.specs[n], out[n]) for n in names if n in want] for h, names in self.by_head.items()}
+        if any(plan.values()):
+            folded = text.translate(_LABEL_FOLD)
+            for hm in self._heads_re.finditer(folded):
+                pos = hm.start()
+                for name, pat, found in plan[hm.group(1)]:
+                    m = pat.match(text, pos)
+                    if m:
+                        found.append((pos, self._value(m)))
+
+        # Pass 2: digit runs (dates, fallback IDs, phone clusters)
+        need_digits = [n for n in self.digit_specs if n in want]
+        fallback = self.fallback_id_spec if self.fallback_id_spec in want else ""
+        phones = "contact_phones" in want and "contact_phones" in self.specs
+        if need_digits or fallback or phones:
+            clusters = []
+            for dm in _DIGIT_RUN.finditer(text):
+                start, end = dm.span()
+                for name in need_digits:
+                    m = self.specs[name].match(text, start)
+                    if m:
+                        out[name].append((start, self._value(m)))
+                if fallback and start >= 3 and text[start - 1] == "-":
+                    k = start - 2
+                    while k >= 0 and "A" <= text[k] <= "Z":
+                        k -= 1
+                    if start - 2 - k >= 2:
+                        m = self.specs[fallback].match(text, k + 1)
+                        if m:
+                            out[fallback].append((k + 1, self._value(m)))
+                if phones:
+                    # runs at most 2 chars apart can belong to one phone number
+                    if clusters and start - clusters[-1][1] <= 2:
+                        clusters[-1][1] = end
+                    else:
+                        clusters.append([start, end])
+            if phones:
+                pat = self.specs["contact_phones"]
+                for lo, hi in clusters:
+                    for m in pat.finditer(text, max(0, lo - 1), min(len(text), hi + 1)):
+                        out["contact_phones"].append((m.start(), m.group(0).strip()))
+
+        # Pass 3: emails, anchored on '@'
+        if "contact_emails" in want and "contact_emails" in self.specs:
+            pat = self.specs["contact_emails"]
+            last_end = 0
+            at = text.find("@")
+            while at != -1:
+                if at >= last_end:
+                    start = at
+                    while start > last_end and _EMAIL_CHAR.match(text[start - 1]):
+                        start -= 1
+                    m = pat.match(text, start)
+                    if m:
+                        out["contact_emails"].append((start, m.group(0).strip()))
+                        last_end = m.end()
+                at = text.find("@", at + 1)
+
+        # Anything without an anchor rule
+        for name in self.unindexed:
+            if name in want:
+                out[name] = [(m.start(), self._value(m)) for m in self.specs[name].finditer(text)]
+        return out
+
+
+def _build_field_scanner() -> FieldScanner:
+    specs = {f"tender_id#{i}": p for i, p in enumerate(TENDER_ID_PATTERNS)}
+    specs["tender_id#fallback"] = TENDER_ID_FALLBACK
+    specs.update({f"publication_date#{i}": p for i, p in enumerate(PUBLICATION_DATE_PATTERNS)})
+    specs.update(COMPILED_REGEX_PATTERNS)
+    return FieldScanner(specs, list_specs=LIST_FIELDS,
+                        digit_specs=("publication_date#1", "publication_date#2"),
+                        fallback_id_spec="tender_id#fallback")
+
+
+FIELD_SCANNER = _build_field_scanner()
+
+
+class RegexFieldStream:
+    """
+    Incremental regex extraction over a stream of pages.
+
+    Feed cleaned pages in document order with `feed()`; `result()` returns the same
+    dict as `regex_extract` on the joined text. The free-text fields in LINE_FIELDS
+    ("Title: ...", "Issued By: ...") are cut at the end of their line: their `(.+)`
+    patterns run under re.S, so uncut they would reach the end of the page when
+    streamed but the end of the document when joined. Matching is done by FIELD_SCANNER and
+    only for fields not decided yet, and `feed()` returns True once every field is
+    filled (list fields count once they have an entry) so callers can stop reading
+    pages early. The first ~6000 chars are also kept for `header()`.
+
+    Besides the first hit, every labelled candidate is kept with its document offset
+    (`candidates()`), so later stages can rank alternatives instead of trusting the
+    first match. Candidates are capped per pattern, so a run of unlabelled fallback
+    hits (standard codes, drawing numbers) cannot crowd out a later labelled ID.
+    """
+
+    # Chars of the previous page re-scanned with the next one, for labels split across pages
+    OVERLAP = 200
+    HEADER_CHARS = 6000
+    MAX_CANDIDATES = 20
+    LINE_FIELDS = ("title", "issuing_authority")
+
+    def __init__(self):
+        self._first: Dict[str, str] = {}
+        self._lists: Dict[str, List[str]] = {f: [] for f in LIST_FIELDS}
+        self._cands: Dict[str, List[Tuple[int, str]]] = {}
+        self._seen = set()
+        self._tail = ""
+        self._offset = 0
+        self._head: List[str] = []
+        self._head_len = 0
+        self._header = None
+        self.pages_seen = 0
+
+    def _ordered(self, prefix: str, n: int, valid=lambda v: True):
+        """(done, value) for an ordered pattern list: done once the winning pattern is known."""
+        for i in range(n):
+            v = self._first.get(f"{prefix}#{i}")
+            if v is None:
+                return False, None
+            if valid(v):
+                return True, v
+        return True, None
+
+    @staticmethod
+    def _tid_valid(v: str) -> bool:
+        return len(v) >= 3 and v.upper() != "N/A"
+
+    def _tid(self):
+        return self._ordered("tender_id", len(TENDER_ID_PATTERNS), self._tid_valid)
+
+    def _date(self):
+        return self._ordered("publication_date", len(PUBLICATION_DATE_PATTERNS))
+
+    @staticmethod
+    def _line_value(field: str, v: str) -> str:
+        # same cut as build_global_header, so the value passes regex_value_valid
+        if field == "issuing_authority":
+            return re.split(r"\n|,? *Address", v)[0].strip()
+        return v.split("\n", 1)[0].strip()
+
+    def _wanted(self) -> set:
+        # Labelled specs keep running (cheap once the label-head pass is done) so every
+        # candidate is collected; unlabelled fallbacks stop once the field is decided.
+        want = set()
+        tid_done, tid = self._tid()
+        for i in range(len(TENDER_ID_PATTERNS)):
+            want.add(f"tender_id#{i}")
+        if not tid and "tender_id#fallback" not in self._first:
+            want.add("tender_id#fallback")
+        date_done, _ = self._date()
+        for i in range(len(PUBLICATION_DATE_PATTERNS)):
+            name = f"publication_date#{i}"
+            if name in SCANNER_LABEL_HEADS or (not date_done and name not in self._first):
+                want.add(name)
+        for field in COMPILED_REGEX_PATTERNS:
+            if field in LIST_FIELDS or len(self._cands.get(field, ())) < self.MAX_CANDIDATES:
+                want.add(field)
+        return want
+
+    def feed(self, page: str) -> bool:
+        if not page:
+            return self.filled()
+        self.pages_seen += 1
+        if self._head_len < self.HEADER_CHARS:
+            self._head.append(page)
+            self._head_len += len(page) + 1
+
+        chunk = (self._tail + "\n" + page) if self._tail else page
+        base = self._offset - (len(self._tail) + 1 if self._tail else 0)
+        tail = page[-self.OVERLAP:]
+        nl = tail.find("\n")
+        self._tail = tail[nl + 1:] if 0 <= nl < len(tail) - 1 else tail
+        self._offset += len(page) + 1
+
+        for name, hits in FIELD_SCANNER.scan(chunk, self._wanted()).items():
+            if not hits:
+                continue
+            field = name.split("#")[0]
+            if field in self.LINE_FIELDS:
+                hits = [(pos, self._line_value(field, v)) for pos, v in hits]
+            if field in LIST_FIELDS:
+                found = self._lists[field]
+                for _, v in hits:
+                    if v and v not in found:
+                        found.append(v)
+                continue
+            if name not in self._first:
+                self._first[name] = hits[0][1]
+            cands = self._cands.setdefault(name, [])
+            for pos, v in hits:
+                key = (name, base + pos)
+                if key in self._seen or len(cands) >= self.MAX_CANDIDATES:
+                    continue
+                self._seen.add(key)
+                cands.append((base + pos, v))
+        return self.filled()
 
-    # ---------- Generic regex fields ----------
-    if "REGEX_PATTERNS" in globals():
-        for field, pattern in REGEX_PATTERNS.items():
+    def filled(self) -> bool:
+        if not self._tid()[0] or not self._date()[0]:
+            return False
+        for field in COMPILED_REGEX_PATTERNS:
+            if field in LIST_FIELDS:
+                if not self._lists[field]:
+                    return False
+            elif field not in self._first and field not in ("tender_id", "publication_date"):
+                return False
+        return True
+
+    def result(self) -> Dict[str, Any]:
+        extracted = {}
+        # ---------- Priority: Tender ID ----------
+        tid = next((self._first[f"tender_id#{i}"] for i in range(len(TENDER_ID_PATTERNS))
+                    if self._tid_valid(self._first.get(f"tender_id#{i}") or "")), None)
+        if tid:
+            extracted["tender_id"] = tid
+        elif self._first.get("tender_id#fallback"):
+            extracted["tender_id"] = self._first["tender_id#fallback"]
+        # ---------- Priority: Publication Date ----------
+        date_str = next((self._first[f"publication_date#{i}"] for i in range(len(PUBLICATION_DATE_PATTERNS))
+                         if f"publication_date#{i}" in self._first), None)
+        if date_str is not None:
+            extracted["publication_date"] = date_str
+        # ---------- Generic regex fields ----------
+        for field in COMPILED_REGEX_PATTERNS:
             if field in extracted:
                 continue
-            if field in ["contact_emails", "contact_phones"]:
-                matches = re.findall(pattern, text, flags=re.I)
-                extracted[field] = list(dict.fromkeys(m.strip() for m in matches if m and m.strip()))
+            if field in LIST_FIELDS:
+                extracted[field] = list(self._lists[field])
             else:
-                m = re.search(pattern, text, flags=re.I | re.S)
-                extracted[field] = m.group(1).strip() if m else ""
+                extracted[field] = self._first.get(field, "")
+        return extracted
+
+    def candidates(self) -> Dict[str, List[str]]:
+        """
+        All distinct candidate values per field, in document order.
+
+        Hits of unlabelled fallback patterns are kept apart under their spec name
+        (e.g. "tender_id#fallback") so they are never ranked against labelled ones.
+        """
+        grouped: Dict[str, List[Tuple[int, str]]] = {}
+        for name, cands in self._cands.items():
+            key = name if name.endswith("#fallback") else name.split("#")[0]
+            grouped.setdefault(key, []).extend(cands)
+        out = {}
+        for key, cands in grouped.items():
+            vals = []
+            for _, v in sorted(cands, key=lambda c: c[0]):
+                if v and v not in vals:
+                    vals.append(v)
+            out[key] = vals
+        return out
+
+    def header(self) -> dict:
+        """build_global_header() over the first pages seen."""
+        if self._header is None or self._head_len < self.HEADER_CHARS:
+            self._header = build_global_header("\n".join(self._head))
+        return self._header
+
+
+def regex_extract(text: str) -> Dict[str, Any]:
+    """
+    Robust regex extraction with priority handling for Tender ID and Dates.
+    Works for multiline text and multiple date formats.
+    """
+    stream = RegexFieldStream()
+    stream.feed(text)
+    return stream.result()
+
+
+def scan_document(pages: Iterable[str], stop_early: bool = False) -> Tuple["DocumentIndex", Dict[str, Any], dict, Dict[str, List[str]]]:
+    """
+    Consume a page stream once, running regex fields and header detection as pages arrive.
 
-    return extracted
+    Args:
+        pages (Iterable[str]): Cleaned pages in order (e.g. iter_document_pages()).
+        stop_early (bool): Stop reading (and OCR'ing) further pages once every regex
+            field is filled. The returned text then covers only the pages read.
+
+    Returns:
+        tuple: (DocumentIndex over the text read, keeping real page boundaries,
+                regex_extract-style dict, global header dict, candidates per field)
+    """
+    stream = RegexFieldStream()
+    read = []
+    for page in pages:
+        read.append(page)
+        if stream.feed(page) and stop_early:
+            log(f"All regex fields filled after {stream.pages_seen} pages; stopping early")
+            break
+    if hasattr(pages, "close"):
+        pages.close()
+    return DocumentIndex.from_pages(read), stream.result(), stream.header(), stream.candidates()
 
 
 
@@ -703,7 +1358,7 @@ def sanitize_amount_text(val: str) -> str:
     m_pct = re.search(r"(?i)\b(\d{1,3}(?:\.\d{1,2})?)\s*%(\b|$)", s)
     if m_pct:
         return f"{m_pct.group(1)}%"
-    m_amt = re.search(r"(?i)(₹|rs\.?|rupees)\s*([0-9][\d,\.]*)\s*(lacks?|lakhs?|lacs?|crores?)?", s)
+    m_amt = re.search(r"(?i)(₹|\brs\.?|\binr\b|\brupees)\s*(\.?[0-9][\d,\.]*)\s*(lacks?\b|lakhs?\b|lacs?\b|l\b|crores?\b|crs?\b)?", s)
     if m_amt:
         cur = "₹" if m_amt.group(1).lower().startswith("₹") else "Rs."
         num = m_amt.group(2)
@@ -720,6 +1375,88 @@ def sanitize_amount_text(val: str) -> str:
     return ""
 
 
+# --- Amount normalization (display string -> exact integer paise) ---
+# number, optional decimals, optional Indian unit, optional "%" (percentages are not amounts)
+_AMOUNT_TAIL = r"(?:\.(\d+))?\s*(lakhs?\b|lacks?\b|lacs?\b|l\b\.?|crores?\b|crs?\b\.?|thousand|million|mn\b)?(\s*%)?"
+AMOUNT_RE = re.compile(r"(?i)(?<!\d)(?<!\d\.)(\d[\d,]*)" + _AMOUNT_TAIL)
+# same groups, anchored on a currency marker; the whole part may be empty (".5 lakh")
+CURRENCY_AMOUNT_RE = re.compile(r"(?i)(?:₹|\brs\b\.?|\binr\b|\brupees\b)\s*[:\-]?\s*(\d[\d,]*|(?=\.\d))" + _AMOUNT_TAIL)
+AMOUNT_UNITS = {"l": 10**5, "c": 10**7, "t": 10**3, "m": 10**6}  # by first letter of the unit
+AMOUNT_MAX_DIGITS = 15  # longer digit runs are IDs/phone numbers, not rupee amounts
+
+
+def amount_to_paise(val: str) -> int:
+    """
+    Exact integer paise for a rupee amount string, or None.
+
+    Handles currency prefixes (₹/Rs./INR), Indian and western digit grouping, decimals,
+    and lakh/crore/thousand/million units: "Rs. 1,20,000/-" -> 12000000,
+    "₹ 5 Lakhs" -> 50000000, "Rs. 7.5 L" -> 75000000, "₹ .5 lakh" -> 5000000,
+    "2.5 Cr" -> 2500000000. When a currency marker is present the number after it is
+    used ("Tender ID 2024 Rs 500" -> 50000). Percentages ("2%") return None.
+    """
+    if val is None:
+        return None
+    m = CURRENCY_AMOUNT_RE.search(str(val)) or AMOUNT_RE.search(str(val))
+    if not m or m.group(4):
+        return None
+    whole = m.group(1).replace(",", "") or "0"
+    if len(whole) > AMOUNT_MAX_DIGITS:
+        return None
+    mult = AMOUNT_UNITS.get((m.group(3) or "")[:1].lower(), 1) * 100
+    frac = (m.group(2) or "")[:9]
+    paise = int(whole) * mult
+    if frac:
+        scale = 10 ** len(frac)
+        paise += (int(frac) * mult + scale // 2) // scale
+    return paise
+
+
+def amounts_to_paise(values) -> "pd.Series":
+    """
+    Vectorized `amount_to_paise` over many strings (nullable Int64 result).
+
+    One `str.extract` plus integer column arithmetic, so backfills and batch
+    aggregations over thousands of tenders avoid a Python-level loop per row.
+    """
+    import pandas as pd
+    s = pd.Series(values, dtype="object").fillna("").astype(str)
+    parts = s.str.extract(AMOUNT_RE)
+    cur = s.str.extract(CURRENCY_AMOUNT_RE)
+    has_cur = cur[0].notna()
+    parts.loc[has_cur] = cur.loc[has_cur]
+    whole = parts[0].str.replace(",", "", regex=False)
+    ok = whole.notna() & parts[3].isna() & (whole.str.len() <= AMOUNT_MAX_DIGITS)
+    whole = whole.where(ok & (whole != ""), "0").astype("int64")
+    mult = parts[2].fillna("").str[:1].str.lower().map(AMOUNT_UNITS).fillna(1).astype("int64") * 100
+    frac = parts[1].fillna("").str[:9]
+    scale = pd.Series(10, index=s.index, dtype="int64") ** frac.str.len().astype("int64")
+    frac_int = frac.where(frac != "", "0").astype("int64")
+    paise = whole * mult + (frac_int * mult + scale // 2) // scale
+    return paise.astype("Int64").where(ok, pd.NA)
+
+
+def format_inr_paise(paise: int, compact: bool = False) -> str:
+    """Paise -> "₹ 1,20,000" (Indian grouping) or, compact, "₹ 1.20 L" / "₹ 2.50 Cr"."""
+    try:
+        rupees = int(paise) / 100
+    except (TypeError, ValueError):  # None, NaN, pd.NA
+        return "N/A"
+    if compact and rupees >= 10**7:
+        return f"₹ {rupees / 10**7:.2f} Cr"
+    if compact and rupees >= 10**5:
+        return f"₹ {rupees / 10**5:.2f} L"
+    digits = str(int(round(rupees)))
+    head, tail = digits[:-3], digits[-3:]
+    groups = []
+    while len(head) > 2:
+        groups.insert(0, head[-2:])
+        head = head[:-2]
+    if head:
+        groups.insert(0, head)
+    return "₹ " + ",".join(groups + [tail])
+
+
 def regex_value_valid(field: str, value: str) -> bool:
     
     if not value or not str(value).strip():
@@ -786,6 +1523,12 @@ def build_client():
     Creates an LLM client (Azure or OpenAI) based on CONFIG["provider"].
 
     """
+    # Import OpenAI/Azure Client
+    try:
+        from openai import OpenAI, AzureOpenAI
+    except Exception:
+        OpenAI = None
+        AzureOpenAI = None
     if CONFIG["provider"] == "azure" and AzureOpenAI is not None:
         try:
             return AzureOpenAI(api_key=CONFIG["azure_api_key"], api_version=CONFIG["azure_api_version"], azure_endpoint=CONFIG["azure_endpoint"])
@@ -800,29 +1543,109 @@ def build_client():
             return None
     return None
 
-LLM_CLIENT = build_client()
+_LLM_CLIENT = None
+_LLM_CLIENT_BUILT = False
+_LLM_CLIENT_LOCK = threading.Lock()
+
+
+def get_llm_client():
+    """Shared LLM client, built on first use (reads the keys file first); None when unavailable."""
+    global _LLM_CLIENT, _LLM_CLIENT_BUILT
+    if _LLM_CLIENT_BUILT:
+        return _LLM_CLIENT
+    with _LLM_CLIENT_LOCK:
+        if not _LLM_CLIENT_BUILT:
+            if any(CONFIG.get(entry) is None for entry in KEY_CONFIG.values()):
+                load_keys()
+            _LLM_CLIENT = build_client()
+            _LLM_CLIENT_BUILT = True
+        return _LLM_CLIENT
+
+# --------------------
+# LLM Response Cache
+# --------------------
+_LLM_CACHE = None
+_LLM_CACHE_LOCK = threading.Lock()
+
+
+def get_llm_cache():
+    """Return the shared LLM response cache, or None when CONFIG["use_llm_cache"] is off."""
+    global _LLM_CACHE
+    if not CONFIG.get("use_llm_cache"):
+        return None
+    with _LLM_CACHE_LOCK:
+        if _LLM_CACHE is None:
+            try:
+                _LLM_CACHE = LLMResponseCache(
+                    CONFIG["llm_cache_path"],
+                    ttl_s=float(CONFIG.get("llm_cache_ttl_days") or 0) * 86400,
+                    max_entries=CONFIG.get("llm_cache_max_entries") or 0,
+                )
+            except Exception as e:
+                log(f"LLM cache disabled: {e}")
+                CONFIG["use_llm_cache"] = False
+                return None
+        return _LLM_CACHE
+
+
+def llm_chat(messages: List[Dict[str, str]], temperature: float, max_tokens: int, timeout: float = None) -> str:
+    """
+    Run one chat completion through the response cache.
+
+    The cache key covers provider, model, temperature, max_tokens and the exact messages,
+    so any prompt or parameter change is a fresh request. Only successful, non-empty
+    answers are stored; errors propagate to the caller as before.
+
+    Args:
+        messages (list): Chat messages.
+        temperature (float): Sampling temperature.
+        max_tokens (int): Completion token limit.
+        timeout (float): Optional per-request timeout in seconds.
+
+    Returns:
+        str: Stripped message content.
+    """
+    client = get_llm_client()
+    model = CONFIG["llm_model"]
+    cache = get_llm_cache()
+    key = None
+    if cache is not None:
+        key = sha256_text("chat", CONFIG.get("provider", ""), model, temperature, max_tokens,
+                          json.dumps(messages, ensure_ascii=False, sort_keys=True))
+        hit = cache.get(key)
+        if hit is not None:
+            return hit
+    kwargs = {"timeout": timeout} if timeout else {}
+    resp = client.chat.completions.create(model=model, messages=messages, temperature=temperature,
+                                          max_tokens=max_tokens, **kwargs)
+    content = (resp.choices[0].message.content or "").strip()
+    if key is not None and content:
+        try:
+            cache.set(key, content, model=model)
+        except Exception as e:
+            log(f"LLM cache write failed: {e}")
+    return content
 
 # --------------------
 # LLM Extraction
 # --------------------
 def llm_extract_chunk(chunk_text: str, page_reference: str = "all", categories: List[str] = None, global_header: dict = None) -> Dict[str, Any]:
-    if LLM_CLIENT is None or not CONFIG["use_llm_extract"]:
+    if get_llm_client() is None or not CONFIG["use_llm_extract"]:
         return {}
     try:
         cats = categories or list(ICON_STYLE_MAP.keys())
         prompt = LLM_PROMPT_TEMPLATE.format(
-            chunk_text=chunk_text[:15000],
+            chunk_text=chunk_text[:CONFIG.get("llm_prompt_max_chars", 15000)],
             categories=cats,
             page_reference=page_reference,
             global_header=json.dumps(global_header or {}, ensure_ascii=False)
         )
-        resp = LLM_CLIENT.chat.completions.create(
-            model=CONFIG["llm_model"],
-            messages=[{"role":"user","content": prompt}],
+        raw = llm_chat(
+            [{"role":"user","content": prompt}],
             temperature=CONFIG["llm_temperature"],
-            max_tokens=CONFIG["llm_max_tokens"]
+            max_tokens=CONFIG["llm_max_tokens"],
+            timeout=CONFIG.get("llm_request_timeout_s") or None
         )
-        raw = resp.choices[0].message.content.strip()
         s, e = raw.find("{"), raw.rfind("}")
         if s != -1 and e != -1:
             return json.loads(raw[s:e+1])
@@ -832,16 +1655,204 @@ def llm_extract_chunk(chunk_text: str, page_reference: str = "all", categories:
         return {}
 
 
+def llm_extract_fields(fields: List[str], chunk_text: str, page_reference: str = "all", global_header: dict = None) -> Dict[str, Any]:
+    """
+    Targeted extraction: ask the LLM only for `fields` (the gaps left by regex).
+
+    Returns:
+        dict: Raw LLM values, restricted to the requested fields.
+    """
+    if get_llm_client() is None or not CONFIG["use_llm_extract"] or not fields:
+        return {}
+    try:
+        schema = {f: ([] if f in ("contact_emails", "contact_phones", "projects") else "") for f in fields}
+        prompt = LLM_TARGETED_PROMPT.format(
+            schema=json.dumps(schema, indent=2),
+            chunk_text=chunk_text[:CONFIG.get("llm_prompt_max_chars", 15000)],
+            page_reference=page_reference,
+            global_header=json.dumps(global_header or {}, ensure_ascii=False)
+        )
+        raw = llm_chat(
+            [{"role":"user","content": prompt}],
+            temperature=CONFIG["llm_temperature"],
+            max_tokens=min(CONFIG["llm_max_tokens"], 80 * len(fields) + 100),
+            timeout=CONFIG.get("llm_request_timeout_s") or None
+        )
+        s, e = raw.find("{"), raw.rfind("}")
+        if s != -1 and e != -1:
+            d = json.loads(raw[s:e+1])
+            return {k: v for k, v in d.items() if k in schema}
+        return {}
+    except Exception as e:
+        print("LLM targeted extract error:", e)
+        return {}
+
+
+def llm_gate_decision(regex_data: Dict[str, Any], regex_candidates: Dict[str, List[str]] = None) -> dict:
+    """
+    Decide how much LLM extraction a document needs given what regex already found.
+
+    A required field counts as covered when `merge_candidates` (sanitizers plus
+    `regex_value_valid`) keeps a regex value for it without any LLM input.
+
+    Returns:
+        dict: {"decision": "skip" | "targeted" | "full", "reason": str, "required": [...], "missing": [...]}
+    """
+    required = list(CONFIG.get("llm_required_fields") or [])
+    if not CONFIG.get("llm_gate") or not required:
+        return {"decision": "full", "reason": "gate disabled", "required": required, "missing": required}
+    regex_only = merge_candidates(regex_data, {}, regex_candidates)
+    missing = [f for f in required if not regex_only.get(f)]
+    if not missing:
+        decision, reason = "skip", "regex found valid values for every required field"
+    elif CONFIG.get("llm_gate_targeted", True):
+        decision, reason = "targeted", f"regex missed {len(missing)} of {len(required)} required fields"
+    else:
+        decision, reason = "full", f"regex missed {len(missing)} of {len(required)} required fields (targeted mode off)"
+    return {"decision": decision, "reason": reason, "required": required, "missing": missing}
+
+
+# --------------------
+# Chunked LLM Extraction (map-reduce)
+# --------------------
+_LLM_POOL = None
+_LLM_POOL_LOCK = threading.Lock()
+
+LLM_LIST_FIELDS = ("contact_emails", "contact_phones", "projects")
+
+
+def get_llm_pool() -> ThreadPoolExecutor:
+    """
+    Return the shared thread pool for concurrent LLM requests.
+    Sized by CONFIG["llm_max_concurrency"] so all documents together stay under the provider's rate limit.
+    """
+    global _LLM_POOL
+    with _LLM_POOL_LOCK:
+        if _LLM_POOL is None:
+            _LLM_POOL = ThreadPoolExecutor(max_workers=max(1, int(CONFIG.get("llm_max_concurrency", 4))),
+                                           thread_name_prefix="llm")
+        return _LLM_POOL
+
+
+def _llm_value_present(v: Any) -> bool:
+    if isinstance(v, list):
+        return bool(v)
+    return isinstance(v, str) and v.strip() not in ("", "N/A", "NA", "n/a")
+
+
+def reduce_llm_chunks(chunk_results: List[Dict[str, Any]]) -> Tuple[Dict[str, Any], Dict[str, float]]:
+    """
+    Merge per-chunk LLM extractions field by field.
+
+    List fields are unioned in chunk order. For every other field the candidates that
+    survive `regex_value_valid` vote (case/whitespace-insensitive); the most frequent one
+    wins and ties go to the earliest chunk, which favours the document opening for
+    title/scope/summary. The field confidence is the winner's share of the chunks that
+    returned any value for that field.
+
+    Args:
+        chunk_results (list): postprocess_llm_json output of each chunk, in document order.
+
+    Returns:
+        tuple: (merged field dict, {field: confidence 0-1})
+    """
+    merged, confidence = {}, {}
+    keys = []
+    for r in chunk_results:
+        keys.extend(k for k in r.keys() if k not in keys)
+    for k in keys:
+        if k in LLM_LIST_FIELDS:
+            items = []
+            for r in chunk_results:
+                v = r.get(k)
+                for item in (v if isinstance(v, list) else []):
+                    if item not in items:
+                        items.append(item)
+            merged[k] = items
+            if items:
+                confidence[k] = 1.0
+            continue
+        votes, first_seen, answered = {}, {}, 0
+        for pos, r in enumerate(chunk_results):
+            v = r.get(k)
+            if not _llm_value_present(v):
+                continue
+            answered += 1
+            if isinstance(v, str) and not regex_value_valid(k, v) and k not in ("scope_of_work", "short_summary", "eligibility_summary", "required_documents"):
+                continue
+            norm = re.sub(r"\s+", " ", str(v)).strip().lower()
+            votes[norm] = votes.get(norm, 0) + 1
+            first_seen.setdefault(norm, (pos, v))
+        if not votes:
+            merged[k] = "N/A"
+            continue
+        best = max(votes, key=lambda n: (votes[n], -first_seen[n][0]))
+        merged[k] = first_seen[best][1]
+        confidence[k] = round(votes[best] / max(1, answered), 2)
+    return merged, confidence
+
+
+def llm_extract_chunks(text: str, global_header: dict = None) -> Tuple[Dict[str, Any], dict]:
+    """
+    Extract fields from the whole document by sending overlapping chunks concurrently.
+
+    Chunks from `make_chunks_with_overlap` go through `llm_extract_chunk` on the shared
+    LLM thread pool, so wall-clock time stays close to a single round trip. Every chunk
+    answer is normalised with `postprocess_llm_json` and then merged by
+    `reduce_llm_chunks`. Chunks that fail or exceed CONFIG["llm_request_timeout_s"] are
+    left out of the merge.
+
+    Args:
+        text (str): Full document text.
+        global_header (dict): Header facts passed to every chunk prompt.
+
+    Returns:
+        tuple: (merged raw field dict, info dict for metadata)
+    """
+    chunks = make_chunks_with_overlap(text, max_chars=CONFIG.get("llm_chunk_chars", 6000),
+                                      overlap=CONFIG.get("llm_chunk_overlap", 400))
+    max_chunks = CONFIG.get("llm_max_chunks") or len(chunks)
+    chunks = chunks[:max_chunks]
+    timeout = CONFIG.get("llm_request_timeout_s") or None
+    pool = get_llm_pool()
+    futures = [pool.submit(llm_extract_chunk, c, f"chunk {i + 1}/{len(chunks)}", None, global_header)
+               for i, c in enumerate(chunks)]
+    results, failed = [], []
+    t0 = time.time()
+    for i, fut in enumerate(futures):
+        # requests run concurrently, so later chunks only get what is left of the shared deadline
+        remaining = None if timeout is None else max(0.1, timeout + 5 - (time.time() - t0))
+        try:
+            raw = fut.result(timeout=remaining) or {}
+        except FutureTimeoutError:
+            fut.cancel()
+            log(f"LLM chunk {i + 1}/{len(chunks)} timed out; left out of the merge")
+            failed.append(i + 1)
+            continue
+        except Exception as e:
+            log(f"LLM chunk {i + 1}/{len(chunks)} failed: {e}")
+            failed.append(i + 1)
+            continue
+        if raw:
+            results.append(postprocess_llm_json(raw))
+        else:
+            failed.append(i + 1)
+    merged, confidence = reduce_llm_chunks(results)
+    info = {"mode": "chunks", "chunks": len(chunks), "failed_chunks": failed,
+            "field_confidence": confidence, "prompt_chars": sum(len(c) for c in chunks),
+            "elapsed_s": round(time.time() - t0, 2)}
+    return merged, info
+
+
 # --------------------
 # LLM Evaluation
 # --------------------
 def llm_evaluate(tender_json: dict):
-    if LLM_CLIENT is None or not CONFIG["use_llm_eval"]:
+    if get_llm_client() is None or not CONFIG["use_llm_eval"]:
         return {}
     try:
         prompt = EVAL_PROMPT.format(tender_json=json.dumps(tender_json))
-        resp = LLM_CLIENT.chat.completions.create(model=CONFIG["llm_model"], messages=[{"role": "user", "content": prompt}], temperature=0, max_tokens=500)
-        raw = resp.choices[0].message.content.strip()
+        raw = llm_chat([{"role": "user", "content": prompt}], temperature=0, max_tokens=500)
         try:
             return json.loads(raw)
         except Exception:
@@ -853,16 +1864,20 @@ def llm_evaluate(tender_json: dict):
 # --------------------
 # Merge Regex & LLM Codes
 # --------------------
-def merge_candidates(regex_data: Dict[str, Any], llm_data: Dict[str, Any]) -> Dict[str, Any]:
+def merge_candidates(regex_data: Dict[str, Any], llm_data: Dict[str, Any], regex_candidates: Dict[str, List[str]] = None) -> Dict[str, Any]:
     final = {}
+    regex_candidates = regex_candidates or {}
     keys = set(list(regex_data.keys()) + list(llm_data.keys()))
     for k in keys:
-        rv = regex_data.get(k)
         lv = llm_data.get(k)
         chosen = None
-        if rv and isinstance(rv, str):
+        # first regex hit, then the other labelled hits for this field in document order
+        rvs = [regex_data.get(k)] + [c for c in regex_candidates.get(k, []) if c != regex_data.get(k)]
+        for rv in rvs:
+            if not rv or not isinstance(rv, str):
+                continue
             # special sanitizers
-            if k in ("emd", "tender_fee", "performance_guarantee"):
+            if k in ("emd", "tender_fee", "performance_guarantee", "tender_value"):
                 rv = sanitize_amount_text(rv)
             elif k in ("submission_deadline", "publication_date", "bid_opening_date"):
                 # keep date only
@@ -871,10 +1886,11 @@ def merge_candidates(regex_data: Dict[str, Any], llm_data: Dict[str, Any]) -> Di
             # validate
             if regex_value_valid(k, rv):
                 chosen = rv
+                break
         if chosen is None and lv:
             # try LLM candidate
             if isinstance(lv, str):
-                if k in ("emd", "tender_fee", "performance_guarantee"):
+                if k in ("emd", "tender_fee", "performance_guarantee", "tender_value"):
                     lv = sanitize_amount_text(lv)
                 elif k in ("submission_deadline", "publication_date", "bid_opening_date"):
                     lv = sanitize_date_like(lv) or lv
@@ -910,17 +1926,42 @@ def read_json_safe(path: str):
 # Chroma Vector Store DB
 # --------------------
 class ChromaVectorStore:
-    def __init__(self, collection_name: str = "tenders"):
-        # chromadb client (in-memory / local by default)
-        self.client = chromadb.Client()
-        # wrapper that uses sentence-transformers to embed text
-        self.embedding_fn = embedding_functions.SentenceTransformerEmbeddingFunction(
-            model_name="all-MiniLM-L6-v2"
+    """
+    Chunk-level vector index of tender text.
+
+    With `persist_dir` the collection lives in a chromadb PersistentClient and survives
+    restarts. Chunk IDs are "<group>:<hash of chunk text>", where the group is the
+    document's TenderStore key ("key:<tender_key>", see `vector_group`). Re-indexing a
+    document therefore only embeds chunks whose text is new, refreshes the metadata of
+    the unchanged ones, and deletes the group's chunks that no longer exist.
+    """
+
+    def __init__(self, collection_name: str = "tenders", persist_dir: str = None, batch_size: int = 64,
+                 embedding_fn=None):
+        import chromadb
+        from chromadb.utils import embedding_functions
+        # chromadb client: persistent on disk when a directory is given, else in-memory
+        if persist_dir:
+            os.makedirs(persist_dir, exist_ok=True)
+            self.client = chromadb.PersistentClient(path=persist_dir)
+        else:
+            self.client = chromadb.Client()
+        # wrapper that uses sentence-transformers to embed text (unless a cached backend is given)
+        self.embedding_fn = embedding_fn or embedding_functions.SentenceTransformerEmbeddingFunction(
+            model_name="all-MiniLM-L6-v2"
         )
         # create or get collection (idempotent)
         self.collection = self.client.get_or_create_collection(
             name=collection_name, embedding_function=self.embedding_fn
         )
+        self.batch_size = max(1, int(batch_size))
+        self._lock = threading.Lock()
+
+    def _embed(self, texts: List[str]) -> List[List[float]]:
+        out = []
+        for i in range(0, len(texts), self.batch_size):
+            out.extend([list(map(float, v)) for v in self.embedding_fn(texts[i:i + self.batch_size])])
+        return out
 
     def add_documents(self, docs: List[Dict[str, Any]]):
 
@@ -936,12 +1977,54 @@ class ChromaVectorStore:
                 m = {}
             metadatas.append(m)
 
-        # Add to collection (chromadb handles duplicates if same id used)
-        self.collection.add(ids=ids, documents=documents, metadatas=metadatas)
-
-    def search(self, query: str, k: int = 5):
+        # upsert so re-adding an existing id replaces it instead of failing
+        with self._lock:
+            self.collection.upsert(ids=ids, documents=documents, metadatas=metadatas, embeddings=self._embed(documents))
+
+    def index_chunks(self, group: str, chunks: List[str], meta: Dict[str, Any]) -> Dict[str, int]:
+        """
+        Make the index hold exactly `chunks` for `group`, embedding only new chunk texts.
+
+        Args:
+            group (str): Stable document identity (see `vector_group`).
+            chunks (list): Chunk texts in document order.
+            meta (dict): Flat metadata stored on every chunk (tender key, title, ...).
+
+        Returns:
+            dict: {"added": n, "kept": n, "deleted": n}
+        """
+        wanted = {}
+        for i, chunk in enumerate(chunks):
+            cid = f"{group}:{sha256_text(chunk)[:24]}"
+            if cid not in wanted:
+                wanted[cid] = (i, chunk)
+        with self._lock:
+            existing = set(self.collection.get(where={"group": group}, include=[]).get("ids") or [])
+            new_ids = [cid for cid in wanted if cid not in existing]
+            kept_ids = [cid for cid in wanted if cid in existing]
+            stale_ids = [cid for cid in existing if cid not in wanted]
+
+            def metas(ids):
+                return [dict(meta, group=group, chunk_index=wanted[cid][0]) for cid in ids]
+
+            if stale_ids:
+                self.collection.delete(ids=stale_ids)
+            if kept_ids:
+                self.collection.update(ids=kept_ids, metadatas=metas(kept_ids))
+            for j in range(0, len(new_ids), self.batch_size):
+                batch = new_ids[j:j + self.batch_size]
+                docs = [wanted[cid][1] for cid in batch]
+                self.collection.upsert(ids=batch, documents=docs, metadatas=metas(batch), embeddings=self._embed(docs))
+        return {"added": len(new_ids), "kept": len(kept_ids), "deleted": len(stale_ids)}
+
+    def delete_group(self, group: str):
+        with self._lock:
+            self.collection.delete(where={"group": group})
+
+    def search(self, query: str, k: int = 5, where: Dict[str, Any] = None):
         try:
-            results = self.collection.query(query_texts=[query], n_results=k)
+            kwargs = {"where": where} if where else {}
+            results = self.collection.query(query_texts=[query], n_results=k, **kwargs)
         except Exception as e:
             # return empty on error but log to console
             print("Chroma query error:", e)
@@ -954,12 +2037,146 @@ class ChromaVectorStore:
 
         for i in range(len(results["ids"][0])):
             hits.append({
+                "id": results["ids"][0][i],
                 "meta": results["metadatas"][0][i],
+                "text": (results.get("documents") or [[None] * len(results["ids"][0])])[0][i],
                 "score": results["distances"][0][i]
             })
         return hits
 
 
+_VECTOR_STORE = None
+_VECTOR_STORE_LOCK = threading.Lock()
+
+
+def make_embedding_function(backend: str = None):
+    """CONFIG["embed_backend"] wrapped in the persistent embedding cache (when CONFIG["embed_cache"] is on)."""
+    from embeddings import CachedEmbeddingFunction, EmbeddingCache, make_backend
+    cache = EmbeddingCache(CONFIG["embed_cache_dir"]) if CONFIG.get("embed_cache", True) else None
+    return CachedEmbeddingFunction(make_backend(backend or CONFIG.get("embed_backend", "torch"),
+                                                CONFIG.get("embed_model", "all-MiniLM-L6-v2")),
+                                   cache, batch_size=CONFIG.get("embed_batch_size", 64))
+
+
+def get_vector_store():
+    """Shared persistent vector index (None when CONFIG["use_vector_index"] is off or it cannot start)."""
+    global _VECTOR_STORE
+    if not CONFIG.get("use_vector_index"):
+        return None
+    with _VECTOR_STORE_LOCK:
+        if _VECTOR_STORE is None:
+            try:
+                backend = CONFIG.get("embed_backend", "torch")
+                _VECTOR_STORE = ChromaVectorStore(
+                    # vectors of different backends are not interchangeable, so each gets its own collection
+                    collection_name="tenders" if backend == "torch" else f"tenders_{backend.replace('-', '_')}",
+                    persist_dir=CONFIG["vector_db_dir"], batch_size=CONFIG.get("embed_batch_size", 64),
+                    embedding_fn=make_embedding_function(backend),
+                )
+            except Exception as e:
+                log(f"Vector index disabled: {e}")
+                CONFIG["use_vector_index"] = False
+                return None
+        return _VECTOR_STORE
+
+
+def _tender_facts(record: Dict[str, Any]) -> str:
+    """One compact line of key facts for a tender (always sent, so basic questions need no retrieval)."""
+    m = record.get("meta") or {}
+    parts = [f"Tender: {record.get('title') or m.get('title') or 'Untitled'}"]
+    for label, k in (("ID", "tender_id"), ("Authority", "issuing_authority"), ("Location", "location"),
+                     ("Deadline", "submission_deadline"), ("Value", "tender_value"), ("EMD", "emd"),
+                     ("Fee", "tender_fee"), ("Duration", "contract_duration"), ("Category", "category")):
+        v = m.get(k) or (record.get(k) if k == "location" else "")
+        if v and str(v).strip().upper() != "N/A":
+            parts.append(f"{label}: {v}")
+    rec = (record.get("eval") or {}).get("pursue_recommendation")
+    if rec:
+        parts.append(f"Recommendation: {str(rec)[:80]}")
+    return " | ".join(parts)
+
+
+def retrieve_context(query: str, records: List[Dict[str, Any]], max_tokens: int = None, top_k: int = None) -> Tuple[str, List[dict]]:
+    """
+    Build a bounded chat context for `query` over the selected tenders.
+
+    Each tender contributes one facts line (at most a third of the budget in total); the
+    rest is filled with the top-k chunks from the vector index, restricted to the selected
+    tenders and taken in relevance order until the budget (≈4 chars per token) is spent.
+    Prompt size therefore stays flat however many tenders are selected.
+
+    Args:
+        query (str): User question.
+        records (list): Full tender records in context.
+        max_tokens (int): Context budget; defaults to CONFIG["rag_max_context_tokens"].
+        top_k (int): Chunks to retrieve; defaults to CONFIG["rag_top_k"].
+
+    Returns:
+        tuple: (context text, [{"tender_key", "title", "chunk_index", "score"}] of the passages used)
+    """
+    budget = 4 * (max_tokens or CONFIG.get("rag_max_context_tokens", 1500))
+    top_k = top_k or CONFIG.get("rag_top_k", 8)
+    titles = {tender_key(r): r.get("title") or "Untitled" for r in records}
+
+    parts, used = [], 0
+    for r in records:
+        line = _tender_facts(r)
+        if used + len(line) > budget // 3:
+            break
+        parts.append(line)
+        used += len(line) + 1
+
+    sources = []
+    store = get_vector_store()
+    if store is not None and titles and query.strip():
+        keys = list(titles)
+        where = {"tender_key": keys[0]} if len(keys) == 1 else {"tender_key": {"$in": keys}}
+        for hit in store.search(query, k=top_k, where=where):
+            text = (hit.get("text") or "").strip()
+            meta = hit.get("meta") or {}
+            if not text:
+                continue
+            passage = f"[{titles.get(meta.get('tender_key'), meta.get('title', ''))} — passage {meta.get('chunk_index', '?')}]\n{text}"
+            if used + len(passage) > budget:
+                room = budget - used
+                if room < 300:
+                    break
+                passage = passage[:room]
+            parts.append(passage)
+            used += len(passage) + 2
+            sources.append({"tender_key": meta.get("tender_key"), "title": meta.get("title"),
+                            "chunk_index": meta.get("chunk_index"), "score": hit.get("score")})
+    return "\n\n".join(parts), sources
+
+
+def vector_group(record: Dict[str, Any]) -> str:
+    """
+    Vector index group of a tender record: its TenderStore key, so a group is replaced
+    exactly when its store record is. Documents that share a tender ID or file name
+    (NIT, corrigenda, BOQ) keep their own chunks.
+    """
+    return "key:" + tender_key(record)
+
+
+def index_tender_text(record: Dict[str, Any]) -> Dict[str, int]:
+    """Chunk a tender's raw_text and sync it into the vector index (called after extraction)."""
+    store = get_vector_store()
+    text = record.get("raw_text") or ""
+    if store is None or not text.strip():
+        return {}
+    chunks = make_chunks_with_overlap(text, max_chars=CONFIG.get("vector_chunk_chars", 1500),
+                                      overlap=CONFIG.get("vector_chunk_overlap", 200))
+    meta = clean_metadata({
+        "tender_key": tender_key(record),
+        "tender_id": (record.get("meta") or {}).get("tender_id") or "",
+        "title": record.get("title") or "",
+        "category": (record.get("meta") or {}).get("category") or "",
+    })
+    stats = store.index_chunks(vector_group(record), chunks, meta)
+    log(f"Vector index {record.get('title')!r}: {stats}")
+    return stats
+
+
 # --------------------
 # UI helpers (kept)
 # --------------------
@@ -983,6 +2200,7 @@ def summarize_to_bullets(text: str, max_bullets: int = 4) -> List[str]:
 
 
 def confidence_gauge_figure(conf):
+    import plotly.graph_objects as go
     pct = int(conf * 100) if conf is not None else 0
     fig = go.Figure(go.Indicator(mode="gauge+number", value=pct, number={'suffix': "%"},
                                  gauge={'axis': {'range': [0,100]}, 'bar': {'color': "#10B981"},
@@ -1051,6 +2269,28 @@ def upload_layout():
         ], md=6)
     ])
 
+DEADLINE_WINDOWS = {"any": "Any deadline", "7": "Due in 7 days", "30": "Due in 30 days", "open": "Still open", "closed": "Closed"}
+TILE_SORTS = {"relevance": "Relevance (search)", "deadline": "Deadline (soonest)", "deadline_desc": "Deadline (latest)", "value_desc": "Value (highest)",
+              "value": "Value (lowest)", "title": "Title (A-Z)", "updated_desc": "Recently processed"}
+
+
+def tile_filters_layout():
+    """Filter/sort/search controls above the tender tiles (applied server-side)."""
+    return dbc.Row([
+        dbc.Col(dbc.Input(id="tile-search", placeholder="Search title, ID, authority, location", debounce=True), md=4),
+        dbc.Col(dcc.Dropdown(id="tile-category", options=[{"label": c, "value": c} for c in ICON_STYLE_MAP.keys()],
+                             placeholder="Category"), md=2),
+        dbc.Col(dcc.Dropdown(id="tile-deadline", options=[{"label": v, "value": k} for k, v in DEADLINE_WINDOWS.items()],
+                             value="any", clearable=False), md=2),
+        dbc.Col(dbc.Input(id="tile-authority", placeholder="Authority", debounce=True), md=2),
+        dbc.Col(dcc.Dropdown(id="tile-sort", options=[{"label": v, "value": k} for k, v in TILE_SORTS.items()],
+                             value="relevance", clearable=False), md=2),
+        dbc.Col(dbc.Input(id="tile-min-value", type="number", placeholder="Min value (₹)", debounce=True), md=2, className="mt-2"),
+        dbc.Col(dbc.Input(id="tile-max-value", type="number", placeholder="Max value (₹)", debounce=True), md=2, className="mt-2"),
+        dbc.Col(html.Div(id="tile-count", className="text-muted small mt-3"), md=8),
+    ], className="g-2 mb-3")
+
+
 def dashboard_layout():
     """Display dashboard tiles with tender summaries."""
     return html.Div([
@@ -1058,7 +2298,10 @@ def dashboard_layout():
         html.Hr(),
         dbc.Row(id="kpi-row"),
         html.Hr(),
-        dbc.Row([dbc.Col(html.Div(id="tender-tiles"), md=7), dbc.Col(html.Div(id="tender-detail-area", children=initial_detail_area()), md=5)])
+        tile_filters_layout(),
+        dbc.Row([dbc.Col([html.Div(id="tender-tiles"),
+                          dbc.Pagination(id="tiles-page", max_value=1, active_page=1, fully_expanded=False, className="mt-2")], md=7),
+                 dbc.Col(html.Div(id="tender-detail-area", children=initial_detail_area()), md=5)])
     ])
 
 def chat_layout():
@@ -1083,7 +2326,9 @@ app.layout = dbc.Container([
     html.Br(),
     dcc.Store(id="tenders-store", data=[]),
     dcc.Store(id="chat-store", data=[]),
-    dcc.Interval(id="progress-interval", interval=1*1000, n_intervals=0, disabled=True),
+    dcc.Store(id="job-store", storage_type="session"),
+    dcc.Store(id="progress-sse"),  # snapshots pushed by /progress/<job_id>/stream (see progress_stream_client)
+    dcc.Interval(id="progress-interval", interval=1*1000, n_intervals=0, disabled=True),  # fallback when SSE fails
     html.Div(id="page-upload", children=upload_layout(), style={"display":"block"}),
     html.Div(id="page-dashboard", children=dashboard_layout(), style={"display":"none"}),
     html.Div(id="page-chat", children=chat_layout(), style={"display":"none"}),
@@ -1124,8 +2369,11 @@ def _date_sanity_fix(final_obj: dict):
                 log(f"Year adjusted for {key}: {v} -> {final_obj[key]}")
 
 
-def pick_best_tender_id(cands: list[str]) -> str:
-    if not cands : return ""
+def pick_best_tender_id(cands: list[str], fallback: list[str] = ()) -> str:
+    """
+    Best-looking tender ID among the labelled candidates (ties keep document order).
+    Unlabelled `fallback` candidates are only ranked when no labelled one survives.
+    """
     def score(x: str) -> int:
         s = x.strip()
         sc = 0
@@ -1134,10 +2382,12 @@ def pick_best_tender_id(cands: list[str]) -> str:
         if re.search(r"[A-Za-z]", s): sc += 2
         if 6 <= len(s) <= 40 : sc += 2
         return sc
-    cands = [re.sub(r"^[#:;\-]+|[,:;\.\)]$", "", c).strip() for c in cands]
-    cands = [c for c in cands if len(c) >= 5 and re.search(r"\d", c)]
-    if not cands: return ""
-    return sorted(cands, key=score, reverse=True)[0]
+    for group in (cands or [], fallback or []):
+        group = [re.sub(r"^[#:;\-]+|[,:;\.\)]$", "", c).strip() for c in group]
+        group = [c for c in group if len(c) >= 5 and re.search(r"\d", c)]
+        if group:
+            return sorted(group, key=score, reverse=True)[0]
+    return ""
 
 BANNED_DEADLINE_SNIPPETS = [
     "validity of bid", "validity period", "be informed later",
@@ -1178,23 +2428,107 @@ def sanitize_date_like(x: str) -> str:
 
 
 # ---------- PAGE / CHUNK HELPERS ----------
-def split_into_pages(text: str) -> List[str]:
-    pages = re.split(r"\n\s*Page\s*\d+\s*(?:of\s*\d+)?\s*\n", text, flags=re.I)
-    # fallback: split every ~4000 chars at a newline boundary
-    if len(pages) <= 1 and len(text) > 4500:
-        lines = text.splitlines()
-        pages, buf, cur = [], [], 0
-        for ln in lines:
-            buf.append(ln)
-            cur += len(ln) + 1
-            if cur > 4000:
-                pages.append("\n".join(buf)); buf=[]; cur=0
-        if buf: pages.append("\n".join(buf))
-    return [p.strip() for p in pages if p and p.strip()]
-
-
-def detect_global_header(text: str) -> Dict[str, str]:
-    pages = split_into_pages(text)
+PAGE_BREAK_RE = re.compile(r"\n\s*Page\s*\d+\s*(?:of\s*\d+)?\s*\n", re.I)
+
+
+class DocumentIndex:
+    """
+    Offsets for one document, computed once and shared by the page/anchor helpers.
+
+    - `line_starts`: start offset of every line; `line_of(pos)` is a bisect, so mapping
+      a match to its line no longer slices and re-counts the text.
+    - `page_spans()`: (start, end) of each page. Exact when built from the extracted
+      pages (`from_pages`), otherwise the "Page N of M" / ~4000-char heuristic.
+    - `anchor_lines(field)`: line indices of ANCHORS hits, computed on first use.
+    """
+
+    def __init__(self, text: str, page_spans: List[Tuple[int, int]] = None):
+        self.text = text or ""
+        self.line_starts = [0]
+        self.line_starts.extend(m.end() for m in re.finditer("\n", self.text))
+        self._page_spans = page_spans
+        self._anchor_lines: Dict[str, List[int]] = {}
+
+    @classmethod
+    def from_pages(cls, pages: List[str], sep: str = "\n") -> "DocumentIndex":
+        """Index for sep.join(pages), keeping the real page boundaries."""
+        spans, pos = [], 0
+        for p in pages:
+            spans.append((pos, pos + len(p)))
+            pos += len(p) + len(sep)
+        return cls(sep.join(pages), page_spans=spans)
+
+    @property
+    def n_lines(self) -> int:
+        return len(self.line_starts)
+
+    def line_of(self, pos: int) -> int:
+        return bisect.bisect_right(self.line_starts, pos) - 1
+
+    def line_end(self, i: int) -> int:
+        return self.line_starts[i + 1] - 1 if i + 1 < len(self.line_starts) else len(self.text)
+
+    def lines_text(self, first: int, last: int) -> str:
+        """Text of lines first..last (inclusive)."""
+        first = max(0, first)
+        last = min(self.n_lines - 1, last)
+        if last < first:
+            return ""
+        return self.text[self.line_starts[first]:self.line_end(last)]
+
+    def page_spans(self) -> List[Tuple[int, int]]:
+        if self._page_spans is None:
+            self._page_spans = self._split_page_spans()
+        return self._page_spans
+
+    def _split_page_spans(self) -> List[Tuple[int, int]]:
+        text = self.text
+        spans, start = [], 0
+        for m in PAGE_BREAK_RE.finditer(text):
+            spans.append((start, m.start()))
+            start = m.end()
+        spans.append((start, len(text)))
+        # fallback: split every ~4000 chars at a newline boundary
+        if len(spans) <= 1 and len(text) > 4500:
+            spans, first, cur = [], 0, 0
+            for i in range(self.n_lines):
+                cur += self.line_end(i) - self.line_starts[i] + 1
+                if cur > 4000:
+                    spans.append((self.line_starts[first], self.line_end(i)))
+                    first, cur = i + 1, 0
+            if first < self.n_lines:
+                spans.append((self.line_starts[first], len(text)))
+        return spans
+
+    def pages(self) -> List[str]:
+        out = []
+        for s_, e_ in self.page_spans():
+            p = self.text[s_:e_].strip()
+            if p:
+                out.append(p)
+        return out
+
+    def anchor_lines(self, field: str) -> List[int]:
+        """De-duplicated line indices of ANCHORS hits for a field (pattern order, then document order)."""
+        if field not in self._anchor_lines:
+            hits, seen = [], set()
+            for pat in ANCHOR_PATTERNS.get(field, []):
+                for m in pat.finditer(self.text):
+                    i = self.line_of(m.start())
+                    if i not in seen:
+                        seen.add(i)
+                        hits.append(i)
+            self._anchor_lines[field] = hits
+        return self._anchor_lines[field]
+
+
+def split_into_pages(text: str, index: DocumentIndex = None) -> List[str]:
+    index = index or DocumentIndex(text)
+    return index.pages()
+
+
+def detect_global_header(text: str, index: DocumentIndex = None) -> Dict[str, str]:
+    pages = split_into_pages(text, index)
     head = "\n\n".join(pages[:2]) if pages else text[:6000]
     out = {}
     m = re.search(r"(?i)(?:Name\s*of\s*Work|Title|Project\s*Title)\s*[:\-]\s*(.+)", head); 
@@ -1238,177 +2572,764 @@ ANCHORS = {
 }
 
 
-def _window_around_idx(lines, i, span=5):
-    start = max(0, i - span)
-    end = min(len(lines), i + span + 1)
-    return "\n".join(lines[start:end]).strip()
+ANCHOR_PATTERNS = {field: [re.compile(p) for p in pats] for field, pats in ANCHORS.items()}
+
 
+def _window_around_idx(index: DocumentIndex, i: int, span: int = 5) -> str:
+    return index.lines_text(i - span, i + span).strip()
 
-def build_anchor_windows(full_text: str, max_windows_per_field: int = 2) -> dict:
-    lines = full_text.splitlines()
-    txt = full_text
+
+def build_anchor_windows(full_text: str, max_windows_per_field: int = 2, index: DocumentIndex = None) -> dict:
+    index = index or DocumentIndex(full_text)
     windows = {f: [] for f in ANCHORS.keys()}
-    for field, pats in ANCHORS.items():
-        hits = []
-        for p in pats:
-            for m in re.finditer(p, txt):
-                # find line index of this match
-                idx = txt[:m.start()].count("\n")
-                hits.append(idx)
-        # de-duplicate line indices, keep in-document order
-        seen = set()
-        uniq = []
-        for h in hits:
-            if h not in seen:
-                uniq.append(h); seen.add(h)
-        # collect windows
-        for i in uniq[:max_windows_per_field]:
-            win = _window_around_idx(lines, i, span=6)
+    for field in ANCHORS:
+        # collect windows (line indices are de-duplicated, first hits first)
+        for i in index.anchor_lines(field)[:max_windows_per_field]:
+            win = _window_around_idx(index, i, span=6)
             if len(win) > 1500:  # safety
                 win = win[:1500]
             windows[field].append(win)
     return windows
 
 
-def process_files_worker(encoded_items: List[Dict[str,str]]):
-    prog_path = CONFIG["progress_file"]
-    pending_path = CONFIG["pending_results_file"]
-    total = len(encoded_items)
-    progress = {"total": total, "done": 0, "status": "running", "current_file": ""}
-    write_json(prog_path, progress)
+def build_anchor_context(index: DocumentIndex, max_chars: int = None, fields: List[str] = None) -> Tuple[str, dict]:
+    """
+    Build compact LLM input from the anchor windows of every field.
 
-    results = []
-    for i, item in enumerate(encoded_items):
-        fname = (item.get("filename","") or "")[:200]
-        progress["current_file"] = fname
-        write_json(prog_path, progress)
-        log(f"Processing: {fname}")
+    Windows of all fields are merged where they overlap, tagged with the fields they
+    serve, and put after the document opening (narrative fields like scope/summary
+    have no labels to anchor on). Only when some anchored field has no hit at all is
+    the full text appended, up to the remaining `max_chars` budget.
 
-        # decode
-        try:
-            header_b64 = item.get("content","")
-            if "," in header_b64:
-                _, b64 = header_b64.split(",",1)
+    Args:
+        index (DocumentIndex): Index of the document text.
+        max_chars (int): Size cap; defaults to CONFIG["llm_prompt_max_chars"].
+        fields (list): Only build windows for these fields (default: all of ANCHORS).
+            Requested fields without an ANCHORS entry count as unanchored.
+
+    Returns:
+        tuple: (prompt text, info dict with windowed/missing fields and sizes)
+    """
+    max_chars = max_chars or CONFIG.get("llm_prompt_max_chars", 15000)
+    per_field = CONFIG.get("llm_anchor_windows_per_field", 2)
+    span = CONFIG.get("llm_anchor_span_lines", 6)
+    lead_chars = CONFIG.get("llm_anchor_lead_chars", 3000)
+    text = index.text
+
+    ranges, missing = [], []
+    for field in (fields or ANCHORS):
+        lines = index.anchor_lines(field)[:per_field] if field in ANCHORS else []
+        if not lines:
+            missing.append(field)
+        for i in lines:
+            ranges.append([max(0, i - span), min(index.n_lines - 1, i + span), {field}])
+    ranges.sort(key=lambda r: r[0])
+    merged = []
+    for r in ranges:
+        if merged and r[0] <= merged[-1][1] + 1:
+            merged[-1][1] = max(merged[-1][1], r[1])
+            merged[-1][2] |= r[2]
+        else:
+            merged.append(r)
+
+    lead = text[:lead_chars]
+    lead_end = len(lead)
+    parts = [f"[Document opening]\n{lead.strip()}"] if lead.strip() else []
+    used = sum(len(p) for p in parts)
+    for first, last, fields in merged:
+        if index.line_end(last) <= lead_end:
+            continue  # already inside the opening excerpt
+        win = index.lines_text(first, last).strip()[:1500 * len(fields)]
+        section = f"[Fields: {', '.join(sorted(fields))}]\n{win}"
+        if used + len(section) > max_chars:
+            break
+        parts.append(section)
+        used += len(section) + 2
+
+    if missing and used < max_chars:
+        budget = max_chars - used - 40
+        if budget > 0:
+            parts.append(f"[Full text excerpt]\n{text[:budget]}")
+
+    out = "\n\n".join(parts)[:max_chars]
+    info = {"mode": "anchors", "windowed_fields": sorted({f for r in merged for f in r[2]}),
+            "fields_without_anchors": missing, "prompt_chars": len(out),
+            "full_text_chars": min(len(text), max_chars)}
+    return out, info
+
+
+# --------------------
+# Pipelined document processing
+# --------------------
+# --------------------
+# Content-hash index of earlier extractions
+# --------------------
+def _hash_index_path(content_sha: str) -> str:
+    return os.path.join(CONFIG["extraction_output_dir"], ".index", content_sha[:2], content_sha + ".json")
+
+
+def index_extraction(content_sha: str, out_dir: str):
+    """Point the content hash of a processed upload at its extraction folder."""
+    write_json(_hash_index_path(content_sha), {"out_dir": out_dir})
+
+
+def build_tender_record(final_obj: dict, eval_res: dict, fname: str, upload_path: str, out_dir: str,
+                        text: str = "", content_sha: str = "") -> Dict[str, Any]:
+    """Dashboard store record for one processed tender."""
+    return {
+        "id": final_obj.get("tender_id") or fname,
+        "title": final_obj.get("title") or fname,
+        "location": final_obj.get("location") or "",
+        "meta": final_obj,
+        "eval": eval_res,
+        "summary": final_obj.get("short_summary","") or final_obj.get("scope_of_work","") or "",
+        "raw_text": text,
+        "confidence": (eval_res.get("priority_score")/10.0) if eval_res.get("priority_score") else 0.7,
+        "source_file": upload_path,
+        "extraction_path": os.path.join(out_dir, "extraction.json"),
+        "content_sha256": content_sha,
+    }
+
+
+def lookup_extraction(content_sha: str, fname: str, upload_path: str, file_bytes: bytes = b"") -> Dict[str, Any]:
+    """
+    Return the tender record of an earlier extraction of the same bytes, or None.
+
+    The index entry is only trusted when the folder's metadata.json still carries the
+    same content hash (a later upload with the same file name may have overwritten it).
+    The raw text comes from the extraction cache when it is still there.
+    """
+    entry = read_json_safe(_hash_index_path(content_sha))
+    if not entry or not entry.get("out_dir"):
+        return None
+    out_dir = entry["out_dir"]
+    final_obj = read_json_safe(os.path.join(out_dir, "extraction.json"))
+    metadata = read_json_safe(os.path.join(out_dir, "metadata.json"))
+    if not final_obj or not metadata or metadata.get("content_sha256") != content_sha:
+        return None
+    eval_res = (metadata.get("extraction_meta") or {}).get("eval") or {}
+    text = ""
+    cache = get_extract_cache()
+    if cache is not None and file_bytes:
+        cached = cache.get(_doc_cache_key(file_bytes, fname))
+        if cached and isinstance(cached.get("pages"), list):
+            text = "\n".join(cached["pages"])
+    return build_tender_record(final_obj, eval_res, fname, upload_path, out_dir, text, content_sha)
+
+
+def save_upload(item: Dict[str, str], upload_dir: str) -> Tuple[str, str]:
+    """
+    Decode one browser upload and write it to `upload_dir`.
+
+    Args:
+        item (dict): {"content": data-URL or base64, "filename": str}
+        upload_dir (str): Target directory (one per job, so batches never overwrite each other).
+
+    Returns:
+        tuple: (filename, path on disk)
+    """
+    fname = (item.get("filename","") or "")[:200]
+    try:
+        header_b64 = item.get("content","")
+        if "," in header_b64:
+            _, b64 = header_b64.split(",",1)
+        else:
+            b64 = header_b64
+        file_bytes = base64.b64decode(b64)
+    except Exception:
+        file_bytes = b""
+
+    os.makedirs(upload_dir, exist_ok=True)
+    upload_path = os.path.join(upload_dir, os.path.basename(fname) or "upload")
+    try:
+        with open(upload_path, "wb") as f:
+            f.write(file_bytes)
+    except Exception:
+        pass
+    return fname, upload_path
+
+
+def extract_stage(doc: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    CPU stage: text extraction/OCR plus regex for one queued document.
+
+    Args:
+        doc (dict): Claimed job-queue row ({"filename", "path", ...}).
+
+    Returns:
+        dict: Context handed to `finish_stage`.
+    """
+    fname, upload_path = doc["filename"], doc["path"]
+    log(f"Processing: {fname}")
+    with open(upload_path, "rb") as f:
+        file_bytes = f.read()
+
+    # known bytes (under any name): hand back the stored extraction, skip OCR and LLM
+    content_sha = sha256_bytes(file_bytes)
+    if CONFIG.get("dedupe_uploads"):
+        record = lookup_extraction(content_sha, fname, upload_path, file_bytes)
+        if record is not None:
+            log(f"Known document {content_sha[:12]}: reusing {record['extraction_path']}")
+            return {"record": record}
+
+    # extract text, regex fields and header in one streamed pass over the pages
+    stop_early = CONFIG.get("stream_stop_early") and not CONFIG["use_llm_extract"]
+    doc_index, regexed, global_header, regex_cands = scan_document(iter_document_pages(file_bytes, fname), stop_early=stop_early)
+    text = doc_index.text
+    best_id = pick_best_tender_id(regex_cands.get("tender_id", []), regex_cands.get("tender_id#fallback", []))
+    if best_id:
+        regexed["tender_id"] = best_id
+
+    return {"fname": fname, "upload_path": upload_path, "doc_index": doc_index, "text": text, "content_sha256": content_sha,
+            "regexed": regexed, "global_header": global_header, "regex_cands": regex_cands}
+
+
+def finish_stage(doc: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    I/O stage: LLM extraction and evaluation, merge, and the JSON writes for one document.
+
+    Args:
+        doc (dict): Output of `extract_stage`.
+
+    Returns:
+        dict: Tender record for the dashboard store.
+    """
+    fname, upload_path, doc_index, text = doc["fname"], doc["upload_path"], doc["doc_index"], doc["text"]
+    regexed, global_header, regex_cands = doc["regexed"], doc["global_header"], doc["regex_cands"]
+
+    # LLM extract (hybrid)
+    llm_extracted = {}
+    llm_info = {}
+    llm_gate = {"decision": "off", "reason": "use_llm_extract is off"}
+    if CONFIG["use_llm_extract"]:
+        llm_gate = llm_gate_decision(regexed, regex_cands)
+        log(f"LLM gate: {llm_gate['decision']} ({llm_gate['reason']}; missing: {', '.join(llm_gate['missing']) or 'none'})")
+    if llm_gate.get("decision") == "targeted":
+        llm_text, llm_info = build_anchor_context(doc_index, fields=llm_gate["missing"])
+        llm_raw = llm_extract_fields(llm_gate["missing"], llm_text, page_reference="anchor windows", global_header=global_header)
+        llm_extracted = {k: v for k, v in postprocess_llm_json(llm_raw).items() if k in llm_raw}
+    elif llm_gate.get("decision") == "full":
+        mode = CONFIG.get("llm_extract_mode")
+        if mode == "chunks":
+            llm_raw, llm_info = llm_extract_chunks(text, global_header=global_header)
+            log(f"Chunked LLM extraction: {llm_info['chunks']} chunks in {llm_info['elapsed_s']}s")
+        else:
+            llm_text, page_ref = text, "all"
+            if mode == "anchors":
+                llm_text, llm_info = build_anchor_context(doc_index)
+                page_ref = "anchor windows"
+                log(f"Anchor prompt: {llm_info['prompt_chars']} chars (full text mode: {llm_info['full_text_chars']})")
+            llm_raw = llm_extract_chunk(llm_text, page_reference=page_ref, global_header=global_header) or {}
+        llm_extracted = postprocess_llm_json(lll := llm_raw)
+
+
+    # merge with validation
+    merged = merge_candidates(regexed, llm_extracted, regex_cands)
+
+    # Build final object (schema-fixed)
+    SCHEMA_KEYS = ["tender_id","category","title","location","issuing_authority","publication_date","submission_deadline",
+                   "bid_opening_date","tender_value","bid_opening_time","emd","tender_fee","performance_guarantee","contract_duration",
+                   "contact_emails","contact_phones","scope_of_work","eligibility_summary","required_documents",
+                   "exclusion_criteria","disqualification_criteria","technical_documents","deliverables","projects",
+                   "bidding_scope","short_summary"]
+    final_obj = {}
+    for k in SCHEMA_KEYS:
+        val = merged.get(k, "")
+        if k in ("contact_emails","contact_phones","projects"):
+            if isinstance(val, list):
+                final_obj[k] = val
+            elif isinstance(val, str) and val.strip():
+                final_obj[k] = [v.strip() for v in re.split(r"[,\n;]+", val) if v.strip()]
             else:
-                b64 = header_b64
-            file_bytes = base64.b64decode(b64)
-        except Exception:
-            file_bytes = b""
+                final_obj[k] = []
+        else:
+            final_obj[k] = val if val is not None else ""
+
+    # Normalize dates to DD-MM-YYYY where possible
+    def parse_date_to_ddmmYYYY_local(textval: str) -> str:
+        if not textval:
+            return ""
+        s = str(textval).strip()
+        patterns = [r'(\d{1,2})[/-](\d{1,2})[/-](\d{2,4})', r'(\d{1,2})\.(\d{1,2})\.(\d{2,4})']
+        for pat in patterns:
+            m = re.search(pat, s)
+            if not m:
+                continue
+            try:
+                d, mo, y = int(m.group(1)), int(m.group(2)), int(m.group(3))
+                if y < 100: y += 2000
+                return date(y, mo, d).strftime("%d-%m-%Y")
+            except Exception:
+                continue
+        return ""
+
+    for dk in ("submission_deadline","publication_date","bid_opening_date"):
+        raw = final_obj.get(dk,"")
+        normalized = parse_date_to_ddmmYYYY_local(raw)
+        if normalized:
+            final_obj[dk] = normalized
+    _date_sanity_fix(final_obj)
+
+    # exact integer paise next to each money display string (None for N/A / percentages)
+    for mk in ("tender_value","emd","tender_fee","performance_guarantee"):
+        final_obj[f"{mk}_paise"] = amount_to_paise(final_obj.get(mk))
+
+
+    if not final_obj.get("title"):
+        m_now = re.search(r"(?is)Name\s*of\s*Work\s*[:\-]\s*(.+?)(?:\n|$)", text)
+        if m_now:
+            final_obj["title"] = m_now.group(1).strip()
+            log(f"Title fallback (Name of Work): {final_obj['title']}")
+
+    # Debug logs
+    for key in ["tender_id","issuing_authority","emd","tender_fee","performance_guarantee","submission_deadline","bid_opening_date"]:
+        log(f"{key}: {final_obj.get(key)}")
+
+    # the gate decision and whether evaluation ran are kept in metadata.json for auditing
+    eval_res = {}
+    if not CONFIG["use_llm_eval"]:
+        llm_gate["eval"] = "off"
+    elif llm_gate.get("decision") == "skip" and CONFIG.get("llm_gate_eval", True):
+        llm_gate["eval"] = "skipped: gate decision is skip (llm_gate_eval)"
+        log("LLM evaluation skipped by the gate")
+    else:
+        llm_gate["eval"] = "run"
+        eval_res = llm_evaluate(final_obj) or {}
+
+    metadata = {"content_sha256": doc["content_sha256"], "source_filename": fname, "extraction_meta": {"regex_candidates": regexed, "regex_alternatives": regex_cands, "llm_candidates": llm_extracted, "llm_input": llm_info, "llm_gate": llm_gate, "eval": eval_res}}
+
+    safe_name = safe_stem(os.path.splitext(fname)[0])
+    out_dir = os.path.join(CONFIG["extraction_output_dir"], safe_name)
+    os.makedirs(out_dir, exist_ok=True)
+    write_json(os.path.join(out_dir, "extraction.json"), final_obj)
+    write_json(os.path.join(out_dir, "metadata.json"), metadata)
+
+    if doc["content_sha256"]:
+        index_extraction(doc["content_sha256"], out_dir)
+
+    tender_record = build_tender_record(final_obj, eval_res, fname, upload_path, out_dir, text, doc["content_sha256"])
+    try:
+        index_tender_text(tender_record)
+    except Exception as e:
+        log(f"Vector indexing failed for {fname}: {e}")
+    return tender_record
+
 
-        # save upload locally
-        os.makedirs(CONFIG["uploads_dir"], exist_ok=True)
-        upload_path = os.path.join(CONFIG["uploads_dir"], fname)
+# --------------------
+# Server-side tender store
+# --------------------
+TENDER_STORE = TenderStore(CONFIG["tender_db"])
+
+# The only meta fields the tiles and KPIs read; everything else is fetched by key
+TILE_META_FIELDS = ("tender_id", "category", "publication_date", "submission_deadline", "tender_value",
+                    "contract_duration", "emd", "tender_fee")
+
+
+def tender_key(record: Dict[str, Any]) -> str:
+    """Store key of a tender record: content hash of its document, else hash of its source path."""
+    return record.get("content_sha256") or sha256_text("source", record.get("source_file") or record.get("id") or "")
+
+
+def tender_summary(record: Dict[str, Any], key: str) -> Dict[str, Any]:
+    """Light projection of a tender record kept in the browser-side tenders-store."""
+    meta = record.get("meta") or {}
+    ev = record.get("eval") or {}
+    return {
+        "key": key,
+        "id": record.get("id"),
+        "title": record.get("title"),
+        "location": record.get("location"),
+        "summary": (record.get("summary") or "")[:300],
+        "confidence": record.get("confidence"),
+        "source_file": record.get("source_file"),
+        "content_sha256": record.get("content_sha256", ""),
+        "meta": {k: meta.get(k) for k in TILE_META_FIELDS if k in meta},
+        "eval": {k: ev.get(k) for k in ("pursue_recommendation", "priority_score") if k in ev},
+    }
+
+
+def load_tender(summary: Dict[str, Any], with_text: bool = False) -> Dict[str, Any]:
+    """Full record behind a tenders-store entry (falls back to the entry itself)."""
+    key = (summary or {}).get("key")
+    rec = TENDER_STORE.get(key, with_text=with_text) if key else None
+    return rec or summary or {}
+
+
+def parse_deadline_iso(raw: str) -> str:
+    """Submission deadline as YYYY-MM-DD (only clean DD-MM-YYYY / DD/MM/YYYY / ISO inputs), else None."""
+    raw = (raw or "").strip()
+    for fmt in ("%d-%m-%Y","%d/%m/%Y","%Y-%m-%d"):
         try:
-            with open(upload_path, "wb") as f:
-                f.write(file_bytes)
-        except Exception:
-            pass
+            return datetime.strptime(raw, fmt).date().isoformat()
+        except ValueError:
+            continue
+    return None
 
-        # extract text
-        text = extract_text(file_bytes, fname)
-        # regex extract
-        regexed = regex_extract(text)
-
-        # LLM extract (hybrid)
-        global_header = build_global_header(text)
-        llm_extracted = {}
-        if CONFIG["use_llm_extract"]:
-            llm_raw = llm_extract_chunk(text, page_reference="all", global_header=global_header) or {}
-            llm_extracted = postprocess_llm_json(lll := llm_raw)
-
-
-        # merge with validation
-        merged = merge_candidates(regexed, llm_extracted)
-
-        # Build final object (schema-fixed)
-        SCHEMA_KEYS = ["tender_id","category","title","location","issuing_authority","publication_date","submission_deadline",
-                       "bid_opening_date","tender_value","bid_opening_time","emd","tender_fee","performance_guarantee","contract_duration",
-                       "contact_emails","contact_phones","scope_of_work","eligibility_summary","required_documents",
-                       "exclusion_criteria","disqualification_criteria","technical_documents","deliverables","projects",
-                       "bidding_scope","short_summary"]
-        final_obj = {}
-        for k in SCHEMA_KEYS:
-            val = merged.get(k, "")
-            if k in ("contact_emails","contact_phones","projects"):
-                if isinstance(val, list):
-                    final_obj[k] = val
-                elif isinstance(val, str) and val.strip():
-                    final_obj[k] = [v.strip() for v in re.split(r"[,\n;]+", val) if v.strip()]
-                else:
-                    final_obj[k] = []
-            else:
-                final_obj[k] = val if val is not None else ""
-
-        # Normalize dates to DD-MM-YYYY where possible
-        def parse_date_to_ddmmYYYY_local(textval: str) -> str:
-            if not textval:
-                return ""
-            s = str(textval).strip()
-            patterns = [r'(\d{1,2})[/-](\d{1,2})[/-](\d{2,4})', r'(\d{1,2})\.(\d{1,2})\.(\d{2,4})']
-            for pat in patterns:
-                m = re.search(pat, s)
-                if not m:
-                    continue
+
+# Bump when tender_columns() changes; older rows are recomputed at startup
+TENDER_COLUMNS_VERSION = 3
+
+
+def recommendation_of(record: Dict[str, Any]) -> str:
+    """Normalized bid recommendation from the record's eval: "PURSUE", "DO NOT PURSUE" or "" (needs review)."""
+    rec = str((record.get("eval") or {}).get("pursue_recommendation") or "").upper()
+    if "NOT PURSUE" in rec:
+        return "DO NOT PURSUE"
+    if "PURSUE" in rec:
+        return "PURSUE"
+    return ""
+
+
+def tender_columns(record: Dict[str, Any], amounts: bool = True) -> Dict[str, Any]:
+    """
+    Precomputed filter/sort columns for TenderStore (computed once, at store time).
+
+    Args:
+        record (dict): Full tender record.
+        amounts (bool): Also parse the money columns (the batch backfill does those vectorized).
+    """
+    meta = record.get("meta") or {}
+    authority = str(meta.get("issuing_authority") or "")
+    title = str(record.get("title") or "")
+    search = " ".join(str(x) for x in (title, meta.get("tender_id") or "", authority, record.get("location") or "") if x)
+    cols = {
+        "category": meta.get("category") or "",
+        "deadline": parse_deadline_iso(meta.get("submission_deadline")),
+        "authority": authority.lower(),
+        "title": title.lower(),
+        "search": search.lower(),
+        "recommendation": recommendation_of(record),
+        "columns_v": TENDER_COLUMNS_VERSION,
+    }
+    if amounts:
+        cols["value_paise"] = meta.get("tender_value_paise", amount_to_paise(meta.get("tender_value")))
+        cols["emd_paise"] = meta.get("emd_paise", amount_to_paise(meta.get("emd")))
+    return cols
+
+
+def refresh_tender_columns():
+    """Recompute the columns of rows stored by an older TENDER_COLUMNS_VERSION (amounts vectorized)."""
+    rows = TENDER_STORE.stale_rows(TENDER_COLUMNS_VERSION)
+    if not rows:
+        return
+    import pandas as pd
+    metas = [rec.get("meta") or {} for _, rec in rows]
+    value_paise = amounts_to_paise([m.get("tender_value") for m in metas])
+    emd_paise = amounts_to_paise([m.get("emd") for m in metas])
+    updates = []
+    for i, (key, rec) in enumerate(rows):
+        cols = tender_columns(rec, amounts=False)
+        cols["value_paise"] = None if pd.isna(value_paise.iloc[i]) else int(value_paise.iloc[i])
+        cols["emd_paise"] = None if pd.isna(emd_paise.iloc[i]) else int(emd_paise.iloc[i])
+        updates.append((key, cols))
+    TENDER_STORE.update_columns(updates)
+    log(f"Recomputed store columns for {len(updates)} tenders")
+
+
+def store_tender(record: Dict[str, Any]) -> Dict[str, Any]:
+    """Persist a full tender record server-side and return its browser projection."""
+    key = tender_key(record)
+    TENDER_STORE.upsert(key, record, tender_columns(record))
+    index_tender_search(record, key)
+    return tender_summary(record, key)
+
+
+# --------------------
+# Hybrid (BM25 + vector) tender search
+# --------------------
+SEARCH_INDEX = BM25Index()
+_SEARCH_INDEX_READY = threading.Event()
+_SEARCH_INDEX_SYNCED_AT = None  # TENDER_STORE "updated" time the index has caught up to
+_SEARCH_INDEX_SYNC_LOCK = threading.Lock()
+SEARCH_SYNC_SLACK_S = 5.0  # rows are stamped before they commit, so re-read a little before the watermark
+
+
+def search_fields(record: Dict[str, Any], raw_text: str = None) -> List[Tuple[str, int]]:
+    """(text, weight) fields BM25 indexes for a tender: identifiers and title weigh most, body text least."""
+    meta = record.get("meta") or {}
+    text = record.get("raw_text") if raw_text is None else raw_text
+    return [
+        (f"{record.get('title') or ''} {meta.get('tender_id') or ''}", 3),
+        (f"{meta.get('issuing_authority') or ''} {record.get('location') or ''} {meta.get('category') or ''}", 2),
+        (f"{record.get('summary') or ''} {meta.get('scope_of_work') or ''} {meta.get('eligibility_summary') or ''}", 1),
+        ((text or "")[:CONFIG.get("search_text_chars", 50000)], 1),
+    ]
+
+
+def index_tender_search(record: Dict[str, Any], key: str = None):
+    """Add or refresh one tender in the BM25 index (runs on every store_tender)."""
+    if CONFIG.get("use_hybrid_search"):
+        SEARCH_INDEX.add(key or tender_key(record), search_fields(record))
+
+
+def sync_search_index(block: bool = True) -> int:
+    """
+    Index the tenders written to TENDER_STORE since the last sync, by any process.
+
+    SEARCH_INDEX lives in one process while the store is shared with the other gunicorn
+    workers and `--worker` processes, so `hybrid_search` calls this every
+    CONFIG["search_refresh_s"] seconds. The first sync indexes every tender.
+
+    Args:
+        block (bool): Wait for a sync already running in another thread (False: skip).
+
+    Returns:
+        int: Tenders (re-)indexed.
+    """
+    global _SEARCH_INDEX_SYNCED_AT
+    if not _SEARCH_INDEX_SYNC_LOCK.acquire(blocking=block):
+        return 0
+    try:
+        started = time.time()
+        since = None if _SEARCH_INDEX_SYNCED_AT is None else _SEARCH_INDEX_SYNCED_AT - SEARCH_SYNC_SLACK_S
+        n = 0
+        for key, record, raw_text in TENDER_STORE.iter_documents(updated_since=since):
+            SEARCH_INDEX.add(key, search_fields(record, raw_text))
+            n += 1
+        _SEARCH_INDEX_SYNCED_AT = started
+        return n
+    finally:
+        _SEARCH_INDEX_SYNC_LOCK.release()
+
+
+def build_search_index():
+    """Fill the BM25 index from TENDER_STORE (background thread at startup); tile search stays on substring match until done."""
+    t0 = time.time()
+    sync_search_index()
+    _SEARCH_INDEX_READY.set()
+    log(f"Search index built: {len(SEARCH_INDEX)} tenders in {time.time() - t0:.1f}s")
+
+
+def start_search_index():
+    if CONFIG.get("use_hybrid_search") and not _SEARCH_INDEX_READY.is_set():
+        threading.Thread(target=build_search_index, daemon=True, name="search-index").start()
+
+
+def hybrid_search(query: str, k: int = None, **filters) -> List[Tuple[str, float]]:
+    """
+    Rank tenders for `query` by reciprocal-rank fusion of BM25 and vector search.
+
+    BM25 catches exact tokens (NIT numbers, "ISO 27001", "CERT-IN", district names) that
+    the embedding model blurs; the vector index catches paraphrases. Metadata filters
+    (TenderStore.query keyword arguments) are resolved to a key set first and both
+    retrievers are restricted to it. Tenders stored by other processes are pulled into
+    the BM25 index first (`sync_search_index`, at most every CONFIG["search_refresh_s"]).
+
+    Args:
+        query (str): Search text.
+        k (int): Number of tenders; defaults to CONFIG["search_candidates"].
+        **filters: category, deadline_from, deadline_to, authority, min_value, max_value.
+
+    Returns:
+        list: (tender key, fused score) pairs, best first.
+    """
+    k = k or CONFIG.get("search_candidates", 200)
+    if time.time() - (_SEARCH_INDEX_SYNCED_AT or 0) > CONFIG.get("search_refresh_s", 10):
+        sync_search_index(block=False)
+    allowed = TENDER_STORE.keys(**filters)
+    allowed = set(allowed) if allowed is not None else None
+    if allowed is not None and not allowed:
+        return []
+    rankings = [[key for key, _ in SEARCH_INDEX.search(query, k=k, allowed=allowed)]]
+
+    store = get_vector_store()
+    if store is not None:
+        seen, ranked = set(), []
+        for hit in store.search(query, k=CONFIG.get("search_vector_k", 100)):
+            key = (hit.get("meta") or {}).get("tender_key")
+            if key and key not in seen and (allowed is None or key in allowed):
+                seen.add(key)
+                ranked.append(key)
+        rankings.append(ranked)
+    return rrf_fuse(rankings, k=CONFIG.get("search_rrf_k", 60))[:k]
+
+
+# --------------------
+# Job queue workers
+# --------------------
+JOB_QUEUE = JobQueue(CONFIG["job_db"], lease_s=CONFIG.get("job_lease_s", 900),
+                     max_attempts=CONFIG.get("job_max_attempts", 3))
+PROGRESS_BUS = ProgressBus()
+_JOB_DISPATCHER = None
+_JOB_DISPATCHER_LOCK = threading.Lock()
+
+
+def run_job_worker(stop_event: threading.Event = None, idle_exit: bool = False):
+    """
+    Pull documents from JOB_QUEUE and push them through the two-stage pipeline.
+
+    `extract_stage` (text layer, OCR fan-out, regex) runs on CONFIG["pipeline_cpu_workers"]
+    threads; each extracted document goes straight to `finish_stage` (LLM calls, JSON
+    writes) on CONFIG["pipeline_io_workers"] threads, so OCR of one tender overlaps LLM
+    waits of another. New documents are only claimed while the CPU stage has room, and
+    in-flight documents renew their lease so other workers leave them alone. Any number
+    of these loops (threads here, or `python TenderAnalyser.py --worker` processes) can
+    share one queue.
+
+    Args:
+        stop_event (threading.Event): Ends the loop once set.
+        idle_exit (bool): Return as soon as the queue is empty instead of polling.
+    """
+    worker_id = f"{socket.gethostname()}:{os.getpid()}:{threading.get_ident()}"
+    cpu_n = max(1, int(CONFIG.get("pipeline_cpu_workers", 2)))
+    io_n = max(1, int(CONFIG.get("pipeline_io_workers", 4)))
+    poll = float(CONFIG.get("job_poll_s", 1.0))
+    heartbeat = max(poll, JOB_QUEUE.lease_s / 3)
+    cpu_pool = ThreadPoolExecutor(max_workers=cpu_n, thread_name_prefix="extract")
+    io_pool = ThreadPoolExecutor(max_workers=io_n, thread_name_prefix="finish")
+    pending = {}
+    n_extract = 0
+    last_beat = time.time()
+    try:
+        while not (stop_event and stop_event.is_set()):
+            while n_extract < cpu_n and len(pending) < cpu_n + 2 * io_n:
+                doc = JOB_QUEUE.claim(worker_id)
+                if doc is None:
+                    break
+                PROGRESS_BUS.ensure_job(doc["job_id"], lambda: JOB_QUEUE.progress(doc["job_id"]))
+                pending[cpu_pool.submit(_run_stage, "extract", extract_stage, doc, doc)] = ("extract", doc)
+                n_extract += 1
+            if not pending:
+                if idle_exit:
+                    break
+                time.sleep(poll)
+                continue
+
+            finished, _ = wait(pending, timeout=poll, return_when=FIRST_COMPLETED)
+            for fut in finished:
+                stage, doc = pending.pop(fut)
+                if stage == "extract":
+                    n_extract -= 1
+                # storing or recording one document must never take the dispatcher down
                 try:
-                    d, mo, y = int(m.group(1)), int(m.group(2)), int(m.group(3))
-                    if y < 100: y += 2000
-                    return date(y, mo, d).strftime("%d-%m-%Y")
-                except Exception:
-                    continue
-            return ""
-        
-        for dk in ("submission_deadline","publication_date","bid_opening_date"):
-            raw = final_obj.get(dk,"")
-            normalized = parse_date_to_ddmmYYYY_local(raw)
-            if normalized:
-                final_obj[dk] = normalized
-        _date_sanity_fix(final_obj)
-
-
-        if not final_obj.get("title"):
-            m_now = re.search(r"(?is)Name\s*of\s*Work\s*[:\-]\s*(.+?)(?:\n|$)", text)
-            if m_now:
-                final_obj["title"] = m_now.group(1).strip()
-                log(f"Title fallback (Name of Work): {final_obj['title']}")
-
-        # Debug logs
-        for key in ["tender_id","issuing_authority","emd","tender_fee","performance_guarantee","submission_deadline","bid_opening_date"]:
-            log(f"{key}: {final_obj.get(key)}")
-
-        eval_res = {}
-        if CONFIG["use_llm_eval"]:
-            eval_res = llm_evaluate(final_obj) or {}
-
-        metadata = {"extraction_meta": {"regex_candidates": regexed, "llm_candidates": llm_extracted, "eval": eval_res}}
-
-        safe_name = safe_stem(os.path.splitext(fname)[0])
-        out_dir = os.path.join(CONFIG["extraction_output_dir"], safe_name)
-        os.makedirs(out_dir, exist_ok=True)
-        write_json(os.path.join(out_dir, "extraction.json"), final_obj)
-        write_json(os.path.join(out_dir, "metadata.json"), metadata)
-
-        tender_record = {
-            "id": final_obj.get("tender_id") or fname,
-            "title": final_obj.get("title") or fname,
-            "location": final_obj.get("location") or "",
-            "meta": final_obj,
-            "eval": eval_res,
-            "summary": final_obj.get("short_summary","") or final_obj.get("scope_of_work","") or "",
-            "raw_text": text,
-            "confidence": (eval_res.get("priority_score")/10.0) if eval_res.get("priority_score") else 0.7,
-            "source_file": upload_path,
-            "extraction_path": os.path.join(out_dir, "extraction.json")
-        }
-        results.append(tender_record)
+                    out = fut.result()
+                    if stage == "extract" and "record" not in out:
+                        JOB_QUEUE.set_stage(doc["job_id"], doc["seq"], "finish", worker_id)
+                        pending[io_pool.submit(_run_stage, "finish", finish_stage, doc, out)] = ("finish", doc)
+                        continue
+                    record = out["record"] if stage == "extract" else out
+                    if JOB_QUEUE.complete(doc["job_id"], doc["seq"], store_tender(record), worker_id):
+                        PROGRESS_BUS.doc_finished(doc["job_id"], doc["seq"])
+                    else:
+                        log(f"{doc['filename']}: lease lost to another worker, its result is kept")
+                except Exception as e:
+                    log(f"{stage} failed for {doc['filename']}: {e}")
+                    try:
+                        if JOB_QUEUE.fail(doc["job_id"], doc["seq"], e, worker_id):
+                            PROGRESS_BUS.doc_finished(doc["job_id"], doc["seq"], ok=False)
+                    except Exception as e2:
+                        # left running; the lease expires and another claim retries it (up to job_max_attempts)
+                        log(f"Could not record failure of {doc['filename']}: {e2}")
+
+            if time.time() - last_beat > heartbeat:
+                for stage, doc in pending.values():
+                    try:
+                        JOB_QUEUE.set_stage(doc["job_id"], doc["seq"], stage, worker_id)
+                    except Exception as e:
+                        log(f"Lease renewal failed for {doc['filename']}: {e}")
+                last_beat = time.time()
+    finally:
+        cpu_pool.shutdown(wait=False, cancel_futures=True)
+        io_pool.shutdown(wait=False, cancel_futures=True)
+
+
+def _run_stage(stage: str, fn, doc: Dict[str, Any], arg: Any):
+    """Run one pipeline stage for a queued document, reporting start/end and duration to PROGRESS_BUS."""
+    PROGRESS_BUS.stage_started(doc["job_id"], doc["seq"], doc["filename"], stage)
+    t0 = time.time()
+    try:
+        return fn(arg)
+    finally:
+        PROGRESS_BUS.stage_finished(doc["job_id"], doc["seq"], stage, time.time() - t0)
+
+
+def job_progress(job_id: str, live: Dict[str, Any] = None) -> Dict[str, Any]:
+    """
+    Progress of a batch.
+
+    total/done/failed/status always come from the job queue: documents of one batch may
+    be claimed by other processes (`--worker`, other gunicorn workers) or failed by
+    `JobQueue.claim`, and those never reach this process's PROGRESS_BUS. The bus adds
+    stage timings and the last changed document when this process runs part of the job.
+
+    Args:
+        job_id (str): Job ID.
+        live (dict): A PROGRESS_BUS snapshot already taken by the caller (default: take one).
 
-        progress["done"] = i + 1
-        write_json(prog_path, progress)
-        time.sleep(0.05)
+    Returns:
+        dict: JobQueue.progress fields, plus "stages", "last_doc", "elapsed_s" when known; {} for an unknown job.
+    """
+    prog = JOB_QUEUE.progress(job_id)
+    live = live if live is not None else PROGRESS_BUS.snapshot(job_id)
+    if prog and live:
+        prog.update({k: live[k] for k in ("stages", "last_doc", "elapsed_s") if k in live})
+    return prog
+
+
+def start_job_workers():
+    """Start the in-process queue worker once (daemon thread); safe to call repeatedly."""
+    global _JOB_DISPATCHER
+    with _JOB_DISPATCHER_LOCK:
+        if _JOB_DISPATCHER is None or not _JOB_DISPATCHER.is_alive():
+            _JOB_DISPATCHER = threading.Thread(target=run_job_worker, name="job-dispatcher", daemon=True)
+            _JOB_DISPATCHER.start()
 
-    progress["status"] = "done"
-    progress["current_file"] = ""
-    write_json(prog_path, progress)
-    write_json(pending_path, {"results": results})
+
+# --------------------
+# Deferred startup and warm-up
+# --------------------
+_BACKGROUND_INIT_STARTED = False
+_BACKGROUND_INIT_LOCK = threading.Lock()
+
+
+def _warm_vector_store():
+    store = get_vector_store()
+    if store is not None:
+        store.embedding_fn(["warm up"])  # loads the embedding model weights
+
+
+def _warm_page_pool():
+    pool = get_page_pool()
+    for f in [pool.submit(os.getpid) for _ in range(max(1, int(CONFIG.get("extract_workers", 1))))]:
+        f.result(timeout=60)  # spawns the OCR worker processes (imports page_extract, PyMuPDF, pytesseract)
+
+
+def background_init():
+    """
+    Startup work that must not delay serving: store migrations, the BM25 index build and
+    resuming interrupted batches; then, with CONFIG["warm_up"], the subsystems that would
+    otherwise initialise on first use (LLM client, vector store + embedding model, OCR
+    worker processes). Each step is timed and logged; a failing step is skipped.
+    """
+    steps = [("store columns", refresh_tender_columns), ("search index", start_search_index),
+             ("job queue", lambda: JOB_QUEUE.has_work() and start_job_workers())]
+    if CONFIG.get("warm_up", True):
+        steps += [("LLM client", get_llm_client), ("vector store", _warm_vector_store), ("OCR pool", _warm_page_pool)]
+    for name, fn in steps:
+        t0 = time.time()
+        try:
+            fn()
+            log(f"Startup: {name} ready in {time.time() - t0:.2f}s")
+        except Exception as e:
+            log(f"Startup: {name} failed after {time.time() - t0:.2f}s: {e}")
+
+
+def start_background_init():
+    """Run `background_init` once per process, on a daemon thread."""
+    global _BACKGROUND_INIT_STARTED
+    with _BACKGROUND_INIT_LOCK:
+        if _BACKGROUND_INIT_STARTED:
+            return
+        _BACKGROUND_INIT_STARTED = True
+    threading.Thread(target=background_init, name="background-init", daemon=True).start()
+
+
+@server.before_request
+def _background_init_on_first_request():
+    # The first request proves the server is accepting connections (dev server or any
+    # gunicorn worker); heavy initialisation starts only then and never blocks it.
+    if not _BACKGROUND_INIT_STARTED:
+        start_background_init()
 
 # --------------------
 # Combined upload + poll callback (kept)
@@ -1421,49 +3342,60 @@ def process_files_worker(encoded_items: List[Dict[str,str]]):
     Output("process-status", "children"),
     Output("progress-interval", "disabled"),
     Output("tenders-store", "data"),
+    Output("job-store", "data"),
     Input("upload-files", "contents"),
     Input("upload-files", "filename"),
     Input("process-btn", "n_clicks"),
     Input("progress-interval", "n_intervals"),
+    Input("progress-sse", "data"),
     State("tenders-store", "data"),
+    State("job-store", "data"),
     prevent_initial_call=False
 )
-def combined_upload_and_poll(contents, filenames, process_clicks, n_intervals, tenders_data):
+def combined_upload_and_poll(contents, filenames, process_clicks, n_intervals, pushed, tenders_data, job_id):
     tenders_data = tenders_data or []
     trig = ctx.triggered_id
 
     if trig == "upload-files":
         if not filenames:
-            return html.Div("No files selected."), {"display":"none"}, 0, "", "", True, tenders_data
+            return html.Div("No files selected."), {"display":"none"}, 0, "", "", True, tenders_data, job_id
         preview = html.Div([
             html.Div("Files selected:", className="mb-2"),
             html.Ul([html.Li(name) for name in filenames]),
             html.Div("Click 'Process Uploaded Files' to extract and save.", className="text-muted small mt-2")
         ])
-        return preview, {"display":"none"}, 0, "", "", True, tenders_data
+        return preview, {"display":"none"}, 0, "", "", True, tenders_data, job_id
 
     if trig == "process-btn":
         if not contents or not filenames:
             alert = dbc.Alert("No files to process. Please select files first.", color="warning")
-            return alert, {"display":"none"}, 0, "", "", True, tenders_data
+            return alert, {"display":"none"}, 0, "", "", True, tenders_data, job_id
 
         encoded_items = [{"content": c, "filename": n} for c, n in zip(contents, filenames)]
-        prog_initial = {"total": len(encoded_items), "done": 0, "status": "queued", "current_file": ""}
-        write_json(CONFIG["progress_file"], prog_initial)
-        thr = threading.Thread(target=process_files_worker, args=(encoded_items,), daemon=True)
-        thr.start()
+        job_id = uuid.uuid4().hex
+        job_dir = os.path.join(CONFIG["uploads_dir"], job_id)
+        documents = [save_upload(item, job_dir) for item in encoded_items]
+        JOB_QUEUE.create_job(documents, job_id=job_id)
+        PROGRESS_BUS.start_job(job_id, len(documents))
+        start_job_workers()
         preview = dbc.Alert([html.Div(f"Processing {len(encoded_items)} files in background:", style={"fontWeight":"600"}),
                              html.Ul([html.Li(n) for n in filenames])], color="info")
         style = {"display": "block"}
         value = 0
         children = f"0/{len(encoded_items)}"
         status = "Processing started..."
-        return preview, style, value, children, status, False, tenders_data
-
-    if trig == "progress-interval":
-        prog = read_json_safe(CONFIG["progress_file"]) or {}
+        # progress arrives over SSE once job-store is set; the interval stays off unless SSE fails
+        return preview, style, value, children, status, True, tenders_data, job_id
+
+    if trig in ("progress-interval", "progress-sse"):
+        if trig == "progress-sse":
+            if not pushed or pushed.get("job_id") != job_id:
+                return (dash.no_update,) * 8  # late message from a previous job's stream
+            prog = {} if pushed.get("status") == "unknown" else pushed
+        else:
+            prog = job_progress(job_id) if job_id else {}
         if not prog:
-            return dash.no_update, {"display":"none"}, 0, "", "Idle", True, tenders_data
+            return dash.no_update, {"display":"none"}, 0, "", "Idle", True, tenders_data, None
 
         total = int(prog.get("total", 0) or 0)
         done = int(prog.get("done", 0) or 0)
@@ -1474,135 +3406,297 @@ def combined_upload_and_poll(contents, filenames, process_clicks, n_intervals, t
 
         if status in ("running", "queued"):
             status_text = f"Processing: {current}" if current else "Processing..."
-            return dash.no_update, {"display":"block"}, pct, children, status_text, False, tenders_data
+            stages = prog.get("stages") or {}
+            if stages:
+                parts = []
+                for name, st in stages.items():
+                    part = f"{name}: {st['running']} running, {st['done']} done"
+                    if st.get("mean_s") is not None:
+                        part += f", avg {st['mean_s']}s"
+                    parts.append(part)
+                status_text += " (" + "; ".join(parts) + ")"
+            return dash.no_update, {"display":"block"}, pct, children, status_text, dash.no_update, tenders_data, job_id
 
         if status == "done":
-            pending = read_json_safe(CONFIG["pending_results_file"]) or {}
-            results = pending.get("results", []) if pending else []
+            results = JOB_QUEUE.results(job_id)
             existing = list(tenders_data)
             for r in results:
-                sf = r.get("source_file")
-                if not any((e.get("source_file") and e.get("source_file") == sf) for e in existing):
+                if not any(e.get("key") == r.get("key") for e in existing):
                     existing.append(r)
-            try:
-                os.remove(CONFIG["progress_file"])
-            except Exception:
-                pass
-            try:
-                os.remove(CONFIG["pending_results_file"])
-            except Exception:
-                pass
-            return dash.no_update, {"display":"none"}, 100, f"{done}/{total}", "Processing complete.", True, existing
+            failed = int(prog.get("failed", 0) or 0)
+            status_text = f"Processing complete ({failed} failed, see server logs)." if failed else "Processing complete."
+            return dash.no_update, {"display":"none"}, 100, f"{done}/{total}", status_text, True, existing, None
+
+    # page (re)load with a batch still in flight for this session: the SSE client resumes it from job-store
+    return dash.no_update, dash.no_update, dash.no_update, dash.no_update, dash.no_update, True, tenders_data, job_id
+
+
+# One EventSource per page, (re)opened whenever job-store changes (new batch, page reload).
+# Each message is written to progress-sse, which drives combined_upload_and_poll; if the
+# browser has no EventSource or the stream breaks (proxy buffering, server restart), the
+# 1 s progress-interval poll is switched on instead.
+app.clientside_callback(
+    """
+    function (jobId) {
+        var dc = window.dash_clientside;
+        if (window._tenderProgressSource) {
+            window._tenderProgressSource.close();
+            window._tenderProgressSource = null;
+        }
+        if (!jobId) {
+            return dc.no_update;
+        }
+        if (typeof EventSource === "undefined") {
+            dc.set_props("progress-interval", {disabled: false});
+            return dc.no_update;
+        }
+        var src = new EventSource("/progress/" + encodeURIComponent(jobId) + "/stream");
+        window._tenderProgressSource = src;
+        src.onmessage = function (e) {
+            var snap = JSON.parse(e.data);
+            if (snap.status === "done") {
+                src.close();
+            }
+            dc.set_props("progress-sse", {data: snap});
+        };
+        src.addEventListener("unknown", function () {
+            src.close();
+            dc.set_props("progress-sse", {data: {job_id: jobId, status: "unknown"}});
+        });
+        src.onerror = function () {
+            if (window._tenderProgressSource !== src) {
+                return;
+            }
+            src.close();
+            window._tenderProgressSource = null;
+            dc.set_props("progress-interval", {disabled: false});
+        };
+        return dc.no_update;
+    }
+    """,
+    Output("progress-sse", "data"),
+    Input("job-store", "data"),
+)
+
+
+# --------------------
+# Progress endpoints (JSON snapshot + server-sent events)
+# --------------------
+@app.server.route("/progress/<job_id>")
+def progress_snapshot(job_id):
+    return jsonify(job_progress(job_id) or {})
 
-        if status == "error":
-            return dash.no_update, {"display":"none"}, pct, children, "Error during processing. Check server logs.", True, tenders_data
 
-    return dash.no_update, dash.no_update, dash.no_update, dash.no_update, dash.no_update, True, tenders_data
+@app.server.route("/progress/<job_id>/stream")
+def progress_stream(job_id):
+    """
+    Server-sent events: one `data:` message per progress change until the job is done.
+
+    Wakes on every PROGRESS_BUS change of the job, or after job_poll_s at the latest, and
+    re-reads the totals from the queue each time (see `job_progress`), so documents
+    finished by other processes still move the stream to "done".
+    """
+    def events():
+        poll = float(CONFIG.get("job_poll_s", 1.0))
+        version, sent, last_write = -1, None, time.time()
+        while True:
+            live = PROGRESS_BUS.wait(job_id, version, timeout=poll)
+            if live is None:
+                time.sleep(poll)  # not running in this process; wait() returned at once
+            else:
+                version = live["version"]
+            prog = job_progress(job_id, live)
+            if not prog:
+                yield "event: unknown\ndata: {}\n\n"
+                return
+            state = {k: v for k, v in prog.items() if k != "elapsed_s"}
+            if state != sent:
+                sent, last_write = state, time.time()
+                yield f"data: {json.dumps(prog, ensure_ascii=False)}\n\n"
+                if prog.get("status") == "done":
+                    return
+            elif time.time() - last_write > 15.0:
+                last_write = time.time()
+                yield ": keep-alive\n\n"
+    return Response(stream_with_context(events()), mimetype="text/event-stream",
+                    headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
 
 
 # --------------------
 # KPIs + tiles (unchanged except icon pick uses enhanced mapping)
 # --------------------
-@app.callback(Output("kpi-row","children"), Output("tender-tiles","children"),
+@app.callback(Output("kpi-row","children"),
               Input("tenders-store","data"), Input("refresh-kpi","n_clicks"),
               prevent_initial_call=False)
 def render_dashboard(tenders_data, _):
-    tenders_data = tenders_data or []
-
-    # KPIs (unchanged)
-    total_value = 0
-    recommended = sum(1 for t in tenders_data if str(t.get("meta",{}).get("eval",{}).get("pursue_recommendation","")).upper() == "PURSUE")
-    needs_review = sum(1 for t in tenders_data if not t.get("meta"))
-    no_bid = sum(1 for t in tenders_data if str(t.get("meta",{}).get("eval",{}).get("pursue_recommendation","")).upper() == "DO NOT PURSUE")
+    """KPIs read from the incrementally maintained TenderStore counters (no scan over tenders)."""
+    k = TENDER_STORE.kpis()
+    total_value = format_inr_paise(k.get("value_paise", 0), compact=True)
+    total_emd = format_inr_paise(k.get("emd_paise", 0), compact=True)
+    recommended = k.get("rec:PURSUE", 0)
+    needs_review = k.get("rec:", 0)
+    no_bid = k.get("rec:DO NOT PURSUE", 0)
+
+    # deadline buckets from the per-day counters
+    today = date.today()
+    week, month, closed = today + timedelta(days=7), today + timedelta(days=30), 0
+    this_week = this_month = 0
+    for name, n in k.items():
+        if not name.startswith("deadline:"):
+            continue
+        d = date.fromisoformat(name[9:])
+        if d < today:
+            closed += n
+        else:
+            this_week += n if d <= week else 0
+            this_month += n if d <= month else 0
+    top_cats = sorted(((n, name[4:]) for name, n in k.items() if name.startswith("cat:") and name[4:]), reverse=True)[:4]
 
     kpis = [
-        dbc.Col(dbc.Card(dbc.CardBody([html.Div("Total Tender Value (EMD numeric sum)", className="text-muted small"), html.H4(f"₹ {total_value}") ])), md=3),
+        dbc.Col(dbc.Card(dbc.CardBody([html.Div("Total Tender Value", className="text-muted small"), html.H4(total_value),
+                                       html.Div(f"EMD total: {total_emd} • {k.get('with_value', 0)} of {k.get('count', 0)} with value", className="text-muted small")])), md=3),
         dbc.Col(dbc.Card(dbc.CardBody([html.Div("Recommended to Bid", className="text-muted small"), html.H4(str(recommended), className="text-success")])), md=3),
         dbc.Col(dbc.Card(dbc.CardBody([html.Div("Needs Review", className="text-muted small"), html.H4(str(needs_review), className="text-warning")])), md=3),
         dbc.Col(dbc.Card(dbc.CardBody([html.Div("No-Bid", className="text-muted small"), html.H4(str(no_bid), className="text-danger")])), md=3),
+        dbc.Col(dbc.Card(dbc.CardBody([html.Div("Closing This Week", className="text-muted small"), html.H4(str(this_week)),
+                                       html.Div(f"{this_month} within 30 days • {closed} closed", className="text-muted small")])), md=3, className="mt-3"),
+        dbc.Col(dbc.Card(dbc.CardBody([html.Div("Top Categories", className="text-muted small"),
+                                       html.Div([html.Span(f"{c}: {n}", className="badge bg-light text-dark me-2") for n, c in top_cats] or "—")])),
+                md=9, className="mt-3"),
     ]
-
-    # --- Tiles: title + location + one-liner + deadline (+days) only ---
-    tiles = []
-    for idx, t in enumerate(tenders_data):
-        title = t.get("title","Untitled")
-        location = t.get("location","")
-        meta = t.get("meta", {}) or {}
-
-        # one-liner (with safe fallback)
-        one_liner = (t.get("summary") or meta.get("short_summary") or meta.get("scope_of_work") or "").strip()
-        one_liner = one_liner.split("\n")[0] if one_liner else ""
-        if not one_liner:
-            # clean fallback built from known fields (kept short)
-            bits = []
-            if meta.get("category"): bits.append(meta["category"])
-            if meta.get("contract_duration"): bits.append(f"Duration: {meta['contract_duration']}")
-            if meta.get("tender_value"): bits.append(f"Value: {meta['tender_value']}")
-            if meta.get("emd"): bits.append(f"EMD: {meta['emd']}")
-            if meta.get("tender_fee"): bits.append(f"Fee: {meta['tender_fee']}")
-            one_liner = " • ".join(bits) or "—"
-        one_liner = one_liner[:220]
-
-        # deadline + days-left (strict validation; else N/A)
-        raw_deadline = (meta.get("submission_deadline") or "").strip()
-        deadline_display, days_left_text = ("N/A", "")
-        parsed = None
-        # Accept only clean date formats; anything else → N/A
-        for fmt in ("%d-%m-%Y","%d/%m/%Y","%Y-%m-%d"):
-            try:
-                parsed = datetime.strptime(raw_deadline, fmt).date()
-                break
-            except:
-                continue
-        if parsed:
-            deadline_display = parsed.strftime("%b %d, %Y")
-            d = (parsed - date.today()).days
-            days_left_text = f" • {d} days left" if d > 0 else (" • Due today" if d == 0 else f" • Closed {abs(d)} days ago")
-
-        icon = pick_icon(meta.get("category",""), title, one_liner)
-
-        tile = dbc.Card(
-            dbc.CardBody([
+    return dbc.Row(kpis)
+
+
+def build_tile(t: Dict[str, Any], deadline_iso: str = None):
+    """One dashboard tile (tenders-store projection + precomputed ISO deadline)."""
+    key = t.get("key")
+    title = t.get("title","Untitled")
+    location = t.get("location","")
+    meta = t.get("meta", {}) or {}
+
+    # one-liner (with safe fallback)
+    one_liner = (t.get("summary") or meta.get("short_summary") or meta.get("scope_of_work") or "").strip()
+    one_liner = one_liner.split("\n")[0] if one_liner else ""
+    if not one_liner:
+        # clean fallback built from known fields (kept short)
+        bits = []
+        if meta.get("category"): bits.append(meta["category"])
+        if meta.get("contract_duration"): bits.append(f"Duration: {meta['contract_duration']}")
+        if meta.get("tender_value"): bits.append(f"Value: {meta['tender_value']}")
+        if meta.get("emd"): bits.append(f"EMD: {meta['emd']}")
+        if meta.get("tender_fee"): bits.append(f"Fee: {meta['tender_fee']}")
+        one_liner = " • ".join(bits) or "—"
+    one_liner = one_liner[:220]
+
+    # deadline + days-left (ISO deadline precomputed at store time; anything unparsed → N/A)
+    if deadline_iso is None:
+        deadline_iso = parse_deadline_iso(meta.get("submission_deadline"))
+    deadline_display, days_left_text = ("N/A", "")
+    parsed = date.fromisoformat(deadline_iso) if deadline_iso else None
+    if parsed:
+        deadline_display = parsed.strftime("%b %d, %Y")
+        d = (parsed - date.today()).days
+        days_left_text = f" • {d} days left" if d > 0 else (" • Due today" if d == 0 else f" • Closed {abs(d)} days ago")
+
+    icon = pick_icon(meta.get("category",""), title, one_liner)
+
+    tile = dbc.Card(
+        dbc.CardBody([
+            html.Div([
+                html.Div(icon, className="tile-icon"),
                 html.Div([
-                    html.Div(icon, className="tile-icon"),
+                    html.H5(title, className="mb-1"),
+                    html.Div(location, className="text-muted small mb-1"),
+                    html.Div(one_liner, className="text-body-secondary"),
+                    # ✅ Tender meta details
                     html.Div([
-                        html.H5(title, className="mb-1"),
-                        html.Div(location, className="text-muted small mb-1"),
-                        html.Div(one_liner, className="text-body-secondary"),
-                        # ✅ Tender meta details
-html.Div([
-    html.Small("Tender ID", className="text-muted"),
-    html.Div(meta.get("tender_id", "N/A"), className="fw-bold")
-]),
-html.Div([
-    html.Small("Tender Date", className="text-muted"),
-    html.Div(meta.get("publication_date", "N/A"))
-]),
-html.Div([
-    html.Small("Tender Value", className="text-muted"),
-    html.Div(meta.get("tender_value", "N/A"), className="text-success fw-bold")
-]),
-
-                        html.Div([
-                            html.I(className="bi bi-clock me-1"),
-                            html.Span("Submission: "),
-                            html.Span(deadline_display),
-                            html.Span(days_left_text, className="text-muted")
-                        ], className="text-muted small mt-2")
-                    ], className="w-100")
-                ], className="d-flex gap-2 align-items-start"),
-                html.Div(className="mt-2"),
-                dbc.Row([
-                    dbc.Col(dbc.Button("More Details", id={"type":"detail-btn","index":idx}, color="primary", size="sm"), width="auto"),
-                    dbc.Col(dbc.Button("Ask AI", id={"type":"ask-btn","index":idx}, color="secondary", size="sm"), width="auto"),
-                ], align="center", className="g-2")
-            ]),
-            className="mb-3 shadow-sm"
-        )
-        tiles.append(tile)
+                        html.Small("Tender ID", className="text-muted"),
+                        html.Div(meta.get("tender_id", "N/A"), className="fw-bold")
+                    ]),
+                    html.Div([
+                        html.Small("Tender Date", className="text-muted"),
+                        html.Div(meta.get("publication_date", "N/A"))
+                    ]),
+                    html.Div([
+                        html.Small("Tender Value", className="text-muted"),
+                        html.Div(meta.get("tender_value", "N/A"), className="text-success fw-bold")
+                    ]),
+
+                    html.Div([
+                        html.I(className="bi bi-clock me-1"),
+                        html.Span("Submission: "),
+                        html.Span(deadline_display),
+                        html.Span(days_left_text, className="text-muted")
+                    ], className="text-muted small mt-2")
+                ], className="w-100")
+            ], className="d-flex gap-2 align-items-start"),
+            html.Div(className="mt-2"),
+            dbc.Row([
+                dbc.Col(dbc.Button("More Details", id={"type":"detail-btn","index":key}, color="primary", size="sm"), width="auto"),
+                dbc.Col(dbc.Button("Ask AI", id={"type":"ask-btn","index":key}, color="secondary", size="sm"), width="auto"),
+            ], align="center", className="g-2")
+        ]),
+        className="mb-3 shadow-sm"
+    )
+    return tile
 
-    return dbc.Row(kpis), tiles
 
+@app.callback(Output("tender-tiles","children"), Output("tiles-page","max_value"), Output("tiles-page","active_page"),
+              Output("tile-count","children"),
+              Input("tenders-store","data"), Input("tiles-page","active_page"),
+              Input("tile-search","value"), Input("tile-category","value"), Input("tile-deadline","value"),
+              Input("tile-authority","value"), Input("tile-sort","value"),
+              Input("tile-min-value","value"), Input("tile-max-value","value"),
+              prevent_initial_call=False)
+def render_tiles(tenders_data, page, search, category, deadline_window, authority, sort, min_value, max_value):
+    """
+    Render one page of tiles from every stored tender (tenders-store only triggers a
+    refresh after a batch). Filtering, sorting and paging run in TenderStore against
+    precomputed indexed columns, so only CONFIG["tiles_per_page"] tiles are built.
+    """
+    per_page = max(1, int(CONFIG.get("tiles_per_page", 24)))
+    if ctx.triggered_id != "tiles-page":
+        page = 1  # any filter change starts from the first page
+    page = max(1, int(page or 1))
+
+    today = date.today()
+    deadline_from = deadline_to = None
+    if deadline_window in ("7", "30"):
+        deadline_from, deadline_to = today.isoformat(), (today + timedelta(days=int(deadline_window))).isoformat()
+    elif deadline_window == "open":
+        deadline_from = today.isoformat()
+    elif deadline_window == "closed":
+        deadline_to = (today - timedelta(days=1)).isoformat()
+    sort = sort or "deadline"
+    descending = sort.endswith("_desc")
+    search = (search or "").strip()
+    filters = dict(
+        category=category or None, deadline_from=deadline_from, deadline_to=deadline_to,
+        authority=(authority or "").strip() or None,
+        min_value=int(min_value * 100) if min_value is not None else None,
+        max_value=int(max_value * 100) if max_value is not None else None,
+    )
+    offset = (page - 1) * per_page
+
+    if search and CONFIG.get("use_hybrid_search") and _SEARCH_INDEX_READY.is_set():
+        # ranked candidates from BM25 + vectors; "relevance" pages through them in rank order
+        keys = [key for key, _ in hybrid_search(search, **filters)]
+        if sort == "relevance":
+            page_keys = keys[offset:offset + per_page]
+            found = {r["key"]: r for r in TENDER_STORE.query(keys=page_keys, limit=per_page)[0]}
+            rows, total = [found[key] for key in page_keys if key in found], len(keys)
+        else:
+            rows, total = TENDER_STORE.query(keys=keys, sort=sort[:-5] if descending else sort,
+                                             descending=descending, offset=offset, limit=per_page)
+    else:
+        rows, total = TENDER_STORE.query(
+            search=search or None, sort=sort[:-5] if descending else sort, descending=descending,
+            offset=offset, limit=per_page, **filters,
+        )
+    pages = max(1, -(-total // per_page))
+    tiles = [build_tile(tender_summary(r, r.get("key")), r.get("_deadline")) for r in rows]
+    count = f"{total} tender(s) • page {min(page, pages)} of {pages}"
+    return tiles, pages, min(page, pages), count
 
 
 # --------------------
@@ -1621,12 +3715,15 @@ def unified_tile_and_chat(detail_clicks, ask_clicks, chat_send_click, chat_input
     triggered = ctx.triggered_id
     tenders_data = tenders_data or []
     chat_data = chat_data or []
+    if isinstance(triggered, dict) and not ctx.triggered[0].get("value"):
+        # a page of tiles was (re)rendered; no button was actually clicked
+        return dash.no_update, chat_data
 
     if isinstance(triggered, dict) and triggered.get("type") == "detail-btn":
-        idx = triggered["index"]
-        if idx < 0 or idx >= len(tenders_data):
+        # tiles are paginated, so buttons carry the store key rather than a list position
+        t = load_tender({"key": triggered["index"]})
+        if not t:
             return dbc.Alert("Invalid tender selected."), chat_data
-        t = tenders_data[idx]
         m = t.get("meta", {}) or {}
 
         # Core fields
@@ -1706,19 +3803,20 @@ def unified_tile_and_chat(detail_clicks, ask_clicks, chat_send_click, chat_input
         return detail_card, chat_data
 
     if isinstance(triggered, dict) and triggered.get("type") == "ask-btn":
-        idx = triggered["index"]
-        if idx < 0 or idx >= len(tenders_data):
+        t = load_tender({"key": triggered["index"]})
+        if not t:
             return dash.no_update, chat_data
-        t = tenders_data[idx]
         q = f"Brief me on tender '{t.get('title')}' in {t.get('location')}"
         chat_data = chat_data + [{"role":"user","content": q}]
         assistant_text = ""
-        if LLM_CLIENT is not None:
+        if get_llm_client() is not None:
             try:
                 system_prompt = "You are TenderGPT, answer concisely using the tender context if provided."
-                messages = [{"role":"system","content":system_prompt}, {"role":"user","content": q}]
-                resp = LLM_CLIENT.chat.completions.create(model=CONFIG["llm_model"], messages=messages, temperature=0.2, max_tokens=300)
-                assistant_text = resp.choices[0].message.content.strip()
+                context, _ = retrieve_context(f"{q}. Scope of work, eligibility, deadlines, EMD and fees.", [t])
+                messages = [{"role":"system","content":system_prompt},
+                            {"role":"system","content":"Tender context:\n" + context},
+                            {"role":"user","content": q}]
+                assistant_text = llm_chat(messages, temperature=0.2, max_tokens=300)
             except Exception as e:
                 assistant_text = f"LLM error: {e}"
         else:
@@ -1730,25 +3828,18 @@ def unified_tile_and_chat(detail_clicks, ask_clicks, chat_send_click, chat_input
         if not chat_input or str(chat_input).strip() == "":
             return dash.no_update, chat_data
         chat_data = chat_data + [{"role":"user","content": chat_input}]
-        context_texts = []
-        if selected_context and tenders_data:
-            for sel in selected_context:
-                try:
-                    idx = int(sel)
-                    if 0 <= idx < len(tenders_data):
-                        context_texts.append(json.dumps(tenders_data[idx].get("meta",{})))
-                except Exception:
-                    continue
+        # selected tenders (options carry store keys) -> retrieved passages within a fixed budget
+        records = [r for r in (load_tender({"key": sel}) for sel in (selected_context or [])) if r]
         assistant_text = ""
-        if LLM_CLIENT is not None:
+        if get_llm_client() is not None:
             try:
                 system_prompt = "You are TenderGPT, answer concisely using the tender context if provided."
                 messages = [{"role":"system","content": system_prompt}]
-                if context_texts:
-                    messages.append({"role":"system","content":"Tender context:\n" + "\n\n".join(context_texts)})
+                context, _ = retrieve_context(chat_input, records) if records else ("", [])
+                if context:
+                    messages.append({"role":"system","content":"Tender context:\n" + context})
                 messages.append({"role":"user","content": chat_input})
-                resp = LLM_CLIENT.chat.completions.create(model=CONFIG["llm_model"], messages=messages, temperature=0.2, max_tokens=300)
-                assistant_text = resp.choices[0].message.content.strip()
+                assistant_text = llm_chat(messages, temperature=0.2, max_tokens=300)
             except Exception as e:
                 assistant_text = f"LLM error: {e}"
         else:
@@ -1774,12 +3865,18 @@ def render_chat_window(chat_data):
 @app.callback(Output("chat-context-select","options"), Input("tenders-store","data"))
 def populate_chat_context(tenders_data):
     tenders_data = tenders_data or []
-    return [{"label": t.get("title", f"Tender {i+1}"), "value": str(i)} for i, t in enumerate(tenders_data)]
+    return [{"label": t.get("title", f"Tender {i+1}"), "value": t.get("key") or str(i)} for i, t in enumerate(tenders_data)]
 
 # --------------------
 # Run
 # --------------------
 if __name__ == "__main__":
+    if "--worker" in sys.argv:
+        # Headless queue worker: `python TenderAnalyser.py --worker` (run as many as needed)
+        run_job_worker()
+        sys.exit(0)
+    # migrations, search index, resuming interrupted batches and warm-up run on the
+    # first request (start_background_init), after the server is accepting connections
     host = "127.0.0.1"
     port = 8050
     url = f"http://{host}:{port}"
@@ -0,0 +1,92 @@
+# --------------------
+# Benchmark: embedding backends (torch fp32, torch int8, ONNX Runtime) and the embedding cache
+# --------------------
+# Usage:
+#   python bench_embeddings.py                     # synthetic tender chunks
+#   python bench_embeddings.py a.pdf b.docx        # chunks of your own documents
+#   python bench_embeddings.py --backends onnx,torch-int8
+#
+# Per backend: model load time, cold embedding throughput, warm (cached) throughput,
+# time to build an in-memory Chroma index of the chunks, and mean cosine similarity to
+# the torch fp32 vectors (how far quantization / ONNX drift from the reference model).
+import sys
+import time
+import random
+import shutil
+import tempfile
+
+import numpy as np
+
+import TenderAnalyser as ta
+from embeddings import EMBED_BACKENDS, CachedEmbeddingFunction, EmbeddingCache, make_backend
+
+
+def synthetic_chunks(n: int = 2000) -> list:
+    random.seed(0)
+    words = ("the contractor shall supply install commission maintain pumps motors valves pipelines "
+             "as per specification schedule annexure clause tender bid emd iso 27001 cert-in district").split()
+    return [" ".join(random.choice(words) for _ in range(200)) for _ in range(n)]
+
+
+def document_chunks(paths: list) -> list:
+    chunks = []
+    for p in paths:
+        with open(p, "rb") as f:
+            text = ta.extract_text(f.read(), p)
+        chunks.extend(ta.make_chunks_with_overlap(text, max_chars=ta.CONFIG.get("vector_chunk_chars", 1500),
+                                                  overlap=ta.CONFIG.get("vector_chunk_overlap", 200)))
+    return chunks
+
+
+def cosine(a: np.ndarray, b: np.ndarray) -> float:
+    a = a / np.linalg.norm(a, axis=1, keepdims=True)
+    b = b / np.linalg.norm(b, axis=1, keepdims=True)
+    return float(np.mean(np.sum(a * b, axis=1)))
+
+
+def main(args):
+    backends = list(EMBED_BACKENDS)
+    if "--backends" in args:
+        i = args.index("--backends")
+        backends = args[i + 1].split(",")
+        args = args[:i] + args[i + 2:]
+    chunks = document_chunks(args) if args else synthetic_chunks()
+    batch = ta.CONFIG.get("embed_batch_size", 64)
+    print(f"{len(chunks)} chunks, {sum(map(len, chunks)) / 1e6:.1f} MB text, batch {batch}")
+
+    reference = None
+    for kind in backends:
+        t = time.perf_counter()
+        backend = make_backend(kind, ta.CONFIG.get("embed_model", "all-MiniLM-L6-v2"))
+        load = time.perf_counter() - t
+
+        tmp = tempfile.mkdtemp()
+        try:
+            fn = CachedEmbeddingFunction(backend, EmbeddingCache(tmp), batch_size=batch)
+            t = time.perf_counter()
+            vectors = np.asarray(fn(chunks), dtype=np.float32)
+            cold = time.perf_counter() - t
+            t = time.perf_counter()
+            fn(chunks)
+            warm = time.perf_counter() - t
+
+            # index build with a fresh cache, as for a first-time import
+            store = ta.ChromaVectorStore(collection_name=f"bench_{kind.replace('-', '_')}", batch_size=batch,
+                                         embedding_fn=CachedEmbeddingFunction(backend, EmbeddingCache(tmp + "_build"),
+                                                                              batch_size=batch))
+            t = time.perf_counter()
+            store.index_chunks("bench", chunks, {"tender_key": "bench"})
+            build = time.perf_counter() - t
+        finally:
+            shutil.rmtree(tmp, ignore_errors=True)
+            shutil.rmtree(tmp + "_build", ignore_errors=True)
+
+        if kind == "torch":
+            reference = vectors
+        drift = f"{cosine(vectors, reference):.4f}" if reference is not None and reference.shape == vectors.shape else "n/a"
+        print(f"{kind:>10}: load {load:.1f} s | cold {len(chunks) / cold:,.0f} chunks/s | "
+              f"cached {len(chunks) / warm:,.0f} chunks/s | index build {build:.1f} s | cos vs torch {drift}")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
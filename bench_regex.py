@@ -0,0 +1,85 @@
+# --------------------
+# Benchmark: FieldScanner-based regex_extract vs. the per-pattern search loop
+# --------------------
+# Usage:
+#   python bench_regex.py                 # synthetic ~1.7 MB tender text
+#   python bench_regex.py a.txt b.pdf     # your own documents (text is extracted first)
+import re
+import sys
+import time
+import random
+
+import TenderAnalyser as ta
+
+
+def legacy_regex_extract(text: str) -> dict:
+    """The previous implementation: one re.search/re.findall per pattern over the full text."""
+    extracted = {}
+    for pat in ta.TENDER_ID_PATTERNS:
+        m = re.search(pat.pattern, text, re.I | re.S)
+        if m:
+            cand = m.group(1).strip()
+            if len(cand) >= 3 and cand.upper() != "N/A":
+                extracted["tender_id"] = cand
+                break
+    if "tender_id" not in extracted:
+        fallback = re.findall(ta.TENDER_ID_FALLBACK.pattern, text)
+        if fallback:
+            extracted["tender_id"] = fallback[0]
+    for pat in ta.PUBLICATION_DATE_PATTERNS:
+        m = re.search(pat.pattern, text, re.I | re.S)
+        if m:
+            extracted["publication_date"] = m.group(1).strip()
+            break
+    for field, pattern in ta.REGEX_PATTERNS.items():
+        if field in extracted:
+            continue
+        if field in ta.LIST_FIELDS:
+            matches = re.findall(pattern, text, flags=re.I)
+            extracted[field] = list(dict.fromkeys(m.strip() for m in matches if m and m.strip()))
+        else:
+            m = re.search(pattern, text, flags=re.I | re.S)
+            extracted[field] = m.group(1).strip() if m else ""
+            if field in ta.RegexFieldStream.LINE_FIELDS:
+                extracted[field] = ta.RegexFieldStream._line_value(field, extracted[field])  # same line cut as the stream
+    return extracted
+
+
+def synthetic_text(n_lines: int = 20000) -> str:
+    random.seed(0)
+    words = ("the contractor shall supply install commission maintain pumps motors valves pipelines "
+             "as per specification schedule annexure clause tender bid date office time 2024 12").split()
+    labels = ["Tender No: ABC/123/2024", "Bid No.: GEM/2024/B/99", "EMD Amount: Rs. 50,000",
+              "Performance Security 5% of value", "contact a.b@x.gov.in Ph 9876543210",
+              "Issued By: Public Works Department", "Last Date of Submission 30/03/2024"]
+    filler = [" ".join(random.choice(words) for _ in range(12)) for _ in range(300)]
+    return "\n".join(random.choice(filler) for _ in range(n_lines)) + "\n" + "\n".join(labels)
+
+
+def best_of(fn, text: str, runs: int = 5) -> float:
+    best = float("inf")
+    for _ in range(runs):
+        t = time.perf_counter()
+        fn(text)
+        best = min(best, time.perf_counter() - t)
+    return best
+
+
+def main(paths):
+    docs = []
+    for p in paths:
+        with open(p, "rb") as f:
+            docs.append((p, ta.extract_text(f.read(), p)))
+    if not docs:
+        docs = [("synthetic", synthetic_text())]
+    for name, text in docs:
+        old = best_of(legacy_regex_extract, text)
+        new = best_of(ta.regex_extract, text)
+        same = legacy_regex_extract(text) == ta.regex_extract(text)
+        mb = len(text) / 1e6
+        print(f"{name}: {len(text):,} chars | legacy {old*1000:.0f} ms ({mb/old:.1f} MB/s) | "
+              f"scanner {new*1000:.0f} ms ({mb/new:.1f} MB/s) | x{old/new:.1f} | identical={same}")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
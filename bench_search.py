@@ -0,0 +1,112 @@
+# --------------------
+# Benchmark: BM25 tender search latency against a budget
+# --------------------
+# Usage:
+#   python bench_search.py                       # synthetic 20k and 50k tender indexes
+#   python bench_search.py --docs 30000 --budget 0.05
+#   python bench_search.py --store               # the tenders in TENDER_STORE, as hybrid search indexes them
+#
+# For each index size: build time, then p50 / p95 / max latency of a mixed query set
+# (exact tender references, common words, multi-word queries) in three situations:
+# plain, restricted to a 10% key set (metadata filters), and after 10% of the tenders
+# were re-indexed (dead postings waiting for compaction). Fails (exit 1) when a p95
+# exceeds the budget.
+import sys
+import time
+import random
+
+import numpy as np
+
+from search_index import BM25Index
+
+QUERY_BUDGET_S = 0.05
+DOC_COUNTS = (20000, 50000)
+TOKENS_PER_DOC = 300
+QUERY_REPEATS = 5
+
+
+def synthetic_tenders(n: int, tokens: int = TOKENS_PER_DOC) -> dict:
+    """{key: fields} with a Zipf-like vocabulary, districts and NIT references, like search_fields()."""
+    rng = random.Random(0)
+    vocab = [f"w{i}" for i in range(30000)]
+    weights = [1 / (i + 1) for i in range(len(vocab))]
+    districts = ["pune", "nashik", "nagpur", "thane", "solapur", "kolhapur", "satara", "jalgaon"]
+    docs = {}
+    for i in range(n):
+        body = " ".join(rng.choices(vocab, weights=weights, k=tokens))
+        docs[f"t{i}"] = [
+            (f"supply of pumps {rng.choice(districts)} NIT/{2020 + i % 5}/{i}", 3),
+            (f"executive engineer {rng.choice(districts)} division", 2),
+            (body, 1),
+        ]
+    return docs
+
+
+def store_tenders() -> dict:
+    import TenderAnalyser as ta
+    return {key: ta.search_fields(record, raw_text) for key, record, raw_text in ta.TENDER_STORE.iter_documents()}
+
+
+def queries(docs: dict) -> list:
+    """Last word (the reference) and first three words of the title field of 10 tenders, plus common queries."""
+    out = []
+    for key in random.Random(1).sample(list(docs), min(10, len(docs))):
+        words = str(docs[key][0][0]).split()
+        if words:
+            out += [words[-1], " ".join(words[:3])]
+    return out + ["pumps", "executive engineer", "w1 w2 w3", "w5000", "nashik pumps w10", "cert-in iso 27001"]
+
+
+def latencies(index: BM25Index, qs: list, allowed: set = None) -> np.ndarray:
+    times = []
+    for _ in range(QUERY_REPEATS):
+        for q in qs:
+            t = time.perf_counter()
+            index.search(q, k=200, allowed=allowed)
+            times.append(time.perf_counter() - t)
+    return np.array(times)
+
+
+def report(label: str, times: np.ndarray, budget: float) -> bool:
+    p50, p95 = np.percentile(times, 50), np.percentile(times, 95)
+    ok = p95 <= budget
+    print(f"  {label:<22} p50 {p50 * 1e3:6.1f} ms | p95 {p95 * 1e3:6.1f} ms | max {times.max() * 1e3:6.1f} ms"
+          f"{'' if ok else '  FAIL: over budget'}")
+    return ok
+
+
+def bench(docs: dict, budget: float) -> bool:
+    index = BM25Index()
+    t = time.perf_counter()
+    for key, fields in docs.items():
+        index.add(key, fields)
+    build = time.perf_counter() - t
+    keys = list(docs)
+    print(f"{len(docs):,} tenders: index built in {build:.1f} s")
+    qs = queries(docs)
+    ok = report("plain", latencies(index, qs), budget)
+    allowed = set(random.Random(2).sample(keys, max(1, len(keys) // 10)))
+    ok &= report("10% allowed keys", latencies(index, qs, allowed), budget)
+    for key in random.Random(3).sample(keys, len(keys) // 10):
+        index.add(key, docs[key])
+    ok &= report("after 10% re-indexed", latencies(index, qs), budget)
+    return ok
+
+
+def main(args):
+    budget = float(args[args.index("--budget") + 1]) if "--budget" in args else QUERY_BUDGET_S
+    print(f"budget: p95 <= {budget * 1e3:.0f} ms per query")
+    if "--store" in args:
+        sets = [store_tenders()]
+    else:
+        counts = [int(c) for c in args[args.index("--docs") + 1].split(",")] if "--docs" in args else DOC_COUNTS
+        sets = [synthetic_tenders(n) for n in counts]
+    ok = True
+    for docs in sets:
+        if docs:
+            ok &= bench(docs, budget)
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,64 @@
+# --------------------
+# Benchmark: import time of TenderAnalyser against a budget
+# --------------------
+# Usage:
+#   python bench_startup.py              # 5 cold imports, fail (exit 1) if the best exceeds the budget
+#   python bench_startup.py --budget 1.5
+#
+# Each run imports the module in a fresh interpreter with `-X importtime`, so the
+# number is what every gunicorn worker pays. Also fails when one of the heavy
+# libraries that must be loaded lazily shows up at import time, and prints the
+# slowest imported modules to show where the time goes.
+import os
+import sys
+import subprocess
+
+IMPORT_BUDGET_S = 2.5
+LAZY_MODULES = ("pandas", "plotly.graph_objects", "chromadb", "sentence_transformers", "torch", "openai",
+                "pdfplumber", "docx2txt", "embeddings")
+
+PROBE = (
+    "import sys, time; t = time.perf_counter(); import TenderAnalyser; "
+    "print(time.perf_counter() - t); print(','.join(m for m in {mods!r} if m in sys.modules))"
+)
+
+
+def cold_import():
+    here = os.path.dirname(os.path.abspath(__file__))
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", PROBE.format(mods=LAZY_MODULES)],
+                          cwd=here, capture_output=True, text=True)
+    if proc.returncode != 0:
+        raise SystemExit(proc.stderr[-2000:])
+    # the loaded-modules line is empty when nothing leaked, so keep it: split on "\n" only
+    seconds, loaded = proc.stdout.rstrip("\n").split("\n")[-2:]
+    # -X importtime lines: "import time: self [us] | cumulative | imported package"
+    top = []
+    for line in proc.stderr.splitlines():
+        parts = line.split("|")
+        if len(parts) == 3 and parts[1].strip().isdigit() and not parts[2].startswith("  "):
+            top.append((int(parts[1]), parts[2].strip()))
+    return float(seconds), [m for m in loaded.split(",") if m], sorted(top, reverse=True)[:10]
+
+
+def main(args):
+    budget = float(args[args.index("--budget") + 1]) if "--budget" in args else IMPORT_BUDGET_S
+    runs = [cold_import() for _ in range(5)]
+    best = min(r[0] for r in runs)
+    _, loaded, top = min(runs, key=lambda r: r[0])
+    print(f"import TenderAnalyser: best {best:.2f}s of {len(runs)} (budget {budget:.2f}s), "
+          f"median {sorted(r[0] for r in runs)[len(runs) // 2]:.2f}s")
+    print("slowest top-level imports (cumulative):")
+    for us, name in top:
+        print(f"  {us / 1e6:6.2f}s  {name}")
+    ok = True
+    if loaded:
+        print(f"FAIL: loaded at import time, should be lazy: {', '.join(loaded)}")
+        ok = False
+    if best > budget:
+        print(f"FAIL: over budget by {best - budget:.2f}s")
+        ok = False
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
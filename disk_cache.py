@@ -0,0 +1,124 @@
+# --------------------
+# Imports
+# --------------------
+import os
+import json
+import hashlib
+import tempfile
+import threading
+from typing import Any, Optional
+
+
+def sha256_bytes(data: bytes) -> str:
+    """Hex SHA-256 of a byte string."""
+    return hashlib.sha256(data).hexdigest()
+
+
+def sha256_text(*parts: str) -> str:
+    """Hex SHA-256 over several string parts (NUL-separated so parts cannot run together)."""
+    h = hashlib.sha256()
+    for p in parts:
+        h.update(str(p).encode("utf-8", errors="ignore"))
+        h.update(b"\0")
+    return h.hexdigest()
+
+
+# --------------------
+# Size-bounded on-disk LRU cache
+# --------------------
+class DiskLRUCache:
+    """
+    Content-addressed JSON cache on local disk with size-bounded LRU eviction.
+
+    Each entry is one file named after its key (sharded by the first two hex chars).
+    Reads bump the file's mtime, so eviction removes the least recently used entries
+    first once the directory grows past `max_bytes`. Writes are atomic (temp file +
+    rename), which makes the cache safe to share between the Dash process and the
+    page-extraction worker processes.
+    """
+
+    def __init__(self, root: str, max_bytes: int):
+        self.root = root
+        self.max_bytes = int(max_bytes)
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._approx_bytes = None
+        os.makedirs(root, exist_ok=True)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.root, key[:2], key + ".json")
+
+    def get(self, key: str) -> Optional[Any]:
+        path = self._path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                value = json.load(f)
+        except Exception:
+            self.misses += 1
+            return None
+        try:
+            os.utime(path, None)
+        except OSError:
+            pass
+        self.hits += 1
+        return value
+
+    def set(self, key: str, value: Any):
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        data = json.dumps(value, ensure_ascii=False).encode("utf-8")
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp, path)
+        except Exception:
+            try:
+                os.remove(tmp)
+            except OSError:
+                pass
+            raise
+        with self._lock:
+            if self._approx_bytes is None:
+                self._approx_bytes = self._scan_size()
+            else:
+                self._approx_bytes += len(data)
+            if self.max_bytes > 0 and self._approx_bytes > self.max_bytes:
+                self._evict()
+
+    def _entries(self):
+        for shard in os.listdir(self.root):
+            sdir = os.path.join(self.root, shard)
+            if not os.path.isdir(sdir):
+                continue
+            for name in os.listdir(sdir):
+                if not name.endswith(".json"):
+                    continue
+                path = os.path.join(sdir, name)
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    continue
+                yield path, st.st_mtime, st.st_size
+
+    def _scan_size(self) -> int:
+        return sum(size for _, _, size in self._entries())
+
+    def _evict(self):
+        # Drop oldest entries until we are back under 90% of the budget
+        entries = sorted(self._entries(), key=lambda e: e[1])
+        total = sum(e[2] for e in entries)
+        target = int(self.max_bytes * 0.9)
+        for path, _, size in entries:
+            if total <= target:
+                break
+            try:
+                os.remove(path)
+                total -= size
+            except OSError:
+                continue
+        self._approx_bytes = total
+
+    def stats(self) -> dict:
+        return {"hits": self.hits, "misses": self.misses}
@@ -0,0 +1,255 @@
+# --------------------
+# Imports
+# --------------------
+import os
+import json
+import time
+import uuid
+import sqlite3
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+
+# --------------------
+# Durable batch job queue
+# --------------------
+class JobQueue:
+    """
+    SQLite (WAL) job queue: one job per uploaded batch, one row per document.
+
+    Documents move queued -> running -> done | error. A worker claims a document inside
+    an IMMEDIATE transaction, so any number of threads or processes can pull from the
+    same database without handing a document out twice. A claim is a lease: a document
+    left "running" longer than `lease_s` (worker crashed, server restarted) is handed
+    out again, which is how interrupted batches resume. A document whose lease already
+    expired `max_attempts` times (it keeps killing its worker) is marked failed instead
+    of being handed out again. Finished documents keep their result and are never
+    reprocessed.
+    """
+
+    def __init__(self, path: str, lease_s: float = 900, max_attempts: int = 3):
+        self.path = path
+        self.lease_s = float(lease_s)
+        self.max_attempts = int(max_attempts)
+        self._local = threading.local()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        conn = self._conn()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS jobs (
+                job_id TEXT PRIMARY KEY,
+                created REAL NOT NULL,
+                total INTEGER NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS documents (
+                job_id TEXT NOT NULL,
+                seq INTEGER NOT NULL,
+                filename TEXT NOT NULL,
+                path TEXT NOT NULL,
+                status TEXT NOT NULL DEFAULT 'queued',
+                stage TEXT NOT NULL DEFAULT '',
+                worker TEXT NOT NULL DEFAULT '',
+                attempts INTEGER NOT NULL DEFAULT 0,
+                claimed_at REAL,
+                finished_at REAL,
+                result TEXT,
+                error TEXT,
+                PRIMARY KEY (job_id, seq)
+            );
+            CREATE INDEX IF NOT EXISTS idx_documents_status ON documents(status, claimed_at);
+            CREATE INDEX IF NOT EXISTS idx_documents_finished ON documents(job_id, finished_at, seq);
+            """
+        )
+        conn.commit()
+
+    def _conn(self) -> sqlite3.Connection:
+        # One connection per thread; sqlite3 connections must not be shared across threads
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def create_job(self, documents: List[Tuple[str, str]], job_id: str = None) -> str:
+        """
+        Enqueue a batch.
+
+        Args:
+            documents (list): (filename, path on disk) per document, in upload order.
+            job_id (str): Optional caller-chosen ID (default: random hex).
+
+        Returns:
+            str: Job ID.
+        """
+        job_id = job_id or uuid.uuid4().hex
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute("INSERT INTO jobs (job_id, created, total) VALUES (?, ?, ?)", (job_id, time.time(), len(documents)))
+            conn.executemany(
+                "INSERT INTO documents (job_id, seq, filename, path) VALUES (?, ?, ?, ?)",
+                [(job_id, i, fname, path) for i, (fname, path) in enumerate(documents)],
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return job_id
+
+    def claim(self, worker: str) -> Optional[Dict[str, Any]]:
+        """
+        Atomically take the oldest queued (or lease-expired) document; None when there is no work.
+        Lease-expired documents that used up `max_attempts` are marked failed on the way.
+        """
+        now = time.time()
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            while True:
+                row = conn.execute(
+                    "SELECT d.job_id, d.seq, d.filename, d.path, d.attempts FROM documents d JOIN jobs j ON j.job_id = d.job_id"
+                    " WHERE d.status = 'queued' OR (d.status = 'running' AND d.claimed_at < ?)"
+                    " ORDER BY j.created, d.seq LIMIT 1",
+                    (now - self.lease_s,),
+                ).fetchone()
+                if row is None:
+                    conn.execute("COMMIT")
+                    return None
+                if self.max_attempts <= 0 or row["attempts"] < self.max_attempts:
+                    break
+                conn.execute(
+                    "UPDATE documents SET status = 'error', stage = '', finished_at = ?, error = ? WHERE job_id = ? AND seq = ?",
+                    (now, f"Gave up after {row['attempts']} attempts (the worker never finished it)",
+                     row["job_id"], row["seq"]),
+                )
+            conn.execute(
+                "UPDATE documents SET status = 'running', stage = 'extract', worker = ?, attempts = attempts + 1,"
+                " claimed_at = ? WHERE job_id = ? AND seq = ?",
+                (worker, now, row["job_id"], row["seq"]),
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return dict(row, worker=worker)
+
+    # set_stage/complete/fail only touch a document the caller still holds: after its lease
+    # expired and another worker re-claimed it, the stale worker's writes are ignored.
+    def set_stage(self, job_id: str, seq: int, stage: str, worker: str) -> bool:
+        """Record the stage a running document is in; also renews its lease. False if `worker` lost it."""
+        cur = self._conn().execute(
+            "UPDATE documents SET stage = ?, claimed_at = ? WHERE job_id = ? AND seq = ? AND worker = ? AND status = 'running'",
+            (stage, time.time(), job_id, seq, worker),
+        )
+        return cur.rowcount > 0
+
+    def complete(self, job_id: str, seq: int, result: Any, worker: str) -> bool:
+        """Store a document's result. False (nothing written) if `worker` no longer holds it."""
+        cur = self._conn().execute(
+            "UPDATE documents SET status = 'done', stage = '', finished_at = ?, result = ?, error = NULL"
+            " WHERE job_id = ? AND seq = ? AND worker = ? AND status = 'running'",
+            (time.time(), json.dumps(result, ensure_ascii=False), job_id, seq, worker),
+        )
+        return cur.rowcount > 0
+
+    def fail(self, job_id: str, seq: int, error: str, worker: str) -> bool:
+        """Mark a document failed. False (nothing written) if `worker` no longer holds it."""
+        cur = self._conn().execute(
+            "UPDATE documents SET status = 'error', stage = '', finished_at = ?, error = ?"
+            " WHERE job_id = ? AND seq = ? AND worker = ? AND status = 'running'",
+            (time.time(), str(error)[:2000], job_id, seq, worker),
+        )
+        return cur.rowcount > 0
+
+    def has_work(self) -> bool:
+        row = self._conn().execute(
+            "SELECT 1 FROM documents WHERE status = 'queued' OR (status = 'running' AND claimed_at < ?) LIMIT 1",
+            (time.time() - self.lease_s,),
+        ).fetchone()
+        return row is not None
+
+    def progress(self, job_id: str) -> Dict[str, Any]:
+        """
+        Job progress in the shape the upload page polls for.
+
+        Returns:
+            dict: {"job_id", "total", "done", "failed", "status", "current_file"}; {} for an unknown job.
+        """
+        conn = self._conn()
+        job = conn.execute("SELECT total FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+        if job is None:
+            return {}
+        counts = dict(conn.execute(
+            "SELECT status, COUNT(*) FROM documents WHERE job_id = ? GROUP BY status", (job_id,)
+        ).fetchall())
+        current = conn.execute(
+            "SELECT filename FROM documents WHERE job_id = ? AND status = 'running' ORDER BY claimed_at DESC LIMIT 1",
+            (job_id,),
+        ).fetchone()
+        done = counts.get("done", 0) + counts.get("error", 0)
+        total = job["total"]
+        if done >= total:
+            status = "done"
+        elif counts.get("running"):
+            status = "running"
+        else:
+            status = "queued"
+        return {"job_id": job_id, "total": total, "done": done, "failed": counts.get("error", 0),
+                "status": status, "current_file": current["filename"] if current else ""}
+
+    def backlog(self) -> int:
+        """Documents not finished yet, across all jobs (queued or running)."""
+        return self._conn().execute("SELECT COUNT(*) FROM documents WHERE status IN ('queued', 'running')").fetchone()[0]
+
+    def documents(self, job_id: str) -> List[Dict[str, Any]]:
+        """Per-document state of a job, in upload order (without results)."""
+        rows = self._conn().execute(
+            "SELECT seq, filename, status, stage, attempts, claimed_at, finished_at, error FROM documents"
+            " WHERE job_id = ? ORDER BY seq", (job_id,)
+        ).fetchall()
+        return [dict(r) for r in rows]
+
+    def finished(self, job_id: str, after: Tuple[float, int] = None) -> List[Dict[str, Any]]:
+        """
+        Finished documents (done or error) of a job in completion order, with decoded results.
+
+        Args:
+            job_id (str): Job ID.
+            after (tuple): (finished_at, seq) of the last row the caller already has; streaming
+                readers pass it back so each poll only reads (and decodes) new rows.
+
+        Returns:
+            list: {"seq", "filename", "status", "finished_at", "result", "error"} per document.
+        """
+        sql = ("SELECT seq, filename, status, finished_at, result, error FROM documents"
+               " WHERE job_id = ? AND status IN ('done', 'error')")
+        params = [job_id]
+        if after is not None:
+            sql += " AND (finished_at, seq) > (?, ?)"
+            params += list(after)
+        rows = self._conn().execute(sql + " ORDER BY finished_at, seq", params).fetchall()
+        out = []
+        for r in rows:
+            try:
+                result = json.loads(r["result"]) if r["result"] else None
+            except Exception:
+                result = None
+            out.append({"seq": r["seq"], "filename": r["filename"], "status": r["status"],
+                        "finished_at": r["finished_at"], "result": result, "error": r["error"]})
+        return out
+
+    def results(self, job_id: str) -> List[Any]:
+        """Results of the finished documents of a job, in upload order."""
+        rows = self._conn().execute(
+            "SELECT result FROM documents WHERE job_id = ? AND status = 'done' ORDER BY seq", (job_id,)
+        ).fetchall()
+        out = []
+        for r in rows:
+            try:
+                out.append(json.loads(r["result"]))
+            except Exception:
+                continue
+        return out
@@ -0,0 +1,88 @@
+# --------------------
+# Imports
+# --------------------
+import os
+import time
+import sqlite3
+import threading
+from typing import Optional
+
+
+# --------------------
+# Persistent LLM response cache
+# --------------------
+class LLMResponseCache:
+    """
+    SQLite-backed cache of LLM completions keyed by a hash of model, parameters and prompt.
+
+    Entries older than `ttl_s` are treated as misses and removed lazily. Once the table
+    holds more than `max_entries` rows the least recently read ones are evicted (down to
+    90% of the limit). The database runs in WAL mode so the Dash callbacks, the
+    extraction thread and the LLM thread pool can read and write concurrently.
+    """
+
+    def __init__(self, path: str, ttl_s: float = 0, max_entries: int = 0):
+        self.path = path
+        self.ttl_s = float(ttl_s or 0)
+        self.max_entries = int(max_entries or 0)
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            " key TEXT PRIMARY KEY, model TEXT, response TEXT NOT NULL,"
+            " created REAL NOT NULL, accessed REAL NOT NULL, hits INTEGER NOT NULL DEFAULT 0)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_responses_accessed ON responses(accessed)")
+        self._conn.commit()
+
+    def get(self, key: str) -> Optional[str]:
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute("SELECT response, created FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            if self.ttl_s and now - row[1] > self.ttl_s:
+                self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self._conn.commit()
+                self.misses += 1
+                return None
+            self._conn.execute("UPDATE responses SET accessed = ?, hits = hits + 1 WHERE key = ?", (now, key))
+            self._conn.commit()
+            self.hits += 1
+            return row[0]
+
+    def set(self, key: str, response: str, model: str = ""):
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, model, response, created, accessed, hits) VALUES (?, ?, ?, ?, ?, 0)",
+                (key, model, response, now, now),
+            )
+            if self.max_entries > 0:
+                count = self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+                if count > self.max_entries:
+                    self._evict(count)
+            self._conn.commit()
+
+    def _evict(self, count: int):
+        # Expired rows first, then least recently read until back under 90% of the limit
+        if self.ttl_s:
+            self._conn.execute("DELETE FROM responses WHERE created < ?", (time.time() - self.ttl_s,))
+            count = self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+        excess = count - int(self.max_entries * 0.9)
+        if excess > 0:
+            self._conn.execute(
+                "DELETE FROM responses WHERE key IN (SELECT key FROM responses ORDER BY accessed ASC LIMIT ?)",
+                (excess,),
+            )
+
+    def stats(self) -> dict:
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+        return {"hits": self.hits, "misses": self.misses, "entries": entries}
@@ -1,16 +1,251 @@
-from fastapi import FastAPI, UploadFile, File
+from fastapi import FastAPI, UploadFile, File, HTTPException
+from fastapi.concurrency import run_in_threadpool
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import StreamingResponse
+from contextlib import asynccontextmanager
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import List, Tuple
 from analyser import analyse_tender
 from models import TenderResponse
-import shutil, os
+from job_queue import JobQueue
+import asyncio, hashlib, json, os, tempfile, threading, zipfile
+
+# --------------------
+# Settings
+# --------------------
+UPLOAD_DIR = os.getenv("UPLOAD_DIR", "uploads")
+ANALYSE_WORKERS = int(os.getenv("ANALYSE_WORKERS", max(1, (os.cpu_count() or 2) - 1)))  # OCR/extraction processes
+ANALYSE_MAX_PENDING = int(os.getenv("ANALYSE_MAX_PENDING", ANALYSE_WORKERS * 2))  # running + waiting before 429
+MAX_UPLOAD_BYTES = int(os.getenv("MAX_UPLOAD_BYTES", 100 * 1024 * 1024))
+UPLOAD_CHUNK_BYTES = 1024 * 1024
+JOBS_DB = os.getenv("JOBS_DB", "./Outputs/Jobs/api_jobs.sqlite")  # separate from the Dash app's queue
+JOBS_MAX_BACKLOG = int(os.getenv("JOBS_MAX_BACKLOG", 5000))  # unfinished batch documents before 429
+JOBS_LEASE_S = 900
+JOBS_MAX_ATTEMPTS = int(os.getenv("JOBS_MAX_ATTEMPTS", 3))  # lease expiries before a document is marked failed
+JOBS_POLL_S = 0.5
+ZIP_MAX_FILES = 1000
+ZIP_EXTENSIONS = {".pdf", ".docx", ".txt"}
+
+_pool = None
+_pool_lock = threading.Lock()
+_pending = 0
+JOBS = JobQueue(JOBS_DB, lease_s=JOBS_LEASE_S, max_attempts=JOBS_MAX_ATTEMPTS)
+
+
+@asynccontextmanager
+async def lifespan(app):
+    global _pool
+    _pool = ProcessPoolExecutor(max_workers=ANALYSE_WORKERS)
+    dispatcher = asyncio.create_task(dispatch_jobs())
+    yield
+    dispatcher.cancel()
+    _pool.shutdown(wait=False, cancel_futures=True)
+
+
+app = FastAPI(title="Tender Analysis API", lifespan=lifespan)
+
+
+def save_upload(src, filename: str) -> str:
+    """
+    Stream an upload to UPLOAD_DIR/<sha[:2]>/<sha256><ext> and return the path.
+
+    The body is copied in UPLOAD_CHUNK_BYTES pieces while it is hashed, into a temp file
+    that is renamed into place, so concurrent uploads never collide and re-sending the
+    same document reuses the stored copy. Raises 413 past MAX_UPLOAD_BYTES.
+    """
+    os.makedirs(UPLOAD_DIR, exist_ok=True)
+    h, size = hashlib.sha256(), 0
+    fd, tmp = tempfile.mkstemp(dir=UPLOAD_DIR, suffix=".part")
+    try:
+        with os.fdopen(fd, "wb") as out:
+            while chunk := src.read(UPLOAD_CHUNK_BYTES):
+                size += len(chunk)
+                if size > MAX_UPLOAD_BYTES:
+                    raise HTTPException(413, f"Upload exceeds {MAX_UPLOAD_BYTES} bytes")
+                h.update(chunk)
+                out.write(chunk)
+        sha = h.hexdigest()
+        path = os.path.join(UPLOAD_DIR, sha[:2], sha + os.path.splitext(filename or "")[1].lower())
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        if os.path.exists(path):
+            os.remove(tmp)
+        else:
+            os.replace(tmp, path)
+        return path
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+
+
+async def run_analysis(file_path: str) -> dict:
+    """Run analyse_tender on the process pool; the event loop only awaits the result."""
+    global _pool
+    pool = _pool
+    try:
+        return await asyncio.get_running_loop().run_in_executor(pool, analyse_tender, file_path)
+    except BrokenProcessPool:
+        # a worker died (OCR crash, OOM); replace the pool so later requests still work.
+        # Every request that was on the broken pool lands here: only the first replaces it.
+        with _pool_lock:
+            if _pool is pool:
+                _pool = ProcessPoolExecutor(max_workers=ANALYSE_WORKERS)
+                pool.shutdown(wait=False, cancel_futures=True)
+        raise HTTPException(503, "Analysis worker crashed, retry the request")
 
-app = FastAPI(title="Tender Analysis API")
 
 @app.post("/analyse", response_model=TenderResponse)
 async def analyse(file: UploadFile = File(...)):
-    os.makedirs("uploads", exist_ok=True)
-    file_path = f"uploads/{file.filename}"
+    # Admission control: refuse instead of queueing without bound behind slow OCR jobs
+    global _pending
+    if _pending >= ANALYSE_MAX_PENDING:
+        raise HTTPException(429, "Analysis workers are busy, retry later", headers={"Retry-After": "5"})
+    _pending += 1
+    try:
+        file_path = await run_in_threadpool(save_upload, file.file, file.filename)
+        return await run_analysis(file_path)
+    finally:
+        _pending -= 1
+
+
+# --------------------
+# Batch jobs
+# --------------------
+def expand_upload(upload: UploadFile) -> List[Tuple[str, str]]:
+    """
+    Store one batch upload and return its documents as (filename, path).
+
+    A .zip is unpacked member by member (PDF/DOCX/TXT only, at most ZIP_MAX_FILES,
+    each capped by MAX_UPLOAD_BYTES like a direct upload); anything else is one document.
+    """
+    name = os.path.basename(upload.filename or "upload")
+    if not name.lower().endswith(".zip"):
+        return [(name, save_upload(upload.file, name))]
+    try:
+        archive = zipfile.ZipFile(upload.file)
+    except zipfile.BadZipFile:
+        raise HTTPException(400, f"{name} is not a valid zip file")
+    docs = []
+    with archive:
+        for info in archive.infolist():
+            member = os.path.basename(info.filename)
+            if info.is_dir() or not member or member.startswith(".") or "__MACOSX" in info.filename:
+                continue
+            if os.path.splitext(member)[1].lower() not in ZIP_EXTENSIONS:
+                continue
+            if len(docs) >= ZIP_MAX_FILES:
+                raise HTTPException(413, f"{name} holds more than {ZIP_MAX_FILES} documents")
+            with archive.open(info) as src:
+                docs.append((member, save_upload(src, member)))
+    return docs
+
+
+async def _heartbeat(doc: dict):
+    # renew the lease while the document is analysed so no other worker re-claims it
+    while True:
+        await asyncio.sleep(JOBS_LEASE_S / 3)
+        await run_in_threadpool(JOBS.set_stage, doc["job_id"], doc["seq"], "analyse", doc["worker"])
+
+
+async def _run_job_document(doc: dict):
+    global _pending
+    beat = asyncio.create_task(_heartbeat(doc))
+    try:
+        result = jsonable_encoder(TenderResponse(**await run_analysis(doc["path"])))
+        await run_in_threadpool(JOBS.complete, doc["job_id"], doc["seq"], result, doc["worker"])
+    except Exception as e:
+        await run_in_threadpool(JOBS.fail, doc["job_id"], doc["seq"], getattr(e, "detail", None) or repr(e),
+                                doc["worker"])
+    finally:
+        beat.cancel()
+        _pending -= 1
+
+
+async def dispatch_jobs():
+    """
+    Feed queued batch documents into the analysis pool whenever a worker is free.
+
+    Documents are only claimed while fewer than ANALYSE_WORKERS analyses are running,
+    so interactive /analyse requests can still be admitted. Every API process runs one
+    dispatcher; claims are atomic, and documents of a crashed process are re-claimed
+    once their lease expires.
+    """
+    global _pending
+    worker = f"api-{os.getpid()}"
+    running = set()
+    while True:
+        try:
+            doc = await run_in_threadpool(JOBS.claim, worker) if _pending < ANALYSE_WORKERS else None
+        except Exception:
+            doc = None  # database busy; try again on the next tick
+        if doc is None:
+            await asyncio.sleep(JOBS_POLL_S)
+            continue
+        _pending += 1
+        task = asyncio.create_task(_run_job_document(doc))
+        running.add(task)
+        task.add_done_callback(running.discard)
+
+
+@app.post("/analyse/batch", status_code=202)
+@app.post("/jobs", status_code=202)
+async def create_job(files: List[UploadFile] = File(...)):
+    """Queue many files (or zips of files) as one job; returns the job ID immediately."""
+    backlog = await run_in_threadpool(JOBS.backlog)
+    if backlog >= JOBS_MAX_BACKLOG:
+        raise HTTPException(429, f"{backlog} documents are already queued, retry later", headers={"Retry-After": "60"})
+    docs = []
+    for upload in files:
+        docs.extend(await run_in_threadpool(expand_upload, upload))
+    if not docs:
+        raise HTTPException(400, "No documents in the upload")
+    job_id = await run_in_threadpool(JOBS.create_job, docs)
+    return {"job_id": job_id, "total": len(docs), "documents": [name for name, _ in docs],
+            "progress_url": f"/jobs/{job_id}", "results_url": f"/jobs/{job_id}/results"}
+
+
+@app.get("/jobs/{job_id}")
+async def job_status(job_id: str):
+    """Job progress plus the state of every document."""
+    progress = await run_in_threadpool(JOBS.progress, job_id)
+    if not progress:
+        raise HTTPException(404, "Unknown job")
+    progress["documents"] = await run_in_threadpool(JOBS.documents, job_id)
+    return progress
+
+
+@app.get("/jobs/{job_id}/results")
+async def job_results(job_id: str):
+    """
+    Stream the job's results as NDJSON, one line per document in completion order:
+    {"seq", "filename", "status": "done", "result": TenderResponse} or {..., "status": "error", "error"}.
+    Documents finished earlier come first; the stream ends when the whole job is finished.
+    """
+    if not await run_in_threadpool(JOBS.progress, job_id):
+        raise HTTPException(404, "Unknown job")
+
+    def line(row):
+        row.pop("finished_at")
+        row.pop("error" if row["status"] == "done" else "result")
+        return json.dumps(row, ensure_ascii=False) + "\n"
 
-    with open(file_path, "wb") as buffer:
-        shutil.copyfileobj(file.file, buffer)
+    async def lines():
+        # (finished_at, seq) cursor: each poll reads only rows finished since the last one
+        cursor, sent = None, set()
+        while True:
+            progress = await run_in_threadpool(JOBS.progress, job_id)
+            for row in await run_in_threadpool(JOBS.finished, job_id, cursor):
+                cursor = (row["finished_at"], row["seq"])
+                sent.add(row["seq"])
+                yield line(row)
+            if progress.get("status") == "done":
+                if len(sent) < progress["done"]:
+                    # a row stamped just before the cursor but committed after it (another process)
+                    for row in await run_in_threadpool(JOBS.finished, job_id):
+                        if row["seq"] not in sent:
+                            yield line(row)
+                return
+            await asyncio.sleep(JOBS_POLL_S)
 
-    return analyse_tender(file_path)
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
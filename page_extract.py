@@ -0,0 +1,300 @@
+# --------------------
+# Imports
+# --------------------
+# Kept deliberately light: this module is imported by every page-extraction
+# worker process, so it must not pull in Dash, pandas or the LLM stack.
+import os
+import hashlib
+from typing import Any, Dict, Optional, Tuple
+
+# Pdf Reader
+try:
+    import pymupdf as fitz
+except Exception:
+    fitz = None
+
+from PIL import Image
+import pytesseract
+
+from disk_cache import DiskLRUCache
+
+
+# --------------------
+# Per-process state
+# --------------------
+# Workers reuse an open document across the pages they are handed instead of
+# re-opening the PDF for every page. Keyed by (path, mtime, size) so a reused
+# temp-file name can never serve a stale handle.
+_OPEN_DOCS: Dict[Tuple[str, int, int], Any] = {}
+_MAX_OPEN_DOCS = 2
+
+# One handle on the shared OCR cache directory per worker process
+_CACHE: Optional[DiskLRUCache] = None
+
+
+def init_worker(tesseract_cmd: str = ""):
+    """
+    Process-pool initializer: point pytesseract at the configured binary.
+
+    Args:
+        tesseract_cmd (str): Path to the tesseract executable ("" keeps the default).
+    """
+    if tesseract_cmd:
+        pytesseract.pytesseract.tesseract_cmd = tesseract_cmd
+
+
+def _get_cache(cache_dir: str, max_bytes: int) -> Optional[DiskLRUCache]:
+    global _CACHE
+    if not cache_dir:
+        return None
+    if _CACHE is None or _CACHE.root != cache_dir:
+        _CACHE = DiskLRUCache(cache_dir, max_bytes)
+    return _CACHE
+
+
+def _open_doc(pdf_path: str):
+    st = os.stat(pdf_path)
+    key = (pdf_path, st.st_mtime_ns, st.st_size)
+    doc = _OPEN_DOCS.get(key)
+    if doc is None:
+        if len(_OPEN_DOCS) >= _MAX_OPEN_DOCS:
+            for k in list(_OPEN_DOCS.keys()):
+                try:
+                    _OPEN_DOCS.pop(k).close()
+                except Exception:
+                    pass
+        # Open from memory so the worker never holds a handle on the temp file
+        # (Windows refuses to delete files that are still open).
+        with open(pdf_path, "rb") as f:
+            doc = fitz.open(stream=f.read(), filetype="pdf")
+        _OPEN_DOCS[key] = doc
+    return doc
+
+
+# --------------------
+# Adaptive OCR
+# --------------------
+# Defaults mirror the CONFIG keys the Dash app passes in (ocr_dpi_tiers, ...).
+DEFAULT_OCR = {
+    "dpi_tiers": [200, 300],   # start cheap, re-render higher only when confidence is low
+    "min_confidence": 70,      # mean Tesseract word confidence (0-100) accepted without retry
+    "binarize": True,          # grayscale + Otsu threshold before OCR
+    "region_min_area": 0.05,   # image blocks smaller than this share of the page are ignored (logos, stamps)
+    "region_max_text_chars": 30,  # image blocks already covered by this much text layer are not OCR'd
+    "lang": "eng",
+    "timeout_s": 0,            # per Tesseract call; 0 = no limit
+}
+
+
+class OCRTimeout(RuntimeError):
+    """A Tesseract call exceeded its timeout; the page counts as failed."""
+
+
+def _ocr_opts(ocr: Optional[dict]) -> dict:
+    opts = dict(DEFAULT_OCR)
+    opts.update(ocr or {})
+    return opts
+
+
+def pixmap_key(pix, settings: str) -> str:
+    """Cache key for OCR output: hash of the rendered pixels plus the OCR settings."""
+    h = hashlib.sha256()
+    h.update(f"ocr|{settings}|{pix.width}x{pix.height}|{pix.n}|".encode())
+    h.update(pix.samples)
+    return h.hexdigest()
+
+
+def _render_gray(page, dpi: int, clip=None):
+    return page.get_pixmap(dpi=dpi, colorspace=fitz.csGRAY, clip=clip)
+
+
+def _otsu_threshold(image: Image.Image) -> int:
+    hist = image.histogram()[:256]
+    total = sum(hist)
+    if not total:
+        return 127
+    sum_all = sum(i * h for i, h in enumerate(hist))
+    sum_b, w_b, best_t, best_var = 0.0, 0, 127, -1.0
+    for t in range(256):
+        w_b += hist[t]
+        if w_b == 0:
+            continue
+        w_f = total - w_b
+        if w_f == 0:
+            break
+        sum_b += t * hist[t]
+        m_b = sum_b / w_b
+        m_f = (sum_all - sum_b) / w_f
+        var = w_b * w_f * (m_b - m_f) ** 2
+        if var > best_var:
+            best_var, best_t = var, t
+    return best_t
+
+
+def _pix_to_image(pix, binarize: bool) -> Image.Image:
+    image = Image.frombytes("L", (pix.width, pix.height), pix.samples)
+    if binarize:
+        t = _otsu_threshold(image)
+        image = image.point([0 if i <= t else 255 for i in range(256)])
+    return image
+
+
+def ocr_image(image: Image.Image, lang: str = "eng", timeout: float = 0) -> Tuple[str, float]:
+    """
+    OCR an image and return (text, mean word confidence).
+
+    Text is rebuilt from image_to_data (one line per Tesseract line, blank line
+    between blocks) so a single Tesseract call yields both text and confidence.
+    With `timeout` pytesseract kills a hung Tesseract process, so the pool worker is
+    freed instead of holding its slot; that raises OCRTimeout.
+    """
+    try:
+        data = pytesseract.image_to_data(image, lang=lang, output_type=pytesseract.Output.DICT, timeout=timeout or 0)
+    except RuntimeError as e:
+        if "timeout" in str(e).lower():
+            raise OCRTimeout(f"Tesseract timed out after {timeout}s") from e
+        raise
+    lines: Dict[Tuple[int, int, int], list] = {}
+    confs = []
+    for i, word in enumerate(data.get("text", [])):
+        word = (word or "").strip()
+        if not word:
+            continue
+        try:
+            conf = float(data["conf"][i])
+        except Exception:
+            conf = -1.0
+        if conf >= 0:
+            confs.append(conf)
+        key = (data["block_num"][i], data["par_num"][i], data["line_num"][i])
+        lines.setdefault(key, []).append(word)
+    out, prev_block = [], None
+    for (block, _, _), words in lines.items():
+        if prev_block is not None and block != prev_block:
+            out.append("")
+        out.append(" ".join(words))
+        prev_block = block
+    mean_conf = (sum(confs) / len(confs)) if confs else 0.0
+    return "\n".join(out), mean_conf
+
+
+def ocr_adaptive(page, clip=None, cache: Optional[DiskLRUCache] = None, ocr: Optional[dict] = None) -> str:
+    """
+    OCR a page (or a clipped region of it) with resolution tiers.
+
+    The first tier is rendered in grayscale, optionally binarized, and OCR'd; higher
+    DPI tiers are only tried while the mean word confidence stays below
+    `min_confidence`. The best-scoring tier wins. Results are cached under the hash
+    of the first-tier pixmap, so a repeated page costs one cheap render.
+
+    Args:
+        page: PyMuPDF page object.
+        clip: Optional fitz.Rect to OCR only part of the page.
+        cache (DiskLRUCache): Optional OCR cache.
+        ocr (dict): OCR settings overriding DEFAULT_OCR.
+
+    Returns:
+        str: OCR text.
+    """
+    opts = _ocr_opts(ocr)
+    tiers = [int(d) for d in (opts["dpi_tiers"] or [300])]
+    settings = f"{tiers}|{opts['min_confidence']}|{int(bool(opts['binarize']))}|{opts['lang']}"
+
+    pix = _render_gray(page, tiers[0], clip)
+    key = None
+    if cache is not None:
+        key = pixmap_key(pix, settings)
+        hit = cache.get(key)
+        if hit is not None:
+            return hit.get("text", "")
+
+    best_text, best_conf = "", -1.0
+    for n, dpi in enumerate(tiers):
+        if n > 0:
+            pix = _render_gray(page, dpi, clip)
+        text, conf = ocr_image(_pix_to_image(pix, opts["binarize"]), lang=opts["lang"], timeout=opts["timeout_s"])
+        if conf > best_conf:
+            best_text, best_conf = text, conf
+        if conf >= opts["min_confidence"]:
+            break
+
+    if key is not None:
+        try:
+            cache.set(key, {"text": best_text, "confidence": round(best_conf, 1)})
+        except Exception:
+            pass
+    return best_text
+
+
+def _image_regions_to_ocr(page, opts: dict) -> list:
+    """Image blocks on a text-layer page that are large enough and not already covered by text."""
+    page_area = abs(page.rect) or 1.0
+    regions = []
+    try:
+        infos = page.get_image_info()
+    except Exception:
+        return regions
+    for info in infos:
+        rect = fitz.Rect(info.get("bbox")) & page.rect
+        if rect.is_empty or abs(rect) / page_area < opts["region_min_area"]:
+            continue
+        covered = page.get_text("text", clip=rect).strip()
+        if len(covered) > opts["region_max_text_chars"]:
+            continue
+        if any(rect.intersects(r) and abs(rect & r) > 0.8 * abs(rect) for r in regions):
+            continue
+        regions.append(rect)
+    return regions
+
+
+# --------------------
+# Page extraction
+# --------------------
+def page_text(page, min_chars: int = 15, cache: Optional[DiskLRUCache] = None, ocr: Optional[dict] = None) -> str:
+    """
+    Return the text of one PDF page, OCR'ing only what the text layer is missing.
+
+    - Scanned pages (text layer shorter than `min_chars`) are OCR'd whole.
+    - Mixed pages keep their text layer and only their large image blocks are OCR'd.
+    - Pure text pages never touch Tesseract.
+
+    Args:
+        page: PyMuPDF page object.
+        min_chars (int): Text-layer pages shorter than this are treated as scanned.
+        cache (DiskLRUCache): Optional OCR cache keyed by pixmap hash.
+        ocr (dict): OCR settings overriding DEFAULT_OCR.
+
+    Returns:
+        str: Page text (text layer and/or OCR output).
+    """
+    ptext = page.get_text("text").strip()
+    if not ptext or len(ptext) < min_chars:
+        return ocr_adaptive(page, cache=cache, ocr=ocr)
+    opts = _ocr_opts(ocr)
+    parts = [ptext]
+    for rect in _image_regions_to_ocr(page, opts):
+        rtext = ocr_adaptive(page, clip=rect, cache=cache, ocr=opts).strip()
+        if rtext:
+            parts.append(rtext)
+    return "\n".join(parts)
+
+
+def extract_page_worker(pdf_path: str, page_no: int, min_chars: int = 15, ocr: Optional[dict] = None,
+                        cache_dir: str = "", cache_max_bytes: int = 0) -> str:
+    """
+    Process-pool entry point: extract a single page of a PDF on disk.
+
+    Args:
+        pdf_path (str): Path of the PDF (shared by all tasks of one document).
+        page_no (int): Zero-based page index.
+        min_chars (int): Minimum text-layer length before falling back to OCR.
+        ocr (dict): OCR settings overriding DEFAULT_OCR.
+        cache_dir (str): OCR cache directory ("" disables the page cache).
+        cache_max_bytes (int): Size budget of the OCR cache.
+
+    Returns:
+        str: Page text.
+    """
+    doc = _open_doc(pdf_path)
+    cache = _get_cache(cache_dir, cache_max_bytes)
+    return page_text(doc[page_no], min_chars=min_chars, cache=cache, ocr=ocr)
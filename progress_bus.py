@@ -0,0 +1,139 @@
+# --------------------
+# Imports
+# --------------------
+import time
+import threading
+from typing import Any, Callable, Dict, Optional
+
+
+# --------------------
+# In-process progress bus
+# --------------------
+class ProgressBus:
+    """
+    Per-job progress kept in memory and pushed to waiting readers.
+
+    Workers report stage starts/ends per document; readers either take a `snapshot`
+    (the upload page poll) or block in `wait` until the job's version changes (the SSE
+    stream). Each job carries per-stage counters and cumulative timings, and per-document
+    stage timings. Jobs are dropped `keep_s` seconds after their last update.
+
+    The bus only sees documents handled by this process; done/failed/status are this
+    process's view, so readers take a job's totals from the job queue and use the bus
+    for stage timings. A snapshot carries only the most recently changed document
+    (`last_doc`), not the whole per-document map, so a push stays small on large batches.
+    """
+
+    def __init__(self, keep_s: float = 3600):
+        self.keep_s = keep_s
+        self._jobs: Dict[str, Dict[str, Any]] = {}
+        self._cond = threading.Condition()
+
+    def _touch(self, job: Dict[str, Any]):
+        job["version"] += 1
+        job["updated"] = time.time()
+        self._cond.notify_all()
+
+    def _prune(self):
+        now = time.time()
+        # by age alone: documents claimed elsewhere never finish the job on this bus
+        for job_id in [j for j, s in self._jobs.items() if now - s["updated"] > self.keep_s]:
+            del self._jobs[job_id]
+
+    def start_job(self, job_id: str, total: int, done: int = 0, failed: int = 0):
+        with self._cond:
+            self._prune()
+            self._jobs[job_id] = {
+                "job_id": job_id, "total": total, "done": done, "failed": failed,
+                "status": "done" if done >= total else "queued", "current_file": "",
+                "stages": {}, "docs": {}, "last_seq": None, "started": time.time(), "version": 0,
+                "updated": time.time(),
+            }
+            self._touch(self._jobs[job_id])
+
+    def ensure_job(self, job_id: str, loader: Callable[[], Dict[str, Any]]):
+        """Register a job this process did not create (resumed batch) from `loader()` progress."""
+        with self._cond:
+            if job_id in self._jobs:
+                return
+        prog = loader() or {}
+        with self._cond:
+            if job_id not in self._jobs:
+                self.start_job(job_id, int(prog.get("total", 0) or 0), int(prog.get("done", 0) or 0),
+                               int(prog.get("failed", 0) or 0))
+
+    def stage_started(self, job_id: str, seq: int, filename: str, stage: str):
+        with self._cond:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return
+            st = job["stages"].setdefault(stage, {"running": 0, "done": 0, "seconds": 0.0})
+            st["running"] += 1
+            job["docs"].setdefault(seq, {"filename": filename, "stage": stage, "timings": {}})["stage"] = stage
+            job["last_seq"] = seq
+            job["status"] = "running"
+            job["current_file"] = filename
+            self._touch(job)
+
+    def stage_finished(self, job_id: str, seq: int, stage: str, seconds: float):
+        with self._cond:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return
+            st = job["stages"].setdefault(stage, {"running": 0, "done": 0, "seconds": 0.0})
+            st["running"] = max(0, st["running"] - 1)
+            st["done"] += 1
+            st["seconds"] += seconds
+            doc = job["docs"].get(seq)
+            if doc is not None:
+                doc["timings"][stage] = round(seconds, 3)
+            job["last_seq"] = seq
+            self._touch(job)
+
+    def doc_finished(self, job_id: str, seq: int, ok: bool = True):
+        with self._cond:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return
+            job["done"] += 1
+            if not ok:
+                job["failed"] += 1
+            doc = job["docs"].get(seq)
+            if doc is not None:
+                doc["stage"] = "done" if ok else "error"
+            job["last_seq"] = seq
+            if job["done"] >= job["total"]:
+                job["status"] = "done"
+                job["current_file"] = ""
+            self._touch(job)
+
+    def snapshot(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Copy of a job's progress, with mean seconds per stage and the last changed document; None for an unknown job."""
+        with self._cond:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return None
+            snap = {k: v for k, v in job.items() if k not in ("stages", "docs", "last_seq")}
+            snap["stages"] = {
+                name: dict(st, mean_s=round(st["seconds"] / st["done"], 2) if st["done"] else None)
+                for name, st in job["stages"].items()
+            }
+            doc = job["docs"].get(job["last_seq"])
+            snap["last_doc"] = None if doc is None else {
+                "seq": job["last_seq"], "filename": doc["filename"], "stage": doc["stage"], "timings": dict(doc["timings"])}
+            snap["elapsed_s"] = round(time.time() - job["started"], 1)
+            return snap
+
+    def wait(self, job_id: str, version: int, timeout: float = 15.0) -> Optional[Dict[str, Any]]:
+        """Block until the job's version moves past `version` (or timeout), then return a snapshot."""
+        deadline = time.time() + timeout
+        with self._cond:
+            while True:
+                job = self._jobs.get(job_id)
+                if job is None or job["version"] > version:
+                    break
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    break
+                self._cond.wait(remaining)
+        return self.snapshot(job_id)
@@ -0,0 +1,196 @@
+# --------------------
+# Imports
+# --------------------
+import re
+import math
+import threading
+from array import array
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+import numpy as np
+
+
+TOKEN_RE = re.compile(r"[a-z0-9]+(?:[-/.:_][a-z0-9]+)*")
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Lower-cased word tokens for BM25.
+
+    Compound identifiers ("NIT/2024/117", "CERT-IN", "27001:2013") are kept whole and
+    also split into their parts, so a query for the exact reference ranks the tender
+    that carries it first while a partial query still matches.
+    """
+    out = []
+    for tok in TOKEN_RE.findall(str(text or "").lower()):
+        out.append(tok)
+        if not tok.isalnum():
+            out.extend(p for p in re.split(r"[-/.:_]", tok) if p)
+    return out
+
+
+# --------------------
+# In-memory BM25 inverted index
+# --------------------
+class BM25Index:
+    """
+    Okapi BM25 over one document per tender (extracted fields plus cleaned text).
+
+    Postings are append-only `array`s per term (document numbers and term counts), read
+    as numpy views at query time, so scoring a term is one vectorized pass over its
+    posting list rather than a Python loop. Replacing or removing a document marks its
+    old number dead in a per-number live flag; dead postings are masked out of both the
+    scores and the document frequencies, and once more than a quarter of the numbers
+    are dead the postings are compacted. All methods are thread-safe.
+    """
+
+    def __init__(self, k1: float = 1.2, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self._lock = threading.RLock()
+        self._reset()
+
+    def _reset(self):
+        self._postings: Dict[str, Tuple[array, array]] = {}
+        self._doc_len = array("I")
+        self._doc_keys: List[Optional[str]] = []
+        self._key_doc: Dict[str, int] = {}
+        self._alive = bytearray()  # 1 per live document number, read as a numpy bool mask
+        self._live_len = 0
+        self._dead = 0
+
+    def __len__(self) -> int:
+        return len(self._key_doc)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._key_doc
+
+    def add(self, key: str, fields: Iterable[Tuple[str, int]]):
+        """
+        Index (or re-index) one document.
+
+        Args:
+            key (str): Document key (the tender store key).
+            fields (iterable): (text, weight) pairs; a field's tokens count `weight` times,
+                which is how titles and IDs outrank body text.
+        """
+        counts = Counter()
+        for text, weight in fields:
+            for tok in tokenize(text):
+                counts[tok] += weight
+        with self._lock:
+            self._remove(key)
+            doc = len(self._doc_keys)
+            self._doc_keys.append(key)
+            self._key_doc[key] = doc
+            self._alive.append(1)
+            length = sum(counts.values())
+            self._doc_len.append(length)
+            self._live_len += length
+            for term, tf in counts.items():
+                plist = self._postings.get(term)
+                if plist is None:
+                    plist = self._postings[term] = (array("I"), array("f"))
+                plist[0].append(doc)
+                plist[1].append(float(tf))
+            self._maybe_compact()
+
+    def remove(self, key: str):
+        with self._lock:
+            self._remove(key)
+            self._maybe_compact()
+
+    def _remove(self, key: str):
+        doc = self._key_doc.pop(key, None)
+        if doc is not None:
+            self._doc_keys[doc] = None
+            self._alive[doc] = 0
+            self._live_len -= self._doc_len[doc]
+            self._dead += 1
+
+    def _maybe_compact(self):
+        if self._dead < 1000 or self._dead * 4 < len(self._doc_keys):
+            return
+        alive = np.frombuffer(self._alive, dtype=bool).copy()
+        remap = np.cumsum(alive) - 1
+        postings = {}
+        for term, (docs, tfs) in self._postings.items():
+            d = np.frombuffer(docs, dtype=np.uint32)
+            keep = alive[d]
+            if keep.any():
+                postings[term] = (array("I", remap[d[keep]].astype(np.uint32).tobytes()),
+                                  array("f", np.frombuffer(tfs, dtype=np.float32)[keep].tobytes()))
+        self._postings = postings
+        self._doc_len = array("I", np.frombuffer(self._doc_len, dtype=np.uint32)[alive].tobytes())
+        self._doc_keys = [k for k in self._doc_keys if k is not None]
+        self._key_doc = {k: i for i, k in enumerate(self._doc_keys)}
+        self._alive = bytearray(b"\x01" * len(self._doc_keys))
+        self._dead = 0
+
+    def search(self, query: str, k: int = 50, allowed: Set[str] = None) -> List[Tuple[str, float]]:
+        """
+        Top-k documents for `query`.
+
+        Args:
+            query (str): Free text; tokenized like the documents.
+            k (int): Number of hits.
+            allowed (set): Only return these keys (metadata filters resolved by the caller).
+
+        Returns:
+            list: (key, BM25 score) pairs, best first.
+        """
+        terms = list(dict.fromkeys(tokenize(query)))
+        with self._lock:
+            n_live = len(self._key_doc)
+            if not terms or n_live == 0:
+                return []
+            n_docs = len(self._doc_keys)
+            avg_len = max(1.0, self._live_len / n_live)
+            doc_len = np.frombuffer(self._doc_len, dtype=np.uint32).astype(np.float32)
+            norm = self.k1 * (1 - self.b + self.b * doc_len / avg_len)
+            # live documents, narrowed to `allowed`: one boolean mask over document numbers
+            live = np.frombuffer(self._alive, dtype=bool).copy()
+            mask = live
+            if allowed is not None:
+                mask = np.zeros(n_docs, dtype=bool)
+                mask[[d for d in map(self._key_doc.get, allowed) if d is not None]] = True
+                mask &= live
+            scores = np.zeros(n_docs, dtype=np.float32)
+            for term in terms:
+                plist = self._postings.get(term)
+                if plist is None:
+                    continue
+                docs = np.frombuffer(plist[0], dtype=np.uint32)
+                tfs = np.frombuffer(plist[1], dtype=np.float32)
+                df = int(np.count_nonzero(live[docs]))  # dead postings wait for compaction; they must not count
+                if df == 0:
+                    continue
+                idf = math.log(1 + (n_live - df + 0.5) / (df + 0.5))
+                scores[docs] += idf * tfs * (self.k1 + 1) / (tfs + norm[docs])
+            docs = tfs = None  # drop the buffer views before add() may grow the arrays
+            scores[~mask] = 0
+            hits = np.flatnonzero(scores > 0)
+            if len(hits) > k:
+                hits = hits[np.argpartition(-scores[hits], k - 1)[:k]]
+            hits = hits[np.argsort(-scores[hits], kind="stable")]
+            keys = self._doc_keys
+            return [(keys[d], float(scores[d])) for d in hits]
+
+
+def rrf_fuse(rankings: List[List[str]], k: int = 60) -> List[Tuple[str, float]]:
+    """
+    Reciprocal-rank fusion: score(key) = sum over rankings of 1 / (k + rank).
+
+    Args:
+        rankings (list): Ranked key lists (best first), one per retriever.
+        k (int): Damping constant; 60 is the usual choice.
+
+    Returns:
+        list: (key, fused score) pairs, best first.
+    """
+    scores: Dict[str, float] = {}
+    for ranking in rankings:
+        for rank, key in enumerate(ranking, start=1):
+            scores[key] = scores.get(key, 0.0) + 1.0 / (k + rank)
+    return sorted(scores.items(), key=lambda kv: kv[1], reverse=True)
@@ -0,0 +1,319 @@
+# --------------------
+# Imports
+# --------------------
+import os
+import json
+import time
+import sqlite3
+import threading
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+
+# --------------------
+# Server-side tender repository
+# --------------------
+class TenderStore:
+    """
+    SQLite (WAL) repository of processed tenders.
+
+    Full records (extraction, evaluation, raw document text) stay on the server; the
+    browser only keeps the `key` of each record plus a small projection for the tiles.
+    Records are keyed by the content hash of the source document and indexed by tender
+    ID. `raw_text` lives in its own column so loading a record for the detail view or
+    chat context does not have to read the document text.
+
+    Dashboard filters run against precomputed, indexed columns (category, deadline as an
+    ISO date, lower-cased authority, amounts in integer paise, search text) so only the
+    requested page of records is ever loaded.
+
+    Dashboard KPIs live in a small `kpis` counter table that every upsert, column update
+    and delete adjusts in the same transaction (subtract the old row's contribution, add
+    the new one), so reading them never scans the tenders.
+    """
+
+    # Precomputed filter/sort columns: name -> SQL type
+    COLUMNS = {
+        "category": "TEXT NOT NULL DEFAULT ''",
+        "deadline": "TEXT",          # YYYY-MM-DD, NULL when unknown
+        "authority": "TEXT NOT NULL DEFAULT ''",
+        "value_paise": "INTEGER",    # tender value in paise, NULL when unknown
+        "emd_paise": "INTEGER",
+        "title": "TEXT NOT NULL DEFAULT ''",
+        "search": "TEXT NOT NULL DEFAULT ''",
+        "recommendation": "TEXT NOT NULL DEFAULT ''",  # PURSUE / DO NOT PURSUE / '' (needs review)
+        "columns_v": "INTEGER NOT NULL DEFAULT 0",  # version of the code that computed the columns
+    }
+    SORTS = {
+        "deadline": "deadline IS NULL, deadline",
+        "value": "value_paise IS NULL, value_paise",
+        "title": "title",
+        "updated": "updated",
+    }
+
+    def __init__(self, path: str):
+        self.path = path
+        self._local = threading.local()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        conn = self._conn()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS tenders (
+                key TEXT PRIMARY KEY,
+                tender_id TEXT NOT NULL DEFAULT '',
+                updated REAL NOT NULL,
+                record TEXT NOT NULL,
+                raw_text TEXT NOT NULL DEFAULT ''
+            );
+            CREATE INDEX IF NOT EXISTS idx_tenders_tender_id ON tenders(tender_id);
+            CREATE TABLE IF NOT EXISTS kpis (
+                name TEXT PRIMARY KEY,
+                value INTEGER NOT NULL
+            );
+            """
+        )
+        have = {r[1] for r in conn.execute("PRAGMA table_info(tenders)")}
+        for name, decl in self.COLUMNS.items():
+            if name not in have:
+                conn.execute(f"ALTER TABLE tenders ADD COLUMN {name} {decl}")
+        for name in ("category", "deadline", "authority", "value_paise", "updated"):
+            conn.execute(f"CREATE INDEX IF NOT EXISTS idx_tenders_{name} ON tenders({name})")
+        if conn.execute("SELECT COUNT(*) FROM kpis").fetchone()[0] == 0:
+            self.rebuild_kpis()
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    # --- KPI counters ---
+    KPI_COLUMNS = ("recommendation", "category", "deadline", "value_paise", "emd_paise")
+
+    @staticmethod
+    def _kpi_contrib(row) -> List[Tuple[str, int]]:
+        rec, cat, deadline, value, emd = row
+        out = [("count", 1), (f"rec:{rec or ''}", 1), (f"cat:{cat or ''}", 1),
+               ("value_paise", value or 0), ("emd_paise", emd or 0),
+               ("with_value", 1 if value is not None else 0), ("with_emd", 1 if emd is not None else 0)]
+        if deadline:
+            out.append((f"deadline:{deadline}", 1))
+        return out
+
+    def _kpi_row(self, conn, key: str):
+        return conn.execute(f"SELECT {', '.join(self.KPI_COLUMNS)} FROM tenders WHERE key = ?", (key,)).fetchone()
+
+    def _kpi_apply(self, conn, row, sign: int):
+        if row is None:
+            return
+        for name, delta in self._kpi_contrib(row):
+            if delta:
+                conn.execute("INSERT INTO kpis (name, value) VALUES (?, ?) ON CONFLICT(name) DO UPDATE SET value = value + excluded.value",
+                             (name, sign * delta))
+        conn.execute("DELETE FROM kpis WHERE value = 0 AND name NOT IN ('count', 'value_paise', 'emd_paise')")
+
+    def rebuild_kpis(self):
+        """Recompute the KPI counters from scratch (first run on an existing database)."""
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute("DELETE FROM kpis")
+            for row in conn.execute(f"SELECT {', '.join(self.KPI_COLUMNS)} FROM tenders").fetchall():
+                self._kpi_apply(conn, row, +1)
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    def kpis(self) -> Dict[str, int]:
+        """All KPI counters: count, rec:<recommendation>, cat:<category>, deadline:<YYYY-MM-DD>, money sums (paise)."""
+        return dict(self._conn().execute("SELECT name, value FROM kpis").fetchall())
+
+    def upsert(self, key: str, record: Dict[str, Any], columns: Dict[str, Any] = None):
+        """
+        Insert or replace a full tender record (its "raw_text" is stored separately).
+
+        Args:
+            key (str): Record key.
+            record (dict): Full tender record.
+            columns (dict): Values for the precomputed COLUMNS (missing ones use their default).
+        """
+        rec = dict(record)
+        raw_text = rec.pop("raw_text", "") or ""
+        rec["key"] = key
+        tender_id = str((rec.get("meta") or {}).get("tender_id") or rec.get("id") or "")
+        cols = {k: v for k, v in (columns or {}).items() if k in self.COLUMNS and v is not None}
+        names = ["key", "tender_id", "updated", "record", "raw_text"] + list(cols)
+        values = [key, tender_id, time.time(), json.dumps(rec, ensure_ascii=False), raw_text] + list(cols.values())
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            self._kpi_apply(conn, self._kpi_row(conn, key), -1)
+            conn.execute(
+                f"INSERT OR REPLACE INTO tenders ({', '.join(names)}) VALUES ({', '.join('?' * len(names))})",
+                values,
+            )
+            self._kpi_apply(conn, self._kpi_row(conn, key), +1)
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    def get(self, key: str, with_text: bool = False) -> Optional[Dict[str, Any]]:
+        cols = "record, raw_text" if with_text else "record"
+        row = self._conn().execute(f"SELECT {cols} FROM tenders WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        rec = json.loads(row[0])
+        if with_text:
+            rec["raw_text"] = row[1]
+        return rec
+
+    def get_many(self, keys: List[str]) -> List[Dict[str, Any]]:
+        """Records for `keys`, in the same order (missing keys are skipped)."""
+        if not keys:
+            return []
+        found = {}
+        for i in range(0, len(keys), 500):
+            part = keys[i:i + 500]
+            marks = ",".join("?" * len(part))
+            for key, rec in self._conn().execute(f"SELECT key, record FROM tenders WHERE key IN ({marks})", part):
+                found[key] = json.loads(rec)
+        return [found[k] for k in keys if k in found]
+
+    def by_tender_id(self, tender_id: str) -> List[Dict[str, Any]]:
+        rows = self._conn().execute("SELECT record FROM tenders WHERE tender_id = ? ORDER BY updated DESC", (tender_id,))
+        return [json.loads(r[0]) for r in rows]
+
+    def update_columns(self, rows: List[Tuple[str, Dict[str, Any]]]):
+        """Bulk-update precomputed columns: [(key, {column: value})]."""
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            for key, cols in rows:
+                cols = {k: v for k, v in cols.items() if k in self.COLUMNS}
+                if cols:
+                    self._kpi_apply(conn, self._kpi_row(conn, key), -1)
+                    conn.execute(f"UPDATE tenders SET {', '.join(k + ' = ?' for k in cols)} WHERE key = ?",
+                                 list(cols.values()) + [key])
+                    self._kpi_apply(conn, self._kpi_row(conn, key), +1)
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    def stale_rows(self, columns_v: int) -> List[Tuple[str, Dict[str, Any]]]:
+        """(key, record) of rows whose columns were computed by an older version."""
+        rows = self._conn().execute("SELECT key, record FROM tenders WHERE columns_v < ?", (columns_v,))
+        return [(k, json.loads(r)) for k, r in rows]
+
+    @staticmethod
+    def _like(text: str) -> str:
+        """Substring LIKE pattern for user text; %, _ and \\ match literally (with ESCAPE '\\')."""
+        text = text.lower().replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+        return f"%{text}%"
+
+    def _where(self, keys: List[str] = None, category: str = None, deadline_from: str = None, deadline_to: str = None,
+               authority: str = None, search: str = None, min_value: int = None, max_value: int = None) -> Tuple[str, list]:
+        where, params = [], []
+        if keys is not None:
+            where.append("key IN (SELECT value FROM json_each(?))")
+            params.append(json.dumps(list(keys)))
+        if category:
+            where.append("category = ?")
+            params.append(category)
+        if deadline_from:
+            where.append("deadline >= ?")
+            params.append(deadline_from)
+        if deadline_to:
+            where.append("deadline <= ?")
+            params.append(deadline_to)
+        if authority:
+            where.append("authority LIKE ? ESCAPE '\\'")
+            params.append(self._like(authority))
+        if search:
+            where.append("search LIKE ? ESCAPE '\\'")
+            params.append(self._like(search))
+        if min_value is not None:
+            where.append("value_paise >= ?")
+            params.append(min_value)
+        if max_value is not None:
+            where.append("value_paise <= ?")
+            params.append(max_value)
+        return (" WHERE " + " AND ".join(where)) if where else "", params
+
+    def query(self, keys: List[str] = None, category: str = None, deadline_from: str = None, deadline_to: str = None,
+              authority: str = None, search: str = None, min_value: int = None, max_value: int = None,
+              sort: str = "deadline", descending: bool = False, offset: int = 0, limit: int = 24) -> Tuple[List[Dict[str, Any]], int]:
+        """
+        One page of records matching the filters, plus the total match count.
+
+        Args:
+            keys (list): Restrict to these record keys (None = all records).
+            category (str): Exact category.
+            deadline_from (str), deadline_to (str): Inclusive YYYY-MM-DD bounds on the deadline.
+            authority (str): Case-insensitive substring of the issuing authority.
+            search (str): Case-insensitive substring of title/ID/authority/location.
+            min_value (int), max_value (int): Inclusive bounds on the tender value, in paise.
+            sort (str): One of SORTS.
+            descending (bool): Reverse the sort.
+            offset (int), limit (int): Page window.
+
+        Returns:
+            tuple: (records without raw_text, total matches)
+        """
+        clause, params = self._where(keys, category, deadline_from, deadline_to, authority, search, min_value, max_value)
+        conn = self._conn()
+        total = conn.execute(f"SELECT COUNT(*) FROM tenders{clause}", params).fetchone()[0]
+        order = self.SORTS.get(sort, self.SORTS["deadline"])
+        if descending:
+            order = ", ".join(part + " DESC" if "IS NULL" not in part else part for part in order.split(", "))
+        rows = conn.execute(
+            f"SELECT record, deadline, value_paise FROM tenders{clause} ORDER BY {order}, key LIMIT ? OFFSET ?",
+            params + [int(limit), int(offset)],
+        ).fetchall()
+        out = []
+        for rec, deadline, value in rows:
+            r = json.loads(rec)
+            r["_deadline"] = deadline
+            r["_value_paise"] = value
+            out.append(r)
+        return out, total
+
+    def keys(self, **filters) -> Optional[List[str]]:
+        """Keys matching the `query` filters; None when no filter is set (every key matches)."""
+        if not any(v is not None and v != "" for v in filters.values()):
+            return None
+        clause, params = self._where(**filters)
+        return [r[0] for r in self._conn().execute(f"SELECT key FROM tenders{clause}", params)]
+
+    def iter_documents(self, batch: int = 500, updated_since: float = None) -> Iterator[Tuple[str, Dict[str, Any], str]]:
+        """
+        (key, record, raw_text) of every stored tender, read in key order `batch` rows at a time.
+        With `updated_since` (epoch seconds), only tenders written after it.
+        """
+        last = ""
+        since = "" if updated_since is None else " AND updated > ?"
+        while True:
+            params = (last,) + (() if updated_since is None else (updated_since,)) + (batch,)
+            rows = self._conn().execute(
+                f"SELECT key, record, raw_text FROM tenders WHERE key > ?{since} ORDER BY key LIMIT ?", params
+            ).fetchall()
+            if not rows:
+                return
+            for key, rec, raw_text in rows:
+                yield key, json.loads(rec), raw_text
+            last = rows[-1][0]
+
+    def delete(self, key: str):
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            self._kpi_apply(conn, self._kpi_row(conn, key), -1)
+            conn.execute("DELETE FROM tenders WHERE key = ?", (key,))
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
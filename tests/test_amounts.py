@@ -0,0 +1,43 @@
+import pandas as pd
+import pytest
+
+import TenderAnalyser as ta
+
+
+CASES = [
+    ("Rs. 1,20,000/-", 12000000),
+    ("₹ 5 Lakhs", 50000000),
+    ("2.5 Cr", 2500000000),
+    ("Tender ID 2024 Rs 500", 50000),
+    ("Rs. 7.5 L", 75000000),
+    ("Rs 12 Lac", 120000000),
+    ("₹ .5 lakh", 5000000),
+    ("Rs 3 crs", 3000000000),
+    ("INR 2,500.50", 250050),
+    ("2%", None),
+    ("", None),
+]
+
+
+@pytest.mark.parametrize("text,paise", CASES)
+def test_amount_to_paise(text, paise):
+    assert ta.amount_to_paise(text) == paise
+
+
+def test_vectorized_matches_scalar():
+    got = ta.amounts_to_paise([t for t, _ in CASES])
+    assert [None if pd.isna(v) else int(v) for v in got] == [p for _, p in CASES]
+
+
+@pytest.mark.parametrize("text,clean", [
+    ("Rs. 7.5 L (incl. GST)", "Rs. 7.5 L"),
+    ("INR 3 crs only", "Rs. 3 Crs"),
+    ("₹ .5 lakh", "₹ .5 Lakh"),
+])
+def test_sanitize_amount_text_keeps_units(text, clean):
+    assert ta.sanitize_amount_text(text) == clean
+
+
+def test_tender_value_is_sanitized_in_merge():
+    merged = ta.merge_candidates({"tender_value": "Rs. 7.5 L (approx.), see Schedule B for details"}, {})
+    assert merged["tender_value"] == "Rs. 7.5 L"
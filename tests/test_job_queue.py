@@ -0,0 +1,43 @@
+import os
+
+from job_queue import JobQueue
+
+
+def test_poison_document_is_failed_after_max_attempts(tmp_path):
+    q = JobQueue(os.path.join(tmp_path, "jobs.sqlite"), lease_s=-1, max_attempts=2)
+    job = q.create_job([("bad.pdf", "/tmp/bad.pdf"), ("good.pdf", "/tmp/good.pdf")])
+    # lease_s < 0: every running document counts as lease-expired straight away
+    assert q.claim("w")["filename"] == "bad.pdf"
+    assert q.claim("w")["filename"] == "bad.pdf"
+    doc = q.claim("w")
+    assert doc["filename"] == "good.pdf"
+    assert q.complete(job, doc["seq"], {"ok": True}, "w")
+    assert q.claim("w") is None
+    states = {d["filename"]: d["status"] for d in q.documents(job)}
+    assert states == {"bad.pdf": "error", "good.pdf": "done"}
+    assert q.progress(job)["status"] == "done"
+
+
+def test_stale_worker_cannot_overwrite_a_reclaimed_document(tmp_path):
+    q = JobQueue(os.path.join(tmp_path, "jobs.sqlite"), lease_s=-1)
+    job = q.create_job([("a.pdf", "/tmp/a.pdf")])
+    q.claim("old")
+    q.claim("new")  # lease of "old" expired
+    assert not q.set_stage(job, 0, "finish", "old")
+    assert q.complete(job, 0, {"by": "new"}, "new")
+    assert not q.complete(job, 0, {"by": "old"}, "old")
+    assert not q.fail(job, 0, "late error", "old")
+    assert q.finished(job)[0]["result"] == {"by": "new"}
+
+
+def test_finished_cursor_returns_only_newer_rows(tmp_path):
+    q = JobQueue(os.path.join(tmp_path, "jobs.sqlite"))
+    job = q.create_job([(f"{i}.pdf", f"/tmp/{i}.pdf") for i in range(3)])
+    for _ in range(3):
+        doc = q.claim("w")
+        q.complete(job, doc["seq"], {"seq": doc["seq"]}, "w")
+    rows = q.finished(job)
+    assert [r["seq"] for r in rows] == [0, 1, 2]
+    cursor = (rows[0]["finished_at"], rows[0]["seq"])
+    assert [r["seq"] for r in q.finished(job, cursor)] == [1, 2]
+    assert q.finished(job, (rows[-1]["finished_at"], rows[-1]["seq"])) == []
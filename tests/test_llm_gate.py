@@ -0,0 +1,63 @@
+import TenderAnalyser as ta
+
+
+CLEAN_NIT = """NOTICE INVITING TENDER
+Tender No: PWD/2024/117
+Name of Work: Resurfacing of District Road 14 from km 0 to km 12
+Issued By: Executive Engineer, PWD Division Nashik, Address: Trimbak Road, Nashik
+Publication Date: 01/04/2024
+Last Date of Submission: 25/04/2024
+Bid Opening: 27/04/2024
+EMD: Rs. 1,50,000
+Tender Fee: Rs. 5,000
+Contact: ee.nashik@pwd.example.in, 0253-2578123
+"""
+
+
+def test_clean_nit_skips_llm(monkeypatch):
+    monkeypatch.setitem(ta.CONFIG, "llm_gate", True)
+    _, regexed, _, cands = ta.scan_document([CLEAN_NIT])
+    gate = ta.llm_gate_decision(regexed, cands)
+    assert gate["missing"] == []
+    assert gate["decision"] == "skip"
+
+
+def test_gap_asks_for_missing_fields_only(monkeypatch):
+    monkeypatch.setitem(ta.CONFIG, "llm_gate", True)
+    monkeypatch.setitem(ta.CONFIG, "llm_gate_targeted", True)
+    text = CLEAN_NIT.replace("Tender Fee: Rs. 5,000\n", "")
+    _, regexed, _, cands = ta.scan_document([text])
+    gate = ta.llm_gate_decision(regexed, cands)
+    assert gate["decision"] == "targeted"
+    assert gate["missing"] == ["tender_fee"]
+
+
+def _finish_clean_nit(tmp_path, monkeypatch, text=CLEAN_NIT):
+    calls = []
+    monkeypatch.setitem(ta.CONFIG, "llm_gate", True)
+    monkeypatch.setitem(ta.CONFIG, "use_llm_extract", True)
+    monkeypatch.setitem(ta.CONFIG, "use_llm_eval", True)
+    monkeypatch.setitem(ta.CONFIG, "extraction_output_dir", str(tmp_path))
+    monkeypatch.setattr(ta, "llm_chat", lambda *a, **k: calls.append(a) or "{}")
+    monkeypatch.setattr(ta, "get_llm_client", lambda: object())
+    monkeypatch.setattr(ta, "index_tender_text", lambda record: {})
+    doc_index, regexed, header, cands = ta.scan_document([text])
+    doc = {"fname": "nit.pdf", "upload_path": "nit.pdf", "doc_index": doc_index, "text": doc_index.text,
+           "content_sha256": "", "regexed": regexed, "global_header": header, "regex_cands": cands}
+    ta.finish_stage(doc)
+    meta = ta.read_json_safe(str(tmp_path / "nit" / "metadata.json"))
+    return calls, meta["extraction_meta"]["llm_gate"]
+
+
+def test_clean_nit_makes_no_llm_call(tmp_path, monkeypatch):
+    calls, gate = _finish_clean_nit(tmp_path, monkeypatch)
+    assert calls == []
+    assert gate["decision"] == "skip"
+    assert gate["reason"] and gate["eval"].startswith("skipped")
+
+
+def test_evaluation_still_runs_when_not_gated(tmp_path, monkeypatch):
+    monkeypatch.setitem(ta.CONFIG, "llm_gate_eval", False)
+    calls, gate = _finish_clean_nit(tmp_path, monkeypatch)
+    assert len(calls) == 1
+    assert (gate["decision"], gate["eval"]) == ("skip", "run")
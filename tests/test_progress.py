@@ -0,0 +1,46 @@
+import json
+import os
+
+import TenderAnalyser as ta
+from job_queue import JobQueue
+from progress_bus import ProgressBus
+
+
+def _setup(tmp_path, monkeypatch):
+    queue = JobQueue(os.path.join(tmp_path, "jobs.sqlite"))
+    bus = ProgressBus()
+    monkeypatch.setattr(ta, "JOB_QUEUE", queue)
+    monkeypatch.setattr(ta, "PROGRESS_BUS", bus)
+    monkeypatch.setitem(ta.CONFIG, "job_poll_s", 0.05)
+    monkeypatch.setattr(ta, "_BACKGROUND_INIT_STARTED", True)  # no OCR pool / dispatcher from the test client
+    job = queue.create_job([("a.pdf", "/tmp/a.pdf"), ("b.pdf", "/tmp/b.pdf")])
+    bus.start_job(job, 2)
+    return queue, bus, job
+
+
+def _finish_a_here_and_b_elsewhere(queue, bus, job):
+    a = queue.claim("here")
+    bus.stage_started(job, a["seq"], a["filename"], "extract")
+    bus.stage_finished(job, a["seq"], "extract", 1.5)
+    queue.complete(job, a["seq"], {"key": "a"}, "here")
+    bus.doc_finished(job, a["seq"])
+    b = queue.claim("other-process")  # never reported to this process's bus
+    queue.complete(job, b["seq"], {"key": "b"}, "other-process")
+
+
+def test_progress_totals_come_from_the_queue(tmp_path, monkeypatch):
+    queue, bus, job = _setup(tmp_path, monkeypatch)
+    _finish_a_here_and_b_elsewhere(queue, bus, job)
+    prog = ta.job_progress(job)
+    assert (prog["done"], prog["status"]) == (2, "done")
+    assert prog["stages"]["extract"]["mean_s"] == 1.5
+    assert prog["last_doc"]["filename"] == "a.pdf"
+    assert "docs" not in prog
+
+
+def test_stream_ends_when_other_process_finishes_the_job(tmp_path, monkeypatch):
+    queue, bus, job = _setup(tmp_path, monkeypatch)
+    _finish_a_here_and_b_elsewhere(queue, bus, job)
+    body = ta.app.server.test_client().get(f"/progress/{job}/stream").get_data(as_text=True)
+    messages = [json.loads(line[6:]) for line in body.splitlines() if line.startswith("data: ")]
+    assert messages[-1]["status"] == "done"
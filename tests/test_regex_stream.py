@@ -0,0 +1,22 @@
+import TenderAnalyser as ta
+
+
+PAGES = [
+    "NOTICE INVITING TENDER\nName of Work: Supply of water meters\nfor Ward 12 and Ward 14\n"
+    "Issued By: Municipal Corporation, Pune\nAddress: Shivajinagar",
+    "Tender ID: 2024_MCP_771234_1\nPublished Date: 12/03/2024\nEMD: Rs. 50,000",
+    "Terms and conditions apply.\nTitle: this line must not win over the first title",
+]
+
+
+def test_stream_matches_joined_text():
+    stream = ta.RegexFieldStream()
+    for page in PAGES:
+        stream.feed(page)
+    assert stream.result() == ta.regex_extract("\n".join(PAGES))
+
+
+def test_free_text_fields_stop_at_end_of_line():
+    data = ta.regex_extract("\n".join(PAGES))
+    assert data["title"] == "Supply of water meters"
+    assert data["issuing_authority"] == "Municipal Corporation, Pune"
@@ -0,0 +1,56 @@
+import os
+
+import TenderAnalyser as ta
+from search_index import BM25Index
+from tender_store import TenderStore
+
+
+def _record(title, eligibility):
+    return {"title": title, "source_file": title + ".pdf", "raw_text": "",
+            "meta": {"tender_id": "", "eligibility_summary": eligibility}}
+
+
+def test_search_picks_up_tenders_stored_by_other_processes(tmp_path, monkeypatch):
+    store = TenderStore(os.path.join(tmp_path, "tenders.sqlite"))
+    monkeypatch.setattr(ta, "TENDER_STORE", store)
+    monkeypatch.setattr(ta, "SEARCH_INDEX", BM25Index())
+    monkeypatch.setattr(ta, "_SEARCH_INDEX_SYNCED_AT", None)
+    monkeypatch.setattr(ta, "get_vector_store", lambda: None)
+    monkeypatch.setitem(ta.CONFIG, "search_refresh_s", 0)
+
+    first = _record("Pump house repairs", "Bidders must hold ISO 9001")
+    store.upsert(ta.tender_key(first), first)
+    assert [k for k, _ in ta.hybrid_search("iso 9001")] == [ta.tender_key(first)]
+
+    # written straight to the shared store, as a --worker process would
+    second = _record("Water meters", "CERT-IN empanelled agencies only")
+    store.upsert(ta.tender_key(second), second)
+    assert [k for k, _ in ta.hybrid_search("cert-in empanelled")] == [ta.tender_key(second)]
+
+
+def _fields(text):
+    return [(text, 1)]
+
+
+def test_updates_do_not_skew_scores():
+    docs = {"a": "pump motor valve", "b": "pump pipeline", "c": "road resurfacing"}
+    churned = BM25Index()
+    for key, text in docs.items():
+        churned.add(key, _fields(text))
+    for _ in range(5):  # re-index "b" with other words: its old "pump" postings are dead, not compacted
+        churned.add("b", _fields("bridge girder"))
+        churned.add("b", _fields(docs["b"]))
+    fresh = BM25Index()
+    for key, text in docs.items():
+        fresh.add(key, _fields(text))
+    assert churned.search("pump") == fresh.search("pump")
+
+
+def test_search_respects_allowed_and_removed_keys():
+    index = BM25Index()
+    for key in ("a", "b", "c"):
+        index.add(key, _fields("iso 27001 certified " + key))
+    index.remove("c")
+    assert {key for key, _ in index.search("iso 27001")} == {"a", "b"}
+    assert [key for key, _ in index.search("iso 27001", allowed={"b", "c", "zz"})] == ["b"]
+    assert index.search("iso 27001", allowed=set()) == []
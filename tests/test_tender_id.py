@@ -0,0 +1,20 @@
+import TenderAnalyser as ta
+
+
+def _best_id(pages):
+    _, regexed, _, cands = ta.scan_document(pages)
+    return ta.pick_best_tender_id(cands.get("tender_id", []), cands.get("tender_id#fallback", [])) or regexed.get("tender_id")
+
+
+def test_labelled_id_beats_unlabelled_codes():
+    codes = " ".join(f"AB-{n}" for n in range(100, 125))
+    pages = [f"Concrete as per IS-456 and drawings {codes}.", "Tender No: PWD/2024/117\nLast date: 10/05/2024"]
+    assert _best_id(pages) == "PWD/2024/117"
+
+
+def test_fallback_used_without_labelled_id():
+    assert _best_id(["Reference WB-20931 for the works below."]) == "WB-20931"
+
+
+def test_labelled_candidates_keep_document_order_on_ties():
+    assert ta.pick_best_tender_id(["PWD/2024/117", "PWD/2024/118"]) == "PWD/2024/117"
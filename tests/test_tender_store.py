@@ -0,0 +1,14 @@
+import os
+
+from tender_store import TenderStore
+
+
+def test_like_filters_match_wildcards_literally(tmp_path):
+    store = TenderStore(os.path.join(tmp_path, "tenders.sqlite"))
+    store.upsert("a", {"title": "a"}, {"search": "100% civil work", "authority": "ee_pwd nashik"})
+    store.upsert("b", {"title": "b"}, {"search": "1000 meters of pipe", "authority": "eexpwd pune"})
+    store.upsert("c", {"title": "c"}, {"search": "path c:\\tenders", "authority": "zp satara"})
+    assert store.keys(search="100%") == ["a"]
+    assert store.keys(authority="EE_PWD") == ["a"]
+    assert store.keys(search="c:\\tenders") == ["c"]
+    assert sorted(store.keys(search="100")) == ["a", "b"]